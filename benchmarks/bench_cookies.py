@@ -0,0 +1,50 @@
+"""Compare looking up a cookie through the name index of `Cookies` with a scan over the whole jar.
+
+Run with `python -m benchmarks.bench_cookies`.
+"""
+
+import time
+
+from hypernet.client.cookies import Cookies
+
+ROUNDS = 2000
+
+COOKIE_STRING = "; ".join(
+    [f"extra_{index}=value_{index}" for index in range(40)]
+    + ["hg_token=token", "hg_id=1000", "cred=cred", "lab_user_id=2000", "lab_show_user_id=3000"]
+)
+
+
+def scan(cookies: Cookies, name: str):
+    """The lookup every property access did before the index: a scan over the whole jar."""
+    value = None
+    for cookie in cookies.jar:
+        if cookie.name == name:
+            value = cookie.value
+    return value
+
+
+def main() -> None:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        cookies = Cookies(COOKIE_STRING)
+    parse_time = (time.perf_counter() - start) / ROUNDS
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        scan(cookies, "cred")
+    scan_time = (time.perf_counter() - start) / ROUNDS
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        _ = cookies.cred
+    index_time = (time.perf_counter() - start) / ROUNDS
+
+    print(
+        f"Parsing {len(cookies)} cookies: {parse_time * 1e6:.1f}us, "
+        f"cred lookup: jar scan {scan_time * 1e6:.2f}us, index {index_time * 1e6:.2f}us"
+    )
+
+
+if __name__ == "__main__":
+    main()
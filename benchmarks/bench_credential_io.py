@@ -0,0 +1,33 @@
+"""Compare streaming cookie strings with `iter_credentials` to parsing them with `parse_cookie` into `Cookies`.
+
+Run with `python -m benchmarks.bench_credential_io`.
+"""
+
+import io
+import time
+
+from hypernet.client.cookies import Cookies
+from hypernet.client.credential_io import iter_credentials
+from hypernet.utils.cookies import parse_cookie
+
+COUNT = 20000
+
+
+def main() -> None:
+    lines = [f"cred=cred{index}; hg_token=token{index}; hg_id={index}; Path=/\n" for index in range(COUNT)]
+
+    start = time.perf_counter()
+    for _ in iter_credentials(io.StringIO("".join(lines)), "txt"):
+        pass
+    stream_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for line in lines:
+        Cookies(parse_cookie(line))
+    cookies_time = time.perf_counter() - start
+
+    print(f"Loading {COUNT} cookie strings: streaming {stream_time:.2f}s, parse_cookie and Cookies {cookies_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
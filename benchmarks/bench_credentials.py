@@ -0,0 +1,33 @@
+"""Compare the memory of accounts kept as `Cookies` and as `Credential`.
+
+Run with `python -m benchmarks.bench_credentials`.
+"""
+
+import tracemalloc
+
+from hypernet.client.cookies import Cookies, Credential
+
+COUNT = 1000
+
+COOKIES = {"hg_token": "token", "hg_id": "1000", "cred": "cred", "lab_user_id": "2000", "lab_show_user_id": "3000"}
+
+
+def measure(factory) -> int:
+    tracemalloc.start()
+    try:
+        objects = [factory(index) for index in range(COUNT)]
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del objects
+    return size
+
+
+def main() -> None:
+    cookies_size = measure(lambda index: Cookies({**COOKIES, "cred": f"cred{index}"}))
+    credential_size = measure(lambda index: Credential.from_cookies({**COOKIES, "cred": f"cred{index}"}))
+    print(f"Memory of {COUNT} accounts: Cookies {cookies_size} bytes, Credential {credential_size} bytes")
+
+
+if __name__ == "__main__":
+    main()
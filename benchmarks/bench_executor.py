@@ -0,0 +1,61 @@
+"""Compare the longest event loop stall while device fingerprint payloads are built inline and in a process pool.
+
+Run with `python -m benchmarks.bench_executor`.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from hypernet.utils.device_fp import build_device_fp_payloads
+from hypernet.utils.executor import run_cpu_bound
+
+PAYLOADS = 200
+
+
+async def measure_stall(work) -> float:
+    """Run `work` while a ticker runs on the loop, returning the longest gap between ticks."""
+    stall = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0)
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    try:
+        await work()
+    finally:
+        done.set()
+        await task
+    return stall
+
+
+async def main() -> None:
+    build_device_fp_payloads(1)
+
+    async def inline():
+        build_device_fp_payloads(PAYLOADS)
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        await run_cpu_bound(build_device_fp_payloads, 1, executor=executor)
+
+        async def offloaded():
+            await run_cpu_bound(build_device_fp_payloads, PAYLOADS, executor=executor)
+
+        inline_stall = await measure_stall(inline)
+        offloaded_stall = await measure_stall(offloaded)
+    print(
+        f"Longest event loop stall while building {PAYLOADS} device fingerprint payloads: "
+        f"inline {inline_stall * 1000:.1f}ms, process pool {offloaded_stall * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
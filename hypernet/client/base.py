@@ -1,16 +1,35 @@
+import asyncio
+import copy
+import hashlib
 import logging
+import os
+import time
 import typing
 from contextlib import AbstractAsyncContextManager
 from json import JSONDecodeError
 from types import TracebackType
 
-from httpx import AsyncClient, HTTPError, Response, Timeout, TimeoutException
+from httpx import USE_CLIENT_DEFAULT, AsyncClient, HTTPError, Response, Timeout, TimeoutException
 
-from hypernet.client.cookies import Cookies
+from hypernet.client.clock import ServerClock
+from hypernet.client.cookies import Cookies, Credential
+from hypernet.client.deadline import get_remaining_time, shrink_timeout
+from hypernet.client.device_pool import DeviceIDPool
+from hypernet.client.health import AccountHealthTracker
 from hypernet.client.headers import Headers
+from hypernet.client.negative_cache import NegativeCache
+from hypernet.client.proxies import ProxyPoolTransport
+from hypernet.client.region import get_request_region, resolve_region
 from hypernet.client.routes import BASE_API_URL
+from hypernet.client.scheduler import RequestScheduler
+from hypernet.client.sign_tokens import SignTokenRegistry
+from hypernet.client.snapshot import restore_snapshot, save_snapshot
+from hypernet.client.timeouts import AdaptiveTimeout
 from hypernet.errors import (
+    AccountQuarantined,
     BadRequest,
+    HyperNetException,
+    InvalidDevice,
     NetworkError,
     NotSupported,
     RegionNotSupported,
@@ -18,8 +37,9 @@ from hypernet.errors import (
     raise_for_ret_code,
 )
 from hypernet.utils.device_fp import SklandDeviceFP
-from hypernet.utils.ds import generate_dynamic_secret, SklandSign
+from hypernet.utils.ds import SIGN_TOKEN_STATE_KEY, generate_dynamic_secret
 from hypernet.utils.enums import Game, Region
+from hypernet.utils.state import BaseStateBackend
 from hypernet.utils.types import (
     RT,
     CookieTypes,
@@ -29,9 +49,13 @@ from hypernet.utils.types import (
     TimeoutTypes,
     URLTypes,
 )
+from hypernet.utils.validation import ModelValidationPool, decode_api_content
 
 _LOGGER = logging.getLogger("HyperNet.BaseClient")
 
+DEFAULT_CLOCK = ServerClock()
+DEFAULT_SIGN_TOKENS = SignTokenRegistry()
+
 __all__ = ("BaseClient",)
 
 
@@ -40,13 +64,35 @@ class BaseClient(AbstractAsyncContextManager["BaseClient"]):
     This is the base class for hypernet clients. It provides common methods and properties for hypernet clients.
 
     Args:
-        cookies (typing.Optional[str, CookieTypes], typing.Optional): The cookies used for the client.
+        cookies (typing.Optional[str, CookieTypes, Credential], typing.Optional): The cookies used for the client.
+            The player id and region of a `Credential` are used unless others are given.
         headers (typing.Optional[HeaderTypes], typing.Optional): The headers used for the client.
         hg_id (typing.Optional[int], typing.Optional): The account id used for the client.
         player_id (typing.Optional[int], typing.Optional): The player id used for the client.
-        region (Region, typing.Optional): The region used for the client.
+        region (typing.Optional[Region], typing.Optional): The region used for the client. Defaults to the region
+            of a `Credential`, or `Region.OVERSEAS`.
         lang (str, typing.Optional): The language used for the client.
         timeout (typing.Optional[TimeoutTypes], typing.Optional): Timeout configuration for the client.
+        state_backend (typing.Optional[BaseStateBackend], typing.Optional): The shared state backend used to
+            share sign tokens, device IDs and creds with other workers.
+        scheduler (typing.Optional[RequestScheduler], typing.Optional): The scheduler that orders requests by
+            priority class and tenant. Can be shared by several clients.
+        health (typing.Optional[AccountHealthTracker], typing.Optional): The tracker that quarantines creds
+            whose requests keep failing with account errors. Can be shared by several clients.
+        adaptive_timeout (typing.Optional[AdaptiveTimeout], typing.Optional): Learns the latency of each route
+            and sets the read timeout of its requests from it.
+        validation_pool (typing.Optional[ModelValidationPool], typing.Optional): The process pool that validates
+            response models off the event loop. Can be shared by several clients.
+        proxy_pool (typing.Optional[ProxyPoolTransport], typing.Optional): The pool of outbound proxies that
+            requests are spread over. Use `view` to share it between accounts.
+        negative_cache (typing.Optional[NegativeCache], typing.Optional): The cache of "no account", "not bound"
+            and "not supported" errors per cred and endpoint. Can be shared by several clients.
+        sign_tokens (typing.Optional[SignTokenRegistry], typing.Optional): The registry of sign tokens per region
+            and cred. Defaults to a registry shared by all clients.
+        clock (typing.Optional[ServerClock], typing.Optional): The estimate of the server clock offset that
+            signature timestamps are taken from. Defaults to an estimate shared by all clients.
+        device_pool (typing.Optional[DeviceIDPool], typing.Optional): The pool that assigns a device ID to each
+            cred and generates new ones in the background. Defaults to one device ID shared by all creds.
 
     Attributes:
         headers (HeaderTypes): The headers used for the client.
@@ -55,6 +101,15 @@ class BaseClient(AbstractAsyncContextManager["BaseClient"]):
         region (Region): The region used for the client.
         lang (str): The language used for the client.
         game (typing.Optional[Game]): The game used for the client.
+        state_backend (typing.Optional[BaseStateBackend]): The shared state backend used for the client.
+        scheduler (typing.Optional[RequestScheduler]): The request scheduler used for the client.
+        health (typing.Optional[AccountHealthTracker]): The account health tracker used for the client.
+        adaptive_timeout (typing.Optional[AdaptiveTimeout]): The adaptive timeouts used for the client.
+        validation_pool (typing.Optional[ModelValidationPool]): The model validation pool used for the client.
+        negative_cache (typing.Optional[NegativeCache]): The negative cache used for the client.
+        sign_tokens (SignTokenRegistry): The sign token registry used for the client.
+        clock (ServerClock): The server clock estimate used for the client.
+        device_pool (typing.Optional[DeviceIDPool]): The device ID pool used for the client.
 
     """
 
@@ -62,15 +117,25 @@ class BaseClient(AbstractAsyncContextManager["BaseClient"]):
 
     def __init__(
         self,
-        cookies: typing.Optional[typing.Union[str, CookieTypes]] = None,
+        cookies: typing.Optional[typing.Union[str, CookieTypes, Credential]] = None,
         headers: typing.Optional[HeaderTypes] = None,
         hg_id: typing.Optional[int] = None,
         account_id: typing.Optional[int] = None,
         account_show_id: typing.Optional[int] = None,
         player_id: typing.Optional[int] = None,
-        region: Region = Region.OVERSEAS,
+        region: typing.Optional[Region] = None,
         lang: str = "zh-cn",
         timeout: typing.Optional[TimeoutTypes] = None,
+        state_backend: typing.Optional[BaseStateBackend] = None,
+        scheduler: typing.Optional[RequestScheduler] = None,
+        health: typing.Optional[AccountHealthTracker] = None,
+        adaptive_timeout: typing.Optional[AdaptiveTimeout] = None,
+        validation_pool: typing.Optional[ModelValidationPool] = None,
+        proxy_pool: typing.Optional[ProxyPoolTransport] = None,
+        negative_cache: typing.Optional[NegativeCache] = None,
+        sign_tokens: typing.Optional[SignTokenRegistry] = None,
+        clock: typing.Optional[ServerClock] = None,
+        device_pool: typing.Optional[DeviceIDPool] = None,
     ) -> None:
         """Initialize the client with the given parameters."""
         if timeout is None:
@@ -80,16 +145,28 @@ class BaseClient(AbstractAsyncContextManager["BaseClient"]):
                 write=5.0,
                 pool=1.0,
             )
+        if isinstance(cookies, Credential):
+            player_id = player_id or cookies.player_id
+            region = region or cookies.region
         self._cookies = Cookies(cookies)
         self.headers = Headers(headers)
         self.player_id = player_id
         self.hg_id = hg_id or self._cookies.hg_id
         self.account_id = account_id or self._cookies.lab_user_id
         self.account_show_id = account_show_id or self._cookies.lab_show_user_id
-        self.client = AsyncClient(timeout=timeout)
-        self.region = region
+        self.client = AsyncClient(timeout=timeout, transport=proxy_pool)
+        self._region = region or Region.OVERSEAS
         self.lang = lang
         self.lang2 = {"zh-cn": "zh_Hans"}.get(lang, "zh_Hans")
+        self.state_backend = state_backend
+        self.scheduler = scheduler
+        self.health = health
+        self.adaptive_timeout = adaptive_timeout
+        self.validation_pool = validation_pool
+        self.negative_cache = negative_cache
+        self.sign_tokens = DEFAULT_SIGN_TOKENS if sign_tokens is None else sign_tokens
+        self.clock = DEFAULT_CLOCK if clock is None else clock
+        self.device_pool = device_pool
 
     @property
     def cookies(self) -> Cookies:
@@ -100,13 +177,176 @@ class BaseClient(AbstractAsyncContextManager["BaseClient"]):
     def cookies(self, cookies: CookieTypes) -> None:
         self._cookies = Cookies(cookies)
 
-    @staticmethod
-    async def get_device_id() -> str:
-        return await SklandDeviceFP().get_cached_device_id()
+    @property
+    def region(self) -> Region:
+        """Get the region used for the client, overridden inside a `request_region` block."""
+        return get_request_region() or self._region
 
-    @staticmethod
-    async def get_sign_token(force: bool = False) -> str:
-        return await SklandSign().get_cached_sign_token(force)
+    @region.setter
+    def region(self, region: Region) -> None:
+        self._region = region
+
+    def view(
+        self: RT,
+        cookies: typing.Optional[typing.Union[str, CookieTypes, Credential]] = None,
+        hg_id: typing.Optional[int] = None,
+        account_id: typing.Optional[int] = None,
+        account_show_id: typing.Optional[int] = None,
+        player_id: typing.Optional[int] = None,
+        region: typing.Optional[Region] = None,
+    ) -> RT:
+        """Get a view of the client for another account or region.
+
+        The view shares the HTTP client and its connection pool, the state backend, the scheduler,
+        the health tracker and the adaptive timeouts with this client. Only shut down the original client.
+
+        Args:
+            cookies (typing.Optional[typing.Union[str, CookieTypes, Credential]]): The cookies of the account.
+                Defaults to a copy of the cookies of this client. The region and player id of a `Credential` are used
+                unless others are given.
+            hg_id (typing.Optional[int]): The account id of the account.
+            account_id (typing.Optional[int]): The lab account id of the account.
+            account_show_id (typing.Optional[int]): The lab account show id of the account.
+            player_id (typing.Optional[int]): The player id of the account.
+            region (typing.Optional[Region]): The region of the account. Inferred from `player_id` if not provided.
+
+        Returns:
+            BaseClient: The view.
+
+        Raises:
+            RegionNotSupported: If the region is not provided and cannot be inferred from `player_id`.
+        """
+        if isinstance(cookies, Credential):
+            player_id = player_id or cookies.player_id
+            region = region or cookies.region
+        view = copy.copy(self)
+        view.headers = Headers(self.headers)
+        view._cookies = Cookies(self._cookies if cookies is None else cookies)
+        if cookies is not None:
+            view.hg_id = view._cookies.hg_id
+            view.account_id = view._cookies.lab_user_id
+            view.account_show_id = view._cookies.lab_show_user_id
+            view.player_id = None
+        view.hg_id = hg_id or view.hg_id
+        view.account_id = account_id or view.account_id
+        view.account_show_id = account_show_id or view.account_show_id
+        view.player_id = player_id or view.player_id
+        if region is None and player_id is not None:
+            region = resolve_region(player_id, self.game or Game.ENDFIELD)
+        if region is not None:
+            view._region = region
+        return view
+
+    async def get_device_id(self, cred: typing.Optional[str] = None) -> str:
+        """Get the device ID of a cred, from the device ID pool if the client has one.
+
+        Args:
+            cred (typing.Optional[str]): The cred.
+
+        Returns:
+            str: The device ID.
+        """
+        if self.device_pool is not None:
+            return await self.device_pool.get(cred)
+        return await SklandDeviceFP().get_cached_device_id(self.state_backend)
+
+    async def get_sign_token(self, force: bool = False, cred: typing.Optional[str] = None) -> typing.Optional[str]:
+        """Get the sign token of the region of the client, kept and refreshed ahead of expiry by `sign_tokens`.
+
+        Args:
+            force (bool): Whether to fetch a new token even if the current one is valid.
+            cred (typing.Optional[str]): The cred, used in regions whose tokens belong to a cred.
+
+        Returns:
+            typing.Optional[str]: The sign token.
+        """
+        region = self.region
+
+        async def fetch(force_fetch: bool) -> typing.Optional[str]:
+            return await self.fetch_sign_token(region, cred, force_fetch)
+
+        return await self.sign_tokens.get(region, fetch, cred, force)
+
+    async def fetch_sign_token(
+        self,
+        region: Region,
+        cred: typing.Optional[str] = None,
+        force: bool = False,
+    ) -> typing.Optional[str]:
+        """Fetch a new sign token through the HTTP client of the client, shared through the state backend if set.
+
+        Args:
+            region (Region): The region of the token.
+            cred (typing.Optional[str]): The cred, used in regions whose tokens belong to a cred.
+            force (bool): Whether to ignore a token shared by other workers.
+
+        Returns:
+            typing.Optional[str]: The sign token.
+        """
+        if self.state_backend is None:
+            return await self._request_sign_token(region, cred)
+        region_value, token_cred = self.sign_tokens.get_key(region, cred)
+        key = f"{SIGN_TOKEN_STATE_KEY}:{region_value}"
+        if token_cred is not None:
+            key += f":{hashlib.sha256(token_cred.encode()).hexdigest()}"
+        if force:
+            await self.state_backend.delete(key)
+        return await self.state_backend.get_or_create(
+            key,
+            lambda: self._request_sign_token(region, cred),
+            ttl=self.sign_tokens.ttl,
+        )
+
+    async def _request_sign_token(self, region: Region, cred: typing.Optional[str]) -> str:
+        url = BASE_API_URL.get_url(region) / "auth/refresh"
+        headers = self.get_default_header({}, False)
+        if cred is not None and self.sign_tokens.get_key(region, cred)[1] is not None:
+            headers["cred"] = cred
+        retries = 2
+        while True:
+            try:
+                data = await self.request_api("GET", url, headers=headers)
+            except NetworkError:  # noqa: PERF203 the overhead is negligible next to the request
+                remaining = get_remaining_time()
+                if retries <= 0 or (remaining is not None and remaining <= 0):
+                    raise
+                retries -= 1
+                await asyncio.sleep(1 if remaining is None else min(1, remaining))
+            else:
+                return data["token"]
+
+    def save_snapshot(self, path: typing.Union[str, os.PathLike]) -> None:
+        """Save the sign token, device ID, cookies and learned state of the client to a file.
+
+        Args:
+            path (typing.Union[str, os.PathLike]): The path of the file.
+        """
+        save_snapshot(self, path)
+
+    def restore_snapshot(self, path: typing.Union[str, os.PathLike]) -> bool:
+        """Restore the state saved with `save_snapshot`, skipping the entries that have expired since.
+
+        Args:
+            path (typing.Union[str, os.PathLike]): The path of the file.
+
+        Returns:
+            bool: Whether a snapshot was restored.
+        """
+        return restore_snapshot(self, path)
+
+    async def invalidate_account(self, cred: typing.Optional[str] = None) -> None:
+        """Forget the cached errors and health of a cred, for example after its user binds or rebinds a game account.
+
+        Args:
+            cred (typing.Optional[str]): The cred. Defaults to self.cookies.cred if not provided.
+        """
+        cred = cred or self.cookies.cred
+        if cred is None:
+            return
+        if self.negative_cache is not None:
+            self.negative_cache.invalidate(cred)
+        if self.health is not None:
+            self.health.reset(cred)
 
     @property
     def app_version(self) -> str:
@@ -185,6 +425,21 @@ class BaseClient(AbstractAsyncContextManager["BaseClient"]):
             headers["sk-language"] = self.lang2
         return headers
 
+    async def check_account_health(self, cred: typing.Optional[str]) -> None:
+        """Raise if a cred is quarantined by the account health tracker.
+
+        Args:
+            cred (typing.Optional[str]): The cred to check.
+
+        Raises:
+            AccountQuarantined: If the cred is quarantined.
+        """
+        if self.health is None or cred is None:
+            return
+        if not await self.health.check(cred):
+            health = self.health.get(cred)
+            raise AccountQuarantined(until=health.quarantined_until, last_error=health.last_error)
+
     async def request(
         self,
         method: str,
@@ -198,7 +453,11 @@ class BaseClient(AbstractAsyncContextManager["BaseClient"]):
 
         This method makes an HTTP request with the specified HTTP method, URL, request parameters, headers,
         and JSON payload. It catches common HTTP errors and raises a `NetworkError` or `TimedOut` exception
-        if the request times out.
+        if the request times out. If the client has a scheduler, the request waits for a slot first,
+        queued by the priority set with `request_priority` and fairly per cred. With adaptive timeouts,
+        the read timeout is learned from the latency of the route. Inside a `request_deadline` block,
+        the timeouts are shrunk to the remaining budget. The `Date` header of the response is added to the
+        server clock estimate.
 
         Args:
             method (str): The HTTP method to use for the request (e.g., "GET", "POST").
@@ -216,19 +475,69 @@ class BaseClient(AbstractAsyncContextManager["BaseClient"]):
             TimedOut: If the request times out.
 
         """
+        remaining = get_remaining_time()
+        if remaining is not None and remaining <= 0:
+            raise TimedOut("Deadline exceeded before the request was sent.")
+        if self.scheduler is not None:
+            await self._acquire_request_slot(headers, remaining)
         try:
-            return await self.client.request(
+            route = None if self.adaptive_timeout is None else self.adaptive_timeout.get_route(method, url)
+            timeout, remaining = self._get_request_timeout(route)
+            coro = self.client.request(
                 method,
                 url,
                 data=data,
                 json=json,
                 params=params,
                 headers=headers,
+                timeout=timeout,
             )
-        except TimeoutException as exc:
+            sent_at = time.time()
+            start = time.monotonic()
+            try:
+                response = await coro if remaining is None else await asyncio.wait_for(coro, remaining)
+            except TimeoutException:
+                if route is not None:
+                    self.adaptive_timeout.observe(route, time.monotonic() - start)
+                raise
+            if route is not None:
+                self.adaptive_timeout.observe(route, time.monotonic() - start)
+        except (TimeoutException, asyncio.TimeoutError) as exc:
             raise TimedOut from exc
         except HTTPError as exc:
             raise NetworkError from exc
+        else:
+            self.clock.observe_response(response, sent_at)
+            return response
+        finally:
+            if self.scheduler is not None:
+                self.scheduler.release()
+
+    async def _acquire_request_slot(
+        self, headers: typing.Optional[HeaderTypes], remaining: typing.Optional[float]
+    ) -> None:
+        """Wait for a slot of the scheduler, queued fairly per cred and at most until the deadline."""
+        cred = Headers(headers).get("cred") if headers is not None else None
+        if remaining is None:
+            await self.scheduler.acquire(tenant=cred)
+            return
+        try:
+            await asyncio.wait_for(self.scheduler.acquire(tenant=cred), remaining)
+        except asyncio.TimeoutError as exc:
+            raise TimedOut("Deadline exceeded while waiting for a request slot.") from exc
+
+    def _get_request_timeout(self, route: typing.Optional[str]) -> tuple[typing.Any, typing.Optional[float]]:
+        """Get the timeout of a request, learned for its route and shrunk to the deadline, and the remaining time."""
+        timeout = USE_CLIENT_DEFAULT
+        if route is not None:
+            timeout = self.adaptive_timeout.get_timeout(route, self.client.timeout)
+        remaining = get_remaining_time()
+        if remaining is not None:
+            if remaining <= 0:
+                raise TimedOut("Deadline exceeded before the request was sent.")
+            base_timeout = self.client.timeout if timeout is USE_CLIENT_DEFAULT else timeout
+            timeout = shrink_timeout(base_timeout, remaining)
+        return timeout, remaining
 
     async def request_api(
         self,
@@ -237,6 +546,7 @@ class BaseClient(AbstractAsyncContextManager["BaseClient"]):
         json: typing.Optional[typing.Any] = None,
         params: typing.Optional[QueryParamTypes] = None,
         headers: typing.Optional[HeaderTypes] = None,
+        data_type: typing.Optional[typing.Any] = None,
     ):
         """Make an API request and return the data.
 
@@ -250,9 +560,12 @@ class BaseClient(AbstractAsyncContextManager["BaseClient"]):
             json (typing.Optional[Any]): The JSON payload to include in the body of the request.
             params (typing.Optional[QueryParamTypes]): The query parameters to include in the request.
             headers (typing.Optional[HeaderTypes]): The headers to include in the request.
+            data_type (typing.Optional[Any]): The type to validate the data as, directly from the response body.
+                Parts of the body that the type does not declare are skipped without building Python objects.
+                With a validation pool, the body is validated in a worker process.
 
         Returns:
-            Any: The data returned by the API.
+            Any: The data returned by the API, validated as `data_type` if it is given.
 
         Raises:
             NetworkError: If an HTTP error occurs while making the request.
@@ -267,6 +580,10 @@ class BaseClient(AbstractAsyncContextManager["BaseClient"]):
             headers=headers,
         )
         if not response.is_error:
+            if data_type is not None:
+                if self.validation_pool is not None:
+                    return await self.validation_pool.validate(data_type, response.content)
+                return self.decode_api_data(response, data_type)
             data = response.json()
             ret_code = data.get("code", 0)
             if ret_code != 0:
@@ -283,6 +600,23 @@ class BaseClient(AbstractAsyncContextManager["BaseClient"]):
             pass
         raise BadRequest(status_code=response.status_code, message=response.text)
 
+    @staticmethod
+    def decode_api_data(response: Response, data_type: typing.Any) -> typing.Any:
+        """Validate the data of a successful API response directly from the raw body.
+
+        Args:
+            response (Response): The response to decode.
+            data_type (Any): The type to validate the data as.
+
+        Returns:
+            Any: The validated data.
+
+        Raises:
+            BadRequest: If the response contains an error.
+            ValidationError: If the data does not match `data_type`.
+        """
+        return decode_api_content(response.content, data_type)
+
     async def request_lab(
         self,
         url: URLTypes,
@@ -291,6 +625,7 @@ class BaseClient(AbstractAsyncContextManager["BaseClient"]):
         params: typing.Optional[QueryParamTypes] = None,
         headers: typing.Optional[HeaderTypes] = None,
         cred: typing.Optional[str] = None,
+        data_type: typing.Optional[typing.Any] = None,
     ):
         """Make a request to the lab API and return the data.
 
@@ -305,26 +640,59 @@ class BaseClient(AbstractAsyncContextManager["BaseClient"]):
             params (typing.Optional[QueryParamTypes]): The query parameters to include in the request.
             headers (typing.Optional[HeaderTypes]): The headers to include in the request.
             cred (typing.Optional[str]): The cred cookie to use for the request. Defaults to self.cookies.cred if not provided.
+            data_type (typing.Optional[Any]): The type to validate the data as, directly from the response body.
 
         Returns:
             Any: The data returned by the lab API.
 
+        Raises:
+            AccountQuarantined: If the cred is quarantined by the account health tracker.
+            BadRequest: If the response contains an error, or the error is cached by the negative cache.
+            NotSupported: If the API is not supported, or the error is cached by the negative cache.
+
         """
         if method is None:
             method = "POST" if data else "GET"
 
         headers = self.get_default_header(headers, method == "POST")
         cred = cred or self.cookies.cred
-        token = await self.get_sign_token()
+        await self.check_account_health(cred)
+        endpoint = None
+        if self.negative_cache is not None:
+            endpoint = self.negative_cache.get_endpoint(method, url)
+            cached = self.negative_cache.get(cred, endpoint)
+            if cached is not None:
+                raise cached
+        token = await self.get_sign_token(cred=cred)
         if cred is not None:
             headers["cred"] = cred
         if token is not None:
-            did = await self.get_device_id()
-            sign, header_ca = generate_dynamic_secret(token, url, method, data, params, did)
+            did = await self.get_device_id(cred)
+            timestamp = str(int(self.clock.now()) - 2)
+            sign, header_ca = generate_dynamic_secret(token, url, method, data, params, did, timestamp)
             headers.update(header_ca)
             headers["sign"] = sign
 
-        return await self.request_api(method=method, url=url, json=data, params=params, headers=headers)
+        try:
+            result = await self.request_api(
+                method=method,
+                url=url,
+                json=data,
+                params=params,
+                headers=headers,
+                data_type=data_type,
+            )
+        except HyperNetException as exc:
+            # A rotated device ID is the fix for InvalidDevice, so the account is not at fault.
+            rotated = self.device_pool is not None and isinstance(exc, InvalidDevice) and self.device_pool.rotate(cred)
+            if self.health is not None and cred is not None and not rotated:
+                self.health.record_failure(cred, exc)
+            if endpoint is not None:
+                self.negative_cache.record(cred, endpoint, exc)
+            raise
+        if self.health is not None and cred is not None:
+            self.health.record_success(cred)
+        return result
 
     async def request_base_api(
         self,
@@ -334,6 +702,7 @@ class BaseClient(AbstractAsyncContextManager["BaseClient"]):
         params: typing.Optional[QueryParamTypes] = None,
         headers: typing.Optional[HeaderTypes] = None,
         cred: typing.Optional[str] = None,
+        data_type: typing.Optional[typing.Any] = None,
     ):
         """Make a request to the base API and return the data.
 
@@ -347,6 +716,7 @@ class BaseClient(AbstractAsyncContextManager["BaseClient"]):
             params (typing.Optional[QueryParamTypes]): The query parameters to include in the request.
             headers (typing.Optional[HeaderTypes]): The headers to include in the request.
             cred (typing.Optional[str]): The cred cookie to use for the request. Defaults to self.cookies.cred if not provided.
+            data_type (typing.Optional[Any]): The type to validate the data as, directly from the response body.
 
         Returns:
             Any: The data returned by the API.
@@ -360,6 +730,7 @@ class BaseClient(AbstractAsyncContextManager["BaseClient"]):
             params=params,
             headers=headers,
             cred=cred,
+            data_type=data_type,
         )
 
     def region_specific(self, cn: bool) -> None:
@@ -0,0 +1,106 @@
+"""Estimation of the offset between the local clock and the clock of the API servers."""
+
+import datetime
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional, Union
+
+from httpx import Response
+
+__all__ = ("ServerClock",)
+
+_LOGGER = logging.getLogger("HyperNet.ServerClock")
+
+
+class ServerClock:
+    """
+    Estimates how far the clock of the API servers is ahead of the local clock.
+
+    Each response carries the server time with a resolution of one second in its `Date` header, which
+    `BaseClient.request` observes for every response. The server time is compared to the midpoint of the
+    local send and receive times of the response, and the offsets are smoothed with an exponentially
+    weighted moving average, so a single slow or cached response does not move the estimate much.
+    Responses that took longer than `max_rtt` are ignored, because their midpoint is too uncertain.
+    Signature timestamps are taken from `now`, so they stay valid when the local clock drifts.
+
+    Args:
+        alpha (float): The weight of a new sample in the moving average.
+        max_rtt (float): The longest round trip, in seconds, whose server time is still used.
+
+    Attributes:
+        offset (float): The estimated server time minus the local time, in seconds.
+        samples (int): The number of server times the estimate is based on.
+        last_observed (Optional[float]): The local time of the last sample.
+    """
+
+    def __init__(self, alpha: float = 0.2, max_rtt: float = 5.0) -> None:
+        self.alpha = alpha
+        self.max_rtt = max_rtt
+        self.offset = 0.0
+        self.samples = 0
+        self.last_observed: Optional[float] = None
+
+    @property
+    def metrics(self) -> dict[str, Union[float, int, None]]:
+        """The current offset, the number of samples and the local time of the last sample."""
+        return {"offset": self.offset, "samples": self.samples, "last_observed": self.last_observed}
+
+    def now(self) -> float:
+        """Get the estimated server time, as a Unix timestamp."""
+        return time.time() + self.offset
+
+    def observe(
+        self,
+        server_time: Union[float, datetime.datetime],
+        sent_at: float,
+        received_at: Optional[float] = None,
+    ) -> bool:
+        """Add a server time to the estimate.
+
+        Args:
+            server_time (Union[float, datetime.datetime]): The server time, truncated to whole seconds.
+            sent_at (float): The local time the request was sent, from `time.time()`.
+            received_at (Optional[float]): The local time the response was received. Defaults to now.
+
+        Returns:
+            bool: True if the server time was used.
+        """
+        if received_at is None:
+            received_at = time.time()
+        if not 0 <= received_at - sent_at <= self.max_rtt:
+            return False
+        if isinstance(server_time, datetime.datetime):
+            server_time = server_time.timestamp()
+        # The server time is truncated, so on average it is half a second behind.
+        offset = server_time + 0.5 - (sent_at + received_at) / 2
+        if self.samples:
+            self.offset += self.alpha * (offset - self.offset)
+        else:
+            self.offset = offset
+        self.samples += 1
+        self.last_observed = received_at
+        _LOGGER.debug("Server clock offset %.3fs from sample %.3fs", self.offset, offset)
+        return True
+
+    def observe_response(self, response: Response, sent_at: float, received_at: Optional[float] = None) -> bool:
+        """Add the server time of the `Date` header of a response to the estimate.
+
+        Args:
+            response (Response): The response.
+            sent_at (float): The local time the request was sent, from `time.time()`.
+            received_at (Optional[float]): The local time the response was received. Defaults to now.
+
+        Returns:
+            bool: True if the response had a valid `Date` header that was used.
+        """
+        date = response.headers.get("date")
+        if not date:
+            return False
+        try:
+            server_time = parsedate_to_datetime(date)
+        except (TypeError, ValueError):
+            return False
+        if server_time.tzinfo is None:
+            return False
+        return self.observe(server_time, sent_at, received_at)
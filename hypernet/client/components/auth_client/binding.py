@@ -1,6 +1,7 @@
 from typing import Optional
 
 from hypernet.client.base import BaseClient
+from hypernet.client.deadline import request_deadline
 from hypernet.client.routes import BINDING_BASE_API_URL
 
 from hypernet.models.lab.game_role import GameRole, GameRoleId
@@ -35,16 +36,19 @@ class AuthBindingClient(BaseClient):
         self,
         binding_token: str,
         player_id: Optional[int] = None,
+        budget: Optional[float] = None,
     ) -> Optional[GameRoleId]:
         """
         根据玩家 ID 和绑定令牌获取角色 ID。
 
         :param binding_token: 绑定令牌，用于标识用户的绑定信息。
         :param player_id: 玩家 ID，可选参数。如果未提供，则使用默认的 player_id。
+        :param budget: 整个流程的总耗时上限（秒），可选参数。超出后剩余的请求不再发送并抛出 TimedOut。
         :return: 一个 GameRoleId 对象，包含角色 ID、频道 ID 和服务器 ID。如果未找到匹配的角色，返回 None。
         """
         player_id = player_id or self.player_id
-        game_accounts = await self.get_game_accounts_by_binding_token(binding_token)
+        with request_deadline(budget):
+            game_accounts = await self.get_game_accounts_by_binding_token(binding_token)
         for account in game_accounts:
             for bind in account.bindingList:
                 for role in bind.roles:
@@ -1,3 +1,4 @@
+import hashlib
 from typing import Optional
 
 from hypernet.client.base import BaseClient
@@ -5,12 +6,15 @@ from hypernet.client.base import BaseClient
 __all__ = ("AuthOAuthClient",)
 
 from hypernet.client.cookies import CookiesModel
+from hypernet.client.deadline import request_deadline
 from hypernet.client.routes import AS_BASE_API_URL, BASE_API_URL
 from hypernet.errors import BadRequest
 from hypernet.models.lab.account import AccountInfo
 from hypernet.utils.ds import generate_signature
 from hypernet.utils.enums import AppCode, Region
 
+CRED_STATE_TTL = 10 * 60
+
 
 class AuthOAuthClient(BaseClient):
     """
@@ -128,17 +132,36 @@ class AuthOAuthClient(BaseClient):
     async def refresh_cookies_by_hg_token(
         self,
         hg_token: Optional[str] = None,
+        force: bool = False,
+        budget: Optional[float] = None,
     ) -> CookiesModel:
         """
         根据 hg_token 刷新 cookies。
 
+        如果设置了 state_backend，刷新得到的凭证会与其他进程共享，同一时间只有一个进程刷新同一个 hg_token。
+
         :param hg_token: 用户的 hg_token，可选参数。如果未提供，将使用默认的 cookies.hg_token。
+        :param force: 是否忽略其他进程共享的凭证，强制刷新，默认为 False。
+        :param budget: 整个刷新流程的总耗时上限（秒），可选参数。超出后剩余的请求不再发送并抛出 TimedOut。
         :return: CookiesModel 对象，包含刷新后的 cookies 信息。
         """
+        with request_deadline(budget):
+            return await self._refresh_cookies_by_hg_token(hg_token, force)
+
+    async def _refresh_cookies_by_hg_token(self, hg_token: Optional[str], force: bool) -> CookiesModel:
         hg_token = hg_token or self.cookies.hg_token
-        resp = await self.get_grant_code_by_hg_token(hg_token=hg_token)
-        grant_code = resp["code"]
-        cookies = await self.get_cred_by_grant_code(grant_code)
+        if self.state_backend is not None:
+            key = f"hypernet:cred:{self.region.value}:{hashlib.sha256(hg_token.encode()).hexdigest()}"
+            if force:
+                await self.state_backend.delete(key)
+            data = await self.state_backend.get_or_create(
+                key,
+                lambda: self._generate_cred_by_hg_token(hg_token),
+                ttl=CRED_STATE_TTL,
+            )
+            cookies = CookiesModel(**data)
+        else:
+            cookies = CookiesModel(**await self._generate_cred_by_hg_token(hg_token))
         cookies.hg_token = hg_token
         cookies.hg_id = self.cookies.hg_id
         cookies.lab_show_user_id = self.cookies.lab_show_user_id
@@ -150,6 +173,12 @@ class AuthOAuthClient(BaseClient):
             self.cookies.lab_show_user_id = cookies.lab_user_id
         return cookies
 
+    async def _generate_cred_by_hg_token(self, hg_token: str) -> dict:
+        resp = await self.get_grant_code_by_hg_token(hg_token=hg_token)
+        grant_code = resp["code"]
+        cookies = await self.get_cred_by_grant_code(grant_code)
+        return {"cred": cookies.cred, "lab_user_id": cookies.lab_user_id}
+
     async def get_binding_token_by_hg_token(
         self,
         hg_token: Optional[str] = None,
@@ -1,16 +1,21 @@
+import hashlib
 from typing import Optional, TYPE_CHECKING
 
 __all__ = ("EndfieldBattleChronicleClient",)
 
 from hypernet.client.base import BaseClient
+from hypernet.client.deadline import request_deadline
 from hypernet.errors import AccountNotFound
-from hypernet.models.endfield.chronicle.card import EndfieldCardDetail
-from hypernet.models.endfield.chronicle.notes import EndfieldNote
+from hypernet.models.endfield.chronicle.card import CardT, EndfieldCardDetail, EndfieldCardDetailResponse
+from hypernet.models.endfield.chronicle.notes import EndfieldNote, EndfieldNoteSkport
 from hypernet.utils.player import recognize_endfield_server
 
 if TYPE_CHECKING:
     from hypernet.models.lab.game_role import GameRole
 
+DEFAULT_ROLE_STATE_TTL = 60 * 60
+DEFAULT_ROLE_ENDPOINT = "endfield:default_role"
+
 
 class EndfieldBattleChronicleClient(BaseClient):
     """A client for retrieving data from Endfield's battle chronicle component.
@@ -19,12 +24,30 @@ class EndfieldBattleChronicleClient(BaseClient):
     including real-time notes, user statistics, and character information.
     """
 
+    def _get_default_role_key(self, cred: Optional[str]) -> str:
+        cred_hash = hashlib.sha256((cred or "").encode()).hexdigest()
+        return f"hypernet:default_role:{self.region.value}:{cred_hash}"
+
+    async def invalidate_account(self, cred: Optional[str] = None) -> None:
+        """Forget the cached errors, health and default role of a cred, for example after its user rebinds.
+
+        Args:
+            cred (Optional[str]): The cred. Defaults to self.cookies.cred if not provided.
+        """
+        cred = cred or self.cookies.cred
+        await super().invalidate_account(cred)
+        if cred is not None and self.state_backend is not None:
+            await self.state_backend.delete(self._get_default_role_key(cred))
+
     async def get_default_endfield_account_id(
         self,
         cred: Optional[str] = None,
     ) -> int:
         """Get the default Endfield account ID.
 
+        If the client has a state backend, the resolved ID is shared through it for an hour.
+        If the client has a negative cache, a missing default account is cached as well.
+
         Args:
             cred (Optional[str]): The cred cookie to use for the request. Defaults to self.cookies.cred if not provided.
 
@@ -34,14 +57,30 @@ class EndfieldBattleChronicleClient(BaseClient):
         Raises:
             AccountNotFound: If no default account is found.
         """
+        cred = cred or self.cookies.cred
+        if self.negative_cache is not None:
+            cached = self.negative_cache.get(cred, DEFAULT_ROLE_ENDPOINT)
+            if cached is not None:
+                raise cached
+        key = None
+        if self.state_backend is not None:
+            key = self._get_default_role_key(cred)
+            uid = await self.state_backend.get(key)
+            if uid is not None:
+                return uid
         players: list["GameRole"] = await self.get_endfield_accounts(cred=cred)
-        if not players:
-            raise AccountNotFound()
         for player in players:
             for bind in player.bindingList:
                 if role := bind.defaultRole:
+                    if key is not None:
+                        await self.state_backend.set(key, role.uid, ttl=DEFAULT_ROLE_STATE_TTL)
                     return role.uid
-        raise AccountNotFound()
+        exc = AccountNotFound()
+        if self.health is not None:
+            self.health.record_failure(cred, exc)
+        if self.negative_cache is not None:
+            self.negative_cache.record(cred, DEFAULT_ROLE_ENDPOINT, exc)
+        raise exc
 
     async def get_endfield_card_detail(
         self,
@@ -63,6 +102,33 @@ class EndfieldBattleChronicleClient(BaseClient):
         Returns:
             EndfieldCardDetail: The detailed information about the Endfield card.
 
+        Raises:
+            AccountNotFound: If the player ID or account ID is not provided or cannot be determined.
+        """
+        return await self.get_endfield_card(EndfieldCardDetail, cred=cred, player_id=player_id, account_id=account_id)
+
+    async def get_endfield_card(
+        self,
+        card_type: type[CardT],
+        cred: Optional[str] = None,
+        player_id: Optional[int] = None,
+        account_id: Optional[int] = None,
+    ) -> CardT:
+        """
+        Retrieve the parts of an Endfield card declared by the given model.
+
+        The response body is validated directly as `card_type`, so subtrees that the model
+        does not declare, such as the character list, are skipped without building Python objects.
+
+        Args:
+            card_type (type[CardT]): The model to validate the card as.
+            cred (Optional[str]): The cred cookie to use for the request. Defaults to self.cookies.cred if not provided.
+            player_id (Optional[int]): The player ID to use for the request. Defaults to self.player_id if not provided.
+            account_id (Optional[int]): The account ID to use for the request. Defaults to self.account_id if not provided.
+
+        Returns:
+            CardT: The validated card.
+
         Raises:
             AccountNotFound: If the player ID or account ID is not provided or cannot be determined.
         """
@@ -77,32 +143,43 @@ class EndfieldBattleChronicleClient(BaseClient):
             "serverId": server_id,
             "userId": account_id,
         }
-        req = await self.request_base_api(path, params=params, cred=cred)
-        return EndfieldCardDetail(**req["detail"], player_id=player_id)
+        req = await self.request_base_api(
+            path,
+            params=params,
+            cred=cred,
+            data_type=EndfieldCardDetailResponse[card_type],
+        )
+        card = req.detail
+        card.player_id = player_id
+        return card
 
     async def get_endfield_notes_by_widget(
         self,
         cred: Optional[str] = None,
         request_player_id: Optional[bool] = True,
+        budget: Optional[float] = None,
     ) -> EndfieldNote:
         """Get Endfield's real-time notes.
 
         Args:
             cred (Optional[str]): The cred cookie to use for the request. Defaults to self.cookies.cred if not provided.
             request_player_id (Optional[bool]): Whether to request the player ID. Defaults to True.
+            budget (Optional[float]): The total time in seconds allowed for all requests of this call.
 
         Returns:
             EndfieldNote: The requested real-time notes.
 
         Raises:
             AccountNotFound: If no default account is found.
+            TimedOut: If the budget is spent.
         """
         self.region_specific(True)
         player_id = 0
-        if request_player_id:
-            player_id = await self.get_default_endfield_account_id(cred=cred)
         path = "game/endfield/statistic"
-        req = await self.request_base_api(path, cred=cred)
+        with request_deadline(budget):
+            if request_player_id:
+                player_id = await self.get_default_endfield_account_id(cred=cred)
+            req = await self.request_base_api(path, cred=cred)
         return EndfieldNote(**req["data"], player_id=player_id)
 
     async def get_endfield_notes(
@@ -129,5 +206,5 @@ class EndfieldBattleChronicleClient(BaseClient):
         Raises:
             AccountNotFound: If no default account or player ID is found.
         """
-        data = await self.get_endfield_card_detail(cred=cred, player_id=player_id, account_id=account_id)
+        data = await self.get_endfield_card(EndfieldNoteSkport, cred=cred, player_id=player_id, account_id=account_id)
         return EndfieldNote.from_skport(data)
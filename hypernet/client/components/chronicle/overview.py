@@ -0,0 +1,69 @@
+import asyncio
+from typing import Optional
+
+from hypernet.client.components.chronicle.endfield import EndfieldBattleChronicleClient
+from hypernet.client.components.daily import DailyRewardClient
+from hypernet.client.deadline import request_deadline
+from hypernet.errors import AccountNotFound
+from hypernet.models.endfield.chronicle.notes import EndfieldNote
+from hypernet.models.endfield.chronicle.overview import EndfieldOverview
+from hypernet.utils.enums import Game
+
+__all__ = ("EndfieldOverviewClient",)
+
+
+class EndfieldOverviewClient(DailyRewardClient, EndfieldBattleChronicleClient):
+    """A client for retrieving several Endfield data objects for a player in one call."""
+
+    async def get_endfield_overview(
+        self,
+        cred: Optional[str] = None,
+        player_id: Optional[int] = None,
+        account_id: Optional[int] = None,
+        budget: Optional[float] = None,
+    ) -> EndfieldOverview:
+        """Get the card detail, real-time notes and daily reward info of a player concurrently.
+
+        The sign token and device ID are prepared once for all requests, and the notes are derived
+        from the card detail instead of being requested again. A failing part does not fail the others,
+        its exception is recorded in `EndfieldOverview.errors` instead.
+
+        Args:
+            cred (Optional[str]): The cred cookie to use for the request. Defaults to self.cookies.cred if not provided.
+            player_id (Optional[int]): The player ID to use for the request. Defaults to self.player_id if not provided.
+            account_id (Optional[int]): The account ID to use for the request. Defaults to self.account_id if not provided.
+            budget (Optional[float]): The total time in seconds allowed for all requests of this call.
+
+        Returns:
+            EndfieldOverview: The player overview.
+
+        Raises:
+            AccountNotFound: If the player ID is not provided or cannot be determined.
+        """
+        player_id = player_id or self.player_id
+        if not player_id:
+            raise AccountNotFound
+        with request_deadline(budget):
+            if await self.get_sign_token(cred=cred or self.cookies.cred) is not None:
+                await self.get_device_id(cred or self.cookies.cred)
+            results = await asyncio.gather(
+                self.get_endfield_card_detail(cred=cred, player_id=player_id, account_id=account_id),
+                self.get_reward_info(cred=cred, player_id=player_id, game=Game.ENDFIELD),
+                return_exceptions=True,
+            )
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+        card, reward_info = results
+        overview = EndfieldOverview(player_id=player_id, errors={})
+        if isinstance(card, Exception):
+            overview.errors["card"] = card
+            overview.errors["notes"] = card
+        else:
+            overview.card = card
+            overview.notes = EndfieldNote.from_skport(card)
+        if isinstance(reward_info, Exception):
+            overview.errors["reward_info"] = reward_info
+        else:
+            overview.reward_info = reward_info
+        return overview
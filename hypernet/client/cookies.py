@@ -1,10 +1,13 @@
 from http.cookiejar import CookieJar
 from http.cookies import SimpleCookie
-from typing import Optional, TypeVar
+from typing import Optional, TypeVar, Union
 
 from httpx import Cookies as _Cookies
+from httpx import Response
 from pydantic import BaseModel
 
+from hypernet.utils.cookies import parse_known_cookies
+from hypernet.utils.enums import Region
 from hypernet.utils.types import CookieTypes
 
 IntStr = TypeVar("IntStr", int, str)
@@ -12,35 +15,80 @@ IntStr = TypeVar("IntStr", int, str)
 __all__ = (
     "Cookies",
     "CookiesModel",
+    "Credential",
 )
 
 
 class Cookies(_Cookies):
-    """A wrapper around `httpx.Cookies` that provides additional functionality."""
+    """
+    A wrapper around `httpx.Cookies` that provides additional functionality.
+
+    Besides the cookie jar, the cookies keep an index from name to value, so looking up a cookie by name,
+    as the `cred` and other properties do on every request, does not scan the jar. The index is updated by
+    the methods of the cookies; call `reindex` after changing `jar` directly.
+    """
 
     jar: CookieJar
+    _index: dict[str, str]
 
     def __init__(self, cookies: Optional[CookieTypes] = None):  # skipcq: PYL-W0231
         self.jar = CookieJar()
+        self._index = {}
+        if isinstance(cookies, Credential):
+            cookies = cookies.to_dict()
         if cookies is None or isinstance(cookies, dict):
             if isinstance(cookies, dict):
                 for key, value in cookies.items():
-                    if isinstance(value, str):
-                        self.set(key, value)
-                    else:
-                        self.set(key, str(value))
+                    self.set(key, value if isinstance(value, str) else str(value))
         elif isinstance(cookies, list):
             for key, value in cookies:
                 self.set(key, value)
-        elif isinstance(cookies, Cookies):
+        elif isinstance(cookies, _Cookies):
             for cookie in cookies.jar:
                 self.jar.set_cookie(cookie)
+            self.reindex()
         elif isinstance(cookies, str):
             cookie = SimpleCookie(cookies)
             for key, value in cookie.items():
                 self.set(key, value.value)
         else:
             self.jar = cookies  # type: ignore
+            self.reindex()
+
+    def reindex(self) -> None:
+        """Rebuild the index from the jar. When several cookies have the same name, the last one wins."""
+        self._index = {cookie.name: cookie.value for cookie in self.jar}
+
+    def set(self, name: str, value: str, domain: str = "", path: str = "/") -> None:
+        """Set a cookie value by name. May optionally include domain and path."""
+        super().set(name, value, domain, path)
+        if domain or path != "/":
+            self.reindex()
+        else:
+            self._index[name] = value
+
+    def delete(self, name: str, domain: Optional[str] = None, path: Optional[str] = None) -> None:
+        """Delete a cookie by name. May optionally include domain and path."""
+        super().delete(name, domain, path)
+        self.reindex()
+
+    def clear(self, domain: Optional[str] = None, path: Optional[str] = None) -> None:
+        """Delete all cookies. Optionally include a domain and path to only delete a subset."""
+        super().clear(domain, path)
+        self.reindex()
+
+    def update(self, cookies: Optional[CookieTypes] = None) -> None:  # type: ignore
+        super().update(cookies)
+        self.reindex()
+
+    def extract_cookies(self, response: Response) -> None:
+        """Loads any cookies based on the response `Set-Cookie` headers."""
+        super().extract_cookies(response)
+        self.reindex()
+
+    def to_dict(self) -> dict[str, str]:
+        """Return the cookies as a dictionary of names and values."""
+        return dict(self._index)
 
     @property
     def hg_token(self) -> Optional[str]:
@@ -111,15 +159,14 @@ class Cookies(_Cookies):
         Get a cookie by name. May optionally include domain and path
         in order to specify exactly which cookie to retrieve.
         """
+        if domain is None and path is None:
+            return self._index.get(name, default)
         value = None
         for cookie in self.jar:
             if (
                 cookie.name == name
-                and domain is None
-                or cookie.domain == domain
-                and path is None
-                or cookie.path == path
-                and cookie.value
+                and (domain is None or cookie.domain == domain)
+                and (path is None or cookie.path == path)
             ):
                 value = cookie.value
         if value is None:
@@ -144,3 +191,121 @@ class CookiesModel(BaseModel, frozen=False):
     def to_json(self):
         """Return the cookies as a JSON string."""
         return self.json(exclude_defaults=True)
+
+
+def _to_int_str(value: Optional[IntStr]) -> Optional[IntStr]:
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    return value
+
+
+class Credential:
+    """
+    A compact record of the credentials of one account, for keeping very many accounts in memory.
+
+    It holds the same values as `CookiesModel`, plus the region and default role of the account, in slots
+    instead of a cookie jar or a model. Pass it as the cookies of a client or of `BaseClient.view`;
+    its region and player id are used unless others are given.
+
+    Attributes:
+        hg_token (Optional[str]): The hg_token cookie.
+        hg_id (Optional[IntStr]): The hg_id cookie.
+        cred (Optional[str]): The cred cookie.
+        lab_user_id (Optional[IntStr]): The lab_user_id cookie.
+        lab_show_user_id (Optional[IntStr]): The lab_show_user_id cookie.
+        region (Optional[Region]): The region of the account.
+        player_id (Optional[int]): The player id of the default role of the account.
+    """
+
+    __slots__ = ("hg_token", "hg_id", "cred", "lab_user_id", "lab_show_user_id", "region", "player_id")
+
+    COOKIE_KEYS = ("hg_token", "hg_id", "cred", "lab_user_id", "lab_show_user_id")
+    """The attributes that are cookies."""
+
+    def __init__(
+        self,
+        hg_token: Optional[str] = None,
+        hg_id: Optional[IntStr] = None,
+        cred: Optional[str] = None,
+        lab_user_id: Optional[IntStr] = None,
+        lab_show_user_id: Optional[IntStr] = None,
+        region: Optional[Region] = None,
+        player_id: Optional[int] = None,
+    ) -> None:
+        self.hg_token = hg_token
+        self.hg_id = hg_id
+        self.cred = cred
+        self.lab_user_id = lab_user_id
+        self.lab_show_user_id = lab_show_user_id
+        self.region = region
+        self.player_id = player_id
+
+    @classmethod
+    def from_cookies(
+        cls,
+        cookies: Union[str, CookieTypes, Cookies, CookiesModel],
+        region: Optional[Region] = None,
+        player_id: Optional[int] = None,
+    ) -> "Credential":
+        """Create a credential from cookies, a cookie string or a `CookiesModel`.
+
+        Args:
+            cookies (Union[str, CookieTypes, Cookies, CookiesModel]): The cookies.
+            region (Optional[Region]): The region of the account.
+            player_id (Optional[int]): The player id of the default role of the account.
+
+        Returns:
+            Credential: The credential.
+        """
+        if isinstance(cookies, (str, dict)):
+            # Fast path for bulk imports, without building a cookie jar.
+            values = parse_known_cookies(cookies) if isinstance(cookies, str) else cookies
+            return cls(
+                hg_token=values.get("hg_token"),
+                hg_id=_to_int_str(values.get("hg_id")),
+                cred=values.get("cred"),
+                lab_user_id=_to_int_str(values.get("lab_user_id")),
+                lab_show_user_id=_to_int_str(values.get("lab_show_user_id")),
+                region=region,
+                player_id=player_id,
+            )
+        if not isinstance(cookies, (Cookies, CookiesModel)):
+            cookies = Cookies(cookies)
+        return cls(
+            hg_token=cookies.hg_token,
+            hg_id=cookies.hg_id,
+            cred=cookies.cred,
+            lab_user_id=cookies.lab_user_id,
+            lab_show_user_id=cookies.lab_show_user_id,
+            region=region,
+            player_id=player_id,
+        )
+
+    def to_dict(self) -> dict[str, str]:
+        """Return the cookies that are set as a dictionary of strings."""
+        return {key: str(value) for key in self.COOKIE_KEYS if (value := getattr(self, key)) is not None}
+
+    def to_cookies(self) -> Cookies:
+        """Return the cookies as `Cookies`."""
+        return Cookies(self)
+
+    def to_model(self) -> CookiesModel:
+        """Return the cookies as a `CookiesModel`."""
+        return CookiesModel(**{key: getattr(self, key) for key in self.COOKIE_KEYS})
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Credential):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        # Never show the tokens, so that credentials can be logged.
+        return (
+            f"{type(self).__name__}(hg_id={self.hg_id!r}, lab_user_id={self.lab_user_id!r}, "
+            f"region={self.region!r}, player_id={self.player_id!r})"
+        )
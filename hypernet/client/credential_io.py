@@ -0,0 +1,340 @@
+"""Streaming import and export of account credentials in JSONL, CSV and plain cookie-string files."""
+
+import asyncio
+import csv
+import json
+import logging
+import os
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Callable, Optional, Union
+
+from hypernet.client.cookies import Credential
+from hypernet.utils.cookies import parse_known_cookies
+from hypernet.utils.enums import Region
+
+if TYPE_CHECKING:
+    from hypernet.client.base import BaseClient
+
+__all__ = (
+    "CREDENTIAL_FIELDS",
+    "CredentialImportReport",
+    "iter_credential_batches",
+    "iter_credentials",
+    "validate_credentials",
+    "write_credentials",
+)
+
+_LOGGER = logging.getLogger("HyperNet.CredentialIO")
+
+CREDENTIAL_FIELDS = ("hg_token", "hg_id", "cred", "lab_user_id", "lab_show_user_id", "region", "player_id")
+"""The columns of a credential file."""
+
+_FORMATS = {".jsonl": "jsonl", ".json": "jsonl", ".ndjson": "jsonl", ".csv": "csv", ".txt": "txt"}
+
+FileTypes = Union[str, os.PathLike, IO[str]]
+
+
+class CredentialImportReport:
+    """
+    The outcome of reading a credential file.
+
+    Args:
+        max_errors (int): The maximum number of errors kept, so that a broken file does not use unbounded memory.
+
+    Attributes:
+        loaded (int): The number of credentials read.
+        skipped (int): The number of malformed lines skipped.
+        errors (list[tuple[int, str]]): The line number and reason of the first `max_errors` skipped lines.
+    """
+
+    def __init__(self, max_errors: int = 1000) -> None:
+        self.max_errors = max_errors
+        self.loaded = 0
+        self.skipped = 0
+        self.errors: list[tuple[int, str]] = []
+
+    def add_error(self, line: int, reason: str) -> None:
+        """Record a skipped line."""
+        self.skipped += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line, reason))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(loaded={self.loaded}, skipped={self.skipped})"
+
+
+def _get_format(file: FileTypes, file_format: Optional[str]) -> str:
+    if file_format is not None:
+        if file_format not in ("jsonl", "csv", "txt"):
+            raise ValueError(f"Unknown credential file format {file_format!r}")
+        return file_format
+    if isinstance(file, (str, os.PathLike)):
+        suffix = Path(file).suffix.lower()
+        if suffix in _FORMATS:
+            return _FORMATS[suffix]
+    raise ValueError("Cannot infer the credential file format, pass file_format")
+
+
+@contextmanager
+def _open(file: FileTypes, mode: str) -> Iterator[IO[str]]:
+    if not isinstance(file, (str, os.PathLike)):
+        yield file
+        return
+    if mode == "r":
+        # Undecodable bytes become surrogates, so only their line is rejected instead of the whole file.
+        with open(file, encoding="utf-8", errors="surrogateescape", newline="") as opened:
+            yield opened
+        return
+    # The file contains credentials, so it is only readable by the owner.
+    fd = os.open(file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8", newline="") as opened:
+        yield opened
+
+
+def _check_text(text: str) -> None:
+    try:
+        text.encode("utf-8")
+    except UnicodeEncodeError:
+        raise ValueError("line is not valid UTF-8") from None
+
+
+def _load_row(row: Any, file_format: str) -> dict[str, Any]:
+    if isinstance(row, csv.Error):
+        raise row
+    if file_format == "csv":
+        _check_text("".join(value for value in row.values() if isinstance(value, str)))
+        return row
+    _check_text(row)
+    if file_format == "txt":
+        return {"cookie": row}
+    row = json.loads(row)
+    if isinstance(row, str):
+        return {"cookie": row}
+    if not isinstance(row, dict):
+        raise TypeError("line is not an object")
+    return row
+
+
+def _credential_from_row(row: dict[str, Any]) -> Credential:
+    cookie = row.get("cookie") or row.get("cookies")
+    if cookie and not isinstance(cookie, str):
+        raise ValueError("cookie is not a string")
+    values = parse_known_cookies(cookie) if cookie else {}
+    for key in Credential.COOKIE_KEYS:
+        value = row.get(key)
+        if value not in (None, ""):
+            values[key] = str(value)
+    credential = Credential.from_cookies(values)
+    if credential.cred is None and credential.hg_token is None:
+        raise ValueError("no cred or hg_token")
+    region = row.get("region")
+    if region not in (None, ""):
+        credential.region = Region(region)
+    player_id = row.get("player_id")
+    if player_id not in (None, ""):
+        credential.player_id = int(player_id)
+    return credential
+
+
+def _iter_rows(file: IO[str], file_format: str) -> Iterator[tuple[int, Any]]:
+    line_number = 0
+    if file_format == "csv":
+
+        def count_lines() -> Iterator[str]:
+            nonlocal line_number
+            for line in file:
+                line_number += 1
+                yield line
+
+        reader = csv.DictReader(count_lines())
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as exc:
+                # The reader continues with the next line, so only this row is skipped.
+                yield line_number, exc
+                continue
+            yield line_number, row
+    for line in file:
+        line_number += 1
+        stripped = line.strip()
+        if stripped and not stripped.startswith("#"):
+            yield line_number, stripped
+
+
+def iter_credentials(
+    file: FileTypes,
+    file_format: Optional[str] = None,
+    report: Optional[CredentialImportReport] = None,
+) -> Iterator[Credential]:
+    """Read credentials from a file one line at a time, skipping and reporting malformed lines.
+
+    Each line of a JSONL file is an object, and each row of a CSV file has a header, with the columns of
+    `CREDENTIAL_FIELDS` and optionally a `cookie` column holding a cookie string. Columns override the cookies
+    of the cookie string. Each line of a TXT file is a cookie string. Only the known cookies are parsed.
+    A line is malformed if it cannot be parsed or has neither a `cred` nor an `hg_token`.
+
+    Args:
+        file (FileTypes): The path of the file, or a text file object.
+        file_format (Optional[str]): "jsonl", "csv" or "txt". Inferred from the suffix of the path if not provided.
+        report (Optional[CredentialImportReport]): Collects the number of loaded and skipped lines and the errors.
+
+    Yields:
+        Credential: The credentials, in the order of the file.
+
+    Raises:
+        ValueError: If the format is unknown or cannot be inferred.
+    """
+    file_format = _get_format(file, file_format)
+    with _open(file, "r") as opened:
+        for number, row in _iter_rows(opened, file_format):
+            try:
+                credential = _credential_from_row(_load_row(row, file_format))
+            except (TypeError, ValueError, csv.Error) as exc:
+                _LOGGER.debug("Skipped line %d of the credential file: %s", number, exc)
+                if report is not None:
+                    report.add_error(number, str(exc))
+                continue
+            if report is not None:
+                report.loaded += 1
+            yield credential
+
+
+def iter_credential_batches(
+    file: FileTypes,
+    batch_size: int = 1000,
+    file_format: Optional[str] = None,
+    report: Optional[CredentialImportReport] = None,
+) -> Iterator[list[Credential]]:
+    """Read credentials from a file in batches of at most `batch_size`, see `iter_credentials`.
+
+    Args:
+        file (FileTypes): The path of the file, or a text file object.
+        batch_size (int): The maximum number of credentials in a batch.
+        file_format (Optional[str]): "jsonl", "csv" or "txt". Inferred from the suffix of the path if not provided.
+        report (Optional[CredentialImportReport]): Collects the number of loaded and skipped lines and the errors.
+
+    Yields:
+        list[Credential]: The batches of credentials.
+    """
+    batch = []
+    for credential in iter_credentials(file, file_format, report):
+        batch.append(credential)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _credential_to_row(credential: Credential) -> dict[str, Any]:
+    row: dict[str, Any] = credential.to_dict()
+    if credential.region is not None:
+        row["region"] = credential.region.value
+    if credential.player_id is not None:
+        row["player_id"] = credential.player_id
+    return row
+
+
+def write_credentials(
+    file: FileTypes,
+    credentials: Iterable[Credential],
+    file_format: Optional[str] = None,
+) -> int:
+    """Write credentials to a file one line at a time, in a format `iter_credentials` reads.
+
+    A new file is only readable by the owner, because it contains credentials. TXT files only hold the cookies.
+
+    Args:
+        file (FileTypes): The path of the file, or a text file object.
+        credentials (Iterable[Credential]): The credentials.
+        file_format (Optional[str]): "jsonl", "csv" or "txt". Inferred from the suffix of the path if not provided.
+
+    Returns:
+        int: The number of credentials written.
+
+    Raises:
+        ValueError: If the format is unknown or cannot be inferred.
+    """
+    file_format = _get_format(file, file_format)
+    count = 0
+    with _open(file, "w") as opened:
+        writer = None
+        if file_format == "csv":
+            writer = csv.DictWriter(opened, CREDENTIAL_FIELDS)
+            writer.writeheader()
+        for credential in credentials:
+            if writer is not None:
+                writer.writerow(_credential_to_row(credential))
+            elif file_format == "txt":
+                opened.write("; ".join(f"{key}={value}" for key, value in credential.to_dict().items()) + "\n")
+            else:
+                opened.write(json.dumps(_credential_to_row(credential), separators=(",", ":")) + "\n")
+            count += 1
+    return count
+
+
+async def _check_lab_user(client: "BaseClient") -> Any:
+    return await client.check_lab_user()  # type: ignore[attr-defined]
+
+
+async def _aiter(credentials: Union[Iterable[Credential], AsyncIterable[Credential]]) -> AsyncIterator[Credential]:
+    if isinstance(credentials, AsyncIterable):
+        async for credential in credentials:
+            yield credential
+    else:
+        for credential in credentials:
+            yield credential
+
+
+async def validate_credentials(
+    client: "BaseClient",
+    credentials: Union[Iterable[Credential], AsyncIterable[Credential]],
+    check: Optional[Callable[["BaseClient"], Awaitable[Any]]] = None,
+    concurrency: int = 16,
+) -> AsyncIterator[tuple[Credential, Optional[Exception]]]:
+    """Check credentials concurrently through views of a client.
+
+    At most `concurrency` checks run at a time and credentials are only read from `credentials` as checks finish,
+    so a file can be validated while it is read with `iter_credentials` without loading it into memory.
+
+    Args:
+        client (BaseClient): The client whose views send the requests.
+        credentials (Union[Iterable[Credential], AsyncIterable[Credential]]): The credentials.
+        check (Optional[Callable[[BaseClient], Awaitable[Any]]]): A coroutine function that raises if the view of
+            a credential does not work. Defaults to `LabClient.check_lab_user`.
+        concurrency (int): The maximum number of checks at a time.
+
+    Yields:
+        tuple[Credential, Optional[Exception]]: Each credential with the error of its check, or None if it works,
+            in the order the checks finish.
+    """
+    if check is None:
+        check = _check_lab_user
+
+    async def run(credential: Credential) -> tuple[Credential, Optional[Exception]]:
+        try:
+            await check(client.view(credential))
+        except Exception as exc:  # skipcq: PYL-W0703
+            return credential, exc
+        return credential, None
+
+    pending: set[asyncio.Task] = set()
+    try:
+        async for credential in _aiter(credentials):
+            pending.add(asyncio.create_task(run(credential)))
+            if len(pending) >= concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,70 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from httpx import Timeout
+
+__all__ = (
+    "get_remaining_time",
+    "request_deadline",
+    "shrink_timeout",
+)
+
+_DEADLINE: ContextVar[Optional[float]] = ContextVar("hypernet_request_deadline", default=None)
+
+
+@contextmanager
+def request_deadline(timeout: Optional[float]) -> Iterator[None]:
+    """Limit the total time spent on the requests made inside the block.
+
+    Every request made inside the block has its timeouts shrunk to the remaining budget,
+    and fails with `TimedOut` without being sent once the budget is spent.
+    A nested deadline can only shorten the enclosing one.
+
+    Args:
+        timeout (Optional[float]): The budget in seconds. None leaves the current deadline unchanged.
+    """
+    if timeout is None:
+        yield
+        return
+    deadline = time.monotonic() + timeout
+    current = _DEADLINE.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _DEADLINE.set(deadline)
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+def get_remaining_time() -> Optional[float]:
+    """Get the remaining budget of the current deadline in seconds, or None if there is no deadline."""
+    deadline = _DEADLINE.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def shrink_timeout(timeout: Timeout, remaining: float) -> Timeout:
+    """Shrink every phase of a timeout configuration to the remaining budget.
+
+    Args:
+        timeout (Timeout): The timeout configuration to shrink.
+        remaining (float): The remaining budget in seconds.
+
+    Returns:
+        Timeout: The shrunk timeout configuration.
+    """
+
+    def _shrink(value: Optional[float]) -> float:
+        return remaining if value is None else min(value, remaining)
+
+    return Timeout(
+        connect=_shrink(timeout.connect),
+        read=_shrink(timeout.read),
+        write=_shrink(timeout.write),
+        pool=_shrink(timeout.pool),
+    )
@@ -0,0 +1,270 @@
+"""A persistent pool of device IDs, assigned to accounts and replenished in the background."""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Awaitable
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from hypernet.errors import NetworkError
+from hypernet.utils.device_fp import SklandDeviceFP
+from hypernet.utils.executor import create_background_task
+
+__all__ = ("DeviceIDPool",)
+
+_LOGGER = logging.getLogger("HyperNet.DeviceIDPool")
+
+DeviceIDGenerator = Callable[[int], Awaitable[list[Any]]]
+
+
+async def _generate_device_ids(count: int) -> list[Any]:
+    return await SklandDeviceFP.get_device_ids(count, return_exceptions=True)
+
+
+class DeviceIDPool:
+    """
+    A pool of device IDs that are generated ahead of time and assigned to accounts.
+
+    Each account, identified by its cred, keeps the same device ID until `rotate` is called for it, for example
+    after an `InvalidDevice` error, so its requests do not alternate between devices. New accounts take a spare
+    ID from the pool. Whenever fewer than `low_watermark` spare IDs are left, the pool is refilled to `size` in
+    the background, so requests never wait for a fingerprint to be generated, except on a cold start with an
+    empty pool. With `path`, the spare and assigned IDs are saved to a file and loaded by `start`. Changes are
+    saved at most once per `save_delay` seconds in a worker thread, and by `stop`. Creds are only stored as hashes.
+
+    Args:
+        path (Optional[Union[str, os.PathLike]]): The file the pool is saved to.
+        size (int): The number of spare IDs to keep.
+        low_watermark (int): The number of spare IDs below which the pool is refilled.
+        max_age (Optional[float]): How long an ID is used before it is replaced, in seconds. Defaults to no limit.
+        max_assignments (int): The maximum number of assigned accounts. The least recently used are evicted.
+        generate (Optional[DeviceIDGenerator]): A coroutine function that generates the given number of IDs,
+            returning exceptions for the ones that failed. Defaults to `SklandDeviceFP.get_device_ids`.
+        save_delay (float): How long changes are collected before the pool is saved, in seconds.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, os.PathLike]] = None,
+        size: int = 16,
+        low_watermark: int = 4,
+        max_age: Optional[float] = None,
+        max_assignments: int = 100000,
+        generate: Optional[DeviceIDGenerator] = None,
+        save_delay: float = 1.0,
+    ) -> None:
+        self.path = None if path is None else Path(path)
+        self.size = size
+        self.low_watermark = low_watermark
+        self.max_age = max_age
+        self.max_assignments = max_assignments
+        self.generate = _generate_device_ids if generate is None else generate
+        self.save_delay = save_delay
+        self._spare: deque[tuple[str, float]] = deque()
+        self._assigned: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._refill: Optional[asyncio.Task] = None
+        self._saving: Optional[asyncio.Task] = None
+        self._dirty = False
+        self._write_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._spare)
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """The number of spare and assigned IDs and whether the pool is being refilled."""
+        return {
+            "spare": len(self._spare),
+            "assigned": len(self._assigned),
+            "refilling": self._refill is not None and not self._refill.done(),
+        }
+
+    @staticmethod
+    def get_key(cred: Optional[str]) -> str:
+        """Get the key an account is stored under."""
+        return hashlib.sha256(cred.encode()).hexdigest() if cred else ""
+
+    def _expired(self, created_at: float) -> bool:
+        return self.max_age is not None and created_at + self.max_age <= time.time()
+
+    def _take_spare(self) -> Optional[tuple[str, float]]:
+        while self._spare:
+            entry = self._spare.popleft()
+            if not self._expired(entry[1]):
+                return entry
+        return None
+
+    def _assign(self, key: str, entry: tuple[str, float]) -> None:
+        self._assigned[key] = entry
+        self._assigned.move_to_end(key)
+        while len(self._assigned) > self.max_assignments:
+            self._assigned.popitem(last=False)
+
+    async def get(self, cred: Optional[str] = None) -> str:
+        """Get the device ID of an account, assigning a spare one if it has none.
+
+        Args:
+            cred (Optional[str]): The cred of the account.
+
+        Returns:
+            str: The device ID.
+
+        Raises:
+            NetworkError: If the pool is empty and no device ID could be generated.
+        """
+        key = self.get_key(cred)
+        entry = self._assigned.get(key)
+        if entry is not None and not self._expired(entry[1]):
+            self._assigned.move_to_end(key)
+            return entry[0]
+        spare = self._take_spare()
+        if spare is None:
+            # Cold start: only happens when the pool is empty and was not started ahead of time.
+            await asyncio.shield(self.refill())
+            spare = self._take_spare()
+            if spare is None:
+                raise NetworkError("Failed to generate a device ID.")
+        self._assign(key, spare)
+        if len(self._spare) < self.low_watermark:
+            self.refill()
+        self._schedule_save()
+        return spare[0]
+
+    def rotate(self, cred: Optional[str] = None) -> bool:
+        """Discard the device ID of an account, so that its next request gets a new one.
+
+        Args:
+            cred (Optional[str]): The cred of the account.
+
+        Returns:
+            bool: True if the account had a device ID that was discarded.
+        """
+        if self._assigned.pop(self.get_key(cred), None) is None:
+            return False
+        _LOGGER.info("Rotated the device ID of an account, %d spare IDs left", len(self._spare))
+        if len(self._spare) < self.low_watermark:
+            self.refill()
+        self._schedule_save()
+        return True
+
+    def refill(self) -> asyncio.Task:
+        """Refill the pool to `size` spare IDs in the background, if it is not being refilled already.
+
+        Returns:
+            asyncio.Task: The task that refills the pool.
+        """
+        if self._refill is None or self._refill.done():
+            self._refill = create_background_task(self._do_refill())
+        return self._refill
+
+    async def _do_refill(self) -> None:
+        try:
+            count = self.size - len(self._spare)
+            if count <= 0:
+                return
+            now = time.time()
+            results = await self.generate(count)
+            for result in results:
+                if isinstance(result, BaseException):
+                    _LOGGER.warning("Failed to generate a device ID: %s", result)
+                else:
+                    self._spare.append((result, now))
+            self._schedule_save()
+        except Exception:  # skipcq: PYL-W0703
+            _LOGGER.exception("Failed to refill the device ID pool")
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the spare and assigned IDs with their wall-clock creation times."""
+        return {
+            "spare": [list(entry) for entry in self._spare],
+            "assigned": {key: list(entry) for key, entry in self._assigned.items()},
+        }
+
+    def load_dict(self, data: dict[str, Any]) -> None:
+        """Restore IDs serialized with `to_dict`, skipping the ones that are too old."""
+        for device_id, created_at in data.get("spare", []):
+            if not self._expired(created_at):
+                self._spare.append((device_id, created_at))
+        for key, (device_id, created_at) in data.get("assigned", {}).items():
+            if key not in self._assigned and not self._expired(created_at):
+                self._assign(key, (device_id, created_at))
+
+    def _write(self, path: Path, data: dict[str, Any]) -> None:
+        with self._write_lock:
+            temp_path = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            temp_path.replace(path)
+
+    def save(self) -> None:
+        """Save the pool to `path` now, replacing the file atomically. Does nothing without a path."""
+        if self.path is None:
+            return
+        self._dirty = False
+        self._write(self.path, self.to_dict())
+
+    def _schedule_save(self) -> None:
+        if self.path is None:
+            return
+        self._dirty = True
+        if self._saving is None or self._saving.done():
+            self._saving = create_background_task(self._save_later())
+
+    async def _save_later(self) -> None:
+        await asyncio.sleep(self.save_delay)
+        while self._dirty and self.path is not None:
+            self._dirty = False
+            try:
+                # The pool is serialized on the event loop, where it is changed, and written in a thread.
+                await asyncio.to_thread(self._write, self.path, self.to_dict())
+            except OSError:
+                _LOGGER.exception("Failed to save the device ID pool")
+
+    def load(self) -> bool:
+        """Load the pool from `path`.
+
+        Returns:
+            bool: False if there is no path, or the file does not exist or is not a valid pool.
+        """
+        if self.path is None:
+            return False
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict):
+            return False
+        self.load_dict(data)
+        return True
+
+    async def start(self) -> None:
+        """Load the pool from `path` and refill it in the background."""
+        self.load()
+        if len(self._spare) < self.size:
+            self.refill()
+
+    async def stop(self) -> None:
+        """Stop refilling the pool and save it."""
+        for task in (self._refill, self._saving):
+            if task is not None and not task.done():
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        # A write already running in a thread holds the lock, so this one replaces the file last.
+        self.save()
+
+    async def __aenter__(self) -> "DeviceIDPool":  # noqa: PYI034 typing.Self needs Python 3.11
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
@@ -2,6 +2,7 @@ from typing import Optional
 
 from hypernet.client.components.auth import AuthClient
 from hypernet.client.components.chronicle.endfield import EndfieldBattleChronicleClient
+from hypernet.client.components.chronicle.overview import EndfieldOverviewClient
 from hypernet.client.components.daily import DailyRewardClient
 from hypernet.client.components.lab import LabClient
 from hypernet.utils.enums import Game
@@ -11,6 +12,7 @@ __all__ = ("EndfieldClient",)
 
 class EndfieldClient(
     AuthClient,
+    EndfieldOverviewClient,
     DailyRewardClient,
     EndfieldBattleChronicleClient,
     LabClient,
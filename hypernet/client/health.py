@@ -0,0 +1,217 @@
+import asyncio
+import time
+from collections import Counter
+from collections.abc import Awaitable, Iterable
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from hypernet.errors import InvalidCookies, InvalidTokens, NeedChallenge
+
+__all__ = (
+    "AccountHealth",
+    "AccountHealthTracker",
+)
+
+_REVALIDATING: ContextVar[Optional[str]] = ContextVar("hypernet_revalidating_account", default=None)
+
+# Only errors that mean the cred itself is rejected or under risk control count by default. A missing game
+# account is not a fault of the cred, and an invalid device is fixed by rotating the device ID.
+DEFAULT_ERROR_TYPES: tuple[type[Exception], ...] = (InvalidCookies, InvalidTokens, NeedChallenge)
+
+
+class AccountHealth:
+    """
+    The health of one account.
+
+    Attributes:
+        key (str): The key of the account, usually its cred.
+        failures (Counter[str]): The number of tracked failures per error class name.
+        consecutive_failures (int): The number of tracked failures since the last success.
+        quarantines (int): The number of times the account was quarantined since the last success.
+        quarantined_until (float): The wall-clock time the current quarantine ends, 0 if not quarantined.
+        last_error (Optional[Exception]): The last tracked failure.
+    """
+
+    __slots__ = ("key", "failures", "consecutive_failures", "quarantines", "quarantined_until", "last_error")
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.failures: Counter[str] = Counter()
+        self.consecutive_failures = 0
+        self.quarantines = 0
+        self.quarantined_until = 0.0
+        self.last_error: Optional[Exception] = None
+
+    @property
+    def quarantined(self) -> bool:
+        """Whether the account is in quarantine."""
+        return self.quarantined_until > time.time()
+
+    @property
+    def score(self) -> float:
+        """A score between 0 and 1, where 1 is healthy and 0 is quarantined."""
+        if self.quarantined:
+            return 0.0
+        return 1.0 / (1 + self.consecutive_failures)
+
+
+class AccountHealthTracker:
+    """
+    A tracker that quarantines accounts whose requests keep failing with account errors.
+
+    After `threshold` consecutive failures of one of `error_types`, the account is quarantined for
+    `base_quarantine` seconds, doubling with each further quarantine up to `max_quarantine`.
+    A success resets the account. When a quarantine ends and `revalidate` is set, it is awaited
+    before the account is used again; a falsy result starts the next, longer quarantine.
+
+    Args:
+        error_types (tuple[type[Exception], ...]): The errors that count as failures of the account.
+        threshold (int): The number of consecutive failures that starts a quarantine.
+        base_quarantine (float): The length of the first quarantine, in seconds.
+        max_quarantine (float): The maximum length of a quarantine, in seconds.
+        revalidate (Optional[Callable[[str], Awaitable[bool]]]): A coroutine function that checks
+            whether a quarantined account works again.
+    """
+
+    def __init__(
+        self,
+        error_types: tuple[type[Exception], ...] = DEFAULT_ERROR_TYPES,
+        threshold: int = 3,
+        base_quarantine: float = 60.0,
+        max_quarantine: float = 24 * 60 * 60,
+        revalidate: Optional[Callable[[str], Awaitable[bool]]] = None,
+    ) -> None:
+        self.error_types = error_types
+        self.threshold = threshold
+        self.base_quarantine = base_quarantine
+        self.max_quarantine = max_quarantine
+        self.revalidate = revalidate
+        self._accounts: dict[str, AccountHealth] = {}
+        self._revalidations: dict[str, asyncio.Future] = {}
+
+    def get(self, key: str) -> AccountHealth:
+        """Get the health of an account."""
+        health = self._accounts.get(key)
+        if health is None:
+            health = self._accounts[key] = AccountHealth(key)
+        return health
+
+    def reset(self, key: str) -> None:
+        """Forget the health of an account, for example after its cookies were replaced."""
+        self._accounts.pop(key, None)
+
+    def record_success(self, key: str) -> None:
+        """Record a successful request of an account."""
+        if _REVALIDATING.get() == key:
+            return
+        health = self._accounts.get(key)
+        if health is not None and (health.consecutive_failures or health.quarantines):
+            health.consecutive_failures = 0
+            health.quarantines = 0
+            health.quarantined_until = 0.0
+
+    def record_failure(self, key: str, exc: Exception) -> bool:
+        """Record a failed request of an account.
+
+        Args:
+            key (str): The key of the account.
+            exc (Exception): The error of the request.
+
+        Returns:
+            bool: True if the error counts as a failure of the account.
+        """
+        if not isinstance(exc, self.error_types) or _REVALIDATING.get() == key:
+            return False
+        health = self.get(key)
+        health.failures[type(exc).__name__] += 1
+        health.consecutive_failures += 1
+        health.last_error = exc
+        if health.consecutive_failures >= self.threshold:
+            self._quarantine(health)
+        return True
+
+    def _quarantine(self, health: AccountHealth) -> None:
+        duration = min(self.base_quarantine * 2**health.quarantines, self.max_quarantine)
+        health.quarantines += 1
+        health.quarantined_until = time.time() + duration
+
+    def is_quarantined(self, key: str) -> bool:
+        """Whether an account is in quarantine, without revalidating it."""
+        health = self._accounts.get(key)
+        return health is not None and health.quarantined
+
+    async def check(self, key: str) -> bool:
+        """Check whether an account may be used, revalidating it if its quarantine has ended.
+
+        Args:
+            key (str): The key of the account.
+
+        Returns:
+            bool: True if the account may be used.
+        """
+        health = self._accounts.get(key)
+        if health is None or not health.quarantines or _REVALIDATING.get() == key:
+            return True
+        if health.quarantined:
+            return False
+        if self.revalidate is None:
+            return True
+        future = self._revalidations.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._revalidate(health))
+            self._revalidations[key] = future
+            future.add_done_callback(lambda _: self._revalidations.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _revalidate(self, health: AccountHealth) -> bool:
+        token = _REVALIDATING.set(health.key)
+        try:
+            valid = await self.revalidate(health.key)
+        except Exception as exc:  # skipcq: PYL-W0703
+            health.last_error = exc
+            valid = False
+        finally:
+            _REVALIDATING.reset(token)
+        if valid:
+            self.record_success(health.key)
+        else:
+            self._quarantine(health)
+        return bool(valid)
+
+    def to_dict(self) -> dict[str, dict]:
+        """Serialize the accounts that are in quarantine."""
+        return {
+            key: {
+                "failures": dict(health.failures),
+                "consecutive_failures": health.consecutive_failures,
+                "quarantines": health.quarantines,
+                "quarantined_until": health.quarantined_until,
+            }
+            for key, health in self._accounts.items()
+            if health.quarantined
+        }
+
+    def load_dict(self, data: dict[str, dict]) -> None:
+        """Restore quarantines serialized with `to_dict`, skipping the ones that have ended since."""
+        now = time.time()
+        for key, item in data.items():
+            if item["quarantined_until"] <= now:
+                continue
+            health = self.get(key)
+            health.failures.update(item["failures"])
+            health.consecutive_failures = item["consecutive_failures"]
+            health.quarantines = item["quarantines"]
+            health.quarantined_until = item["quarantined_until"]
+
+    async def filter(self, keys: Iterable[str]) -> list[str]:
+        """Get the accounts that may be used, skipping quarantined ones.
+
+        Args:
+            keys (Iterable[str]): The keys of the accounts.
+
+        Returns:
+            list[str]: The keys of the accounts that may be used, in the given order.
+        """
+        keys = list(keys)
+        allowed = await asyncio.gather(*(self.check(key) for key in keys))
+        return [key for key, ok in zip(keys, allowed) if ok]
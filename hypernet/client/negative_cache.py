@@ -0,0 +1,121 @@
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Optional
+
+from httpx import URL
+
+from hypernet.errors import AccountNotFound, LabAccountNotFound, NotSupported
+
+__all__ = ("NegativeCache",)
+
+DEFAULT_NEGATIVE_TTLS: Mapping[type[Exception], float] = {
+    AccountNotFound: 5 * 60,
+    LabAccountNotFound: 10 * 60,
+    NotSupported: 60 * 60,
+}
+
+
+def _copy_error(exc: Exception) -> Exception:
+    # Errors such as BadRequest can not be rebuilt from their args, so the copy skips __init__.
+    copied = type(exc).__new__(type(exc), *exc.args)
+    copied.__dict__.update(exc.__dict__)
+    return copied
+
+
+class NegativeCache:
+    """
+    A cache of "no account", "not bound" and "not supported" results.
+
+    When a request of a cred fails with one of the cached error classes, the same request of the same cred
+    fails with that error again, without a round trip, until the time to live of the error class ends.
+    The time to live of an error is the one of its closest cached base class. Call `invalidate` with the
+    cred when its user binds or rebinds a game account.
+
+    Args:
+        ttls (Optional[Mapping[type[Exception], float]]): The time to live of each error class, in seconds.
+            Errors of other classes, or of classes with a time to live of 0, are not cached.
+        max_size (int): The maximum number of cached results. The least recently used are evicted first.
+    """
+
+    def __init__(self, ttls: Optional[Mapping[type[Exception], float]] = None, max_size: int = 10000) -> None:
+        self.ttls = dict(DEFAULT_NEGATIVE_TTLS if ttls is None else ttls)
+        self.max_size = max_size
+        self._entries: OrderedDict[tuple[str, str], tuple[Exception, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def get_endpoint(method: str, url: Any) -> str:
+        """Get the endpoint of a request, ignoring its query parameters."""
+        url = URL(str(url))
+        return f"{method.upper()} {url.host}{url.path}"
+
+    def get_ttl(self, exc: Exception) -> Optional[float]:
+        """Get the time to live of an error, or None if it is not cached."""
+        for cls in type(exc).__mro__:
+            ttl = self.ttls.get(cls)
+            if ttl is not None:
+                return ttl
+        return None
+
+    def get(self, cred: Optional[str], endpoint: str) -> Optional[Exception]:
+        """Get the cached error of an endpoint for a cred.
+
+        Args:
+            cred (Optional[str]): The cred.
+            endpoint (str): The endpoint, see `get_endpoint`.
+
+        Returns:
+            Optional[Exception]: A new copy of the cached error, so that raising it does not share a traceback
+                with other requests, or None if there is none.
+        """
+        key = (cred or "", endpoint)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        exc, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return _copy_error(exc)
+
+    def record(self, cred: Optional[str], endpoint: str, exc: Exception) -> bool:
+        """Cache the error of an endpoint for a cred if its class is cached.
+
+        Args:
+            cred (Optional[str]): The cred.
+            endpoint (str): The endpoint, see `get_endpoint`.
+            exc (Exception): The error.
+
+        Returns:
+            bool: True if the error was cached.
+        """
+        ttl = self.get_ttl(exc)
+        if not ttl:
+            return False
+        key = (cred or "", endpoint)
+        self._entries[key] = (exc, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, cred: Optional[str] = None, endpoint: Optional[str] = None) -> None:
+        """Forget cached errors, for example after a user rebinds a game account.
+
+        Args:
+            cred (Optional[str]): Only forget the errors of this cred.
+            endpoint (Optional[str]): Only forget the errors of this endpoint.
+        """
+        if cred is None and endpoint is None:
+            self._entries.clear()
+            return
+        for key in [
+            key
+            for key in self._entries
+            if (cred is None or key[0] == cred) and (endpoint is None or key[1] == endpoint)
+        ]:
+            del self._entries[key]
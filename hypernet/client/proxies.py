@@ -0,0 +1,250 @@
+"""An egress proxy pool with per-proxy health, load balancing and rate accounting."""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import deque
+from collections.abc import Iterable
+from typing import Callable, Optional
+
+from httpx import URL, AsyncBaseTransport, AsyncHTTPTransport, Request, Response, Timeout, TransportError
+
+__all__ = (
+    "ProxyPoolTransport",
+    "ProxyState",
+)
+
+_LOGGER = logging.getLogger("HyperNet.ProxyPool")
+
+
+def _redact(proxy: str) -> str:
+    url = URL(proxy)
+    return str(url.copy_with(username=None, password=None)) if url.userinfo else proxy
+
+
+class ProxyState:
+    """
+    The state of one proxy in a `ProxyPoolTransport`.
+
+    Attributes:
+        name (str): The URL of the proxy without credentials.
+        transport (AsyncBaseTransport): The transport that sends requests through the proxy.
+        in_flight (int): The number of requests currently sent through the proxy.
+        requests (int): The number of requests sent through the proxy.
+        failures (int): The number of requests that failed with a network error or timeout.
+        consecutive_failures (int): The number of failures since the last success.
+        ejections (int): The number of times the proxy was ejected since the last success.
+        ejected_until (float): The monotonic time the current ejection ends, 0 if not ejected.
+        throttled (int): The number of responses with status 429 received through the proxy.
+    """
+
+    __slots__ = (
+        "name",
+        "transport",
+        "in_flight",
+        "requests",
+        "failures",
+        "consecutive_failures",
+        "ejections",
+        "ejected_until",
+        "throttled",
+        "window",
+    )
+
+    def __init__(self, name: str, transport: AsyncBaseTransport) -> None:
+        self.name = name
+        self.transport = transport
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.throttled = 0
+        self.window: deque[float] = deque()
+
+    @property
+    def ejected(self) -> bool:
+        """Whether the proxy is ejected from the pool."""
+        return self.ejected_until > time.monotonic()
+
+    def get_rate(self, window: float) -> int:
+        """Get the number of requests sent through the proxy in the last `window` seconds."""
+        cutoff = time.monotonic() - window
+        while self.window and self.window[0] < cutoff:
+            self.window.popleft()
+        return len(self.window)
+
+    def record_request(self, window: float) -> None:
+        """Count a request sent through the proxy, forgetting the ones older than `window` seconds."""
+        self.requests += 1
+        self.window.append(time.monotonic())
+        self.get_rate(window)
+
+
+class ProxyPoolTransport(AsyncBaseTransport):
+    """
+    A transport that spreads requests over a pool of outbound proxies.
+
+    Each request is sent through one proxy, chosen round-robin or by the least number of requests in flight.
+    With `sticky`, the requests of one account, identified by its `cred` header, keep using the same proxy
+    while it is healthy. A proxy whose requests fail `max_failures` times in a row with a network error or
+    timeout is ejected for `eject_time` seconds, doubling with each further ejection up to `max_eject_time`.
+    When `rate_limit` is set, proxies that sent that many requests in the last `rate_window` seconds are only
+    used if all others are at their limit too. Use it as the transport of `BaseClient` with `proxy_pool`.
+
+    Args:
+        proxies (Iterable[str]): The URLs of the proxies.
+        strategy (str): "round_robin" or "least_loaded".
+        sticky (bool): Whether to keep the requests of one account on the same proxy.
+        sticky_header (str): The header that identifies the account of a request.
+        max_failures (int): The number of consecutive failures that ejects a proxy.
+        eject_time (float): The length of the first ejection, in seconds.
+        max_eject_time (float): The maximum length of an ejection, in seconds.
+        rate_limit (Optional[int]): The number of requests per `rate_window` a proxy should not exceed.
+        rate_window (float): The window of the rate accounting, in seconds.
+        transport_factory (Optional[Callable[[str], AsyncBaseTransport]]): Creates the transport of a proxy URL.
+            Defaults to an `AsyncHTTPTransport` with the proxy.
+    """
+
+    def __init__(
+        self,
+        proxies: Iterable[str],
+        strategy: str = "round_robin",
+        sticky: bool = False,
+        sticky_header: str = "cred",
+        max_failures: int = 3,
+        eject_time: float = 30.0,
+        max_eject_time: float = 600.0,
+        rate_limit: Optional[int] = None,
+        rate_window: float = 60.0,
+        transport_factory: Optional[Callable[[str], AsyncBaseTransport]] = None,
+    ) -> None:
+        if strategy not in ("round_robin", "least_loaded"):
+            raise ValueError(f"Unknown proxy selection strategy {strategy!r}")
+        if transport_factory is None:
+
+            def transport_factory(proxy: str) -> AsyncBaseTransport:
+                return AsyncHTTPTransport(proxy=proxy)
+
+        self.proxies = [ProxyState(_redact(proxy), transport_factory(proxy)) for proxy in proxies]
+        if not self.proxies:
+            raise ValueError("At least one proxy is required")
+        self.strategy = strategy
+        self.sticky = sticky
+        self.sticky_header = sticky_header
+        self.max_failures = max_failures
+        self.eject_time = eject_time
+        self.max_eject_time = max_eject_time
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self._next = 0
+
+    @property
+    def metrics(self) -> dict[str, dict]:
+        """The request, failure, throttle and rate counters of each proxy."""
+        return {
+            proxy.name: {
+                "requests": proxy.requests,
+                "failures": proxy.failures,
+                "throttled": proxy.throttled,
+                "in_flight": proxy.in_flight,
+                "rate": proxy.get_rate(self.rate_window),
+                "ejected": proxy.ejected,
+            }
+            for proxy in self.proxies
+        }
+
+    def select(self, request: Request) -> ProxyState:
+        """Choose the proxy to send a request through.
+
+        Args:
+            request (Request): The request.
+
+        Returns:
+            ProxyState: The chosen proxy.
+        """
+        candidates = [proxy for proxy in self.proxies if not proxy.ejected]
+        if not candidates:
+            # Fail open to the proxy that comes back first rather than failing every request.
+            return min(self.proxies, key=lambda proxy: proxy.ejected_until)
+        if self.rate_limit is not None:
+            candidates = [
+                proxy for proxy in candidates if proxy.get_rate(self.rate_window) < self.rate_limit
+            ] or candidates
+        key = request.headers.get(self.sticky_header) if self.sticky else None
+        if key is not None:
+            # Rendezvous hashing: an account only moves when its proxy is ejected or rate limited.
+            return max(
+                candidates,
+                key=lambda proxy: hashlib.md5(f"{key}:{proxy.name}".encode(), usedforsecurity=False).digest(),
+            )
+        if self.strategy == "least_loaded":
+            return min(candidates, key=lambda proxy: (proxy.in_flight, proxy.get_rate(self.rate_window)))
+        self._next += 1
+        return candidates[self._next % len(candidates)]
+
+    def _eject(self, proxy: ProxyState) -> None:
+        duration = min(self.eject_time * 2**proxy.ejections, self.max_eject_time)
+        proxy.ejections += 1
+        proxy.ejected_until = time.monotonic() + duration
+        # A failure right after the ejection ends ejects the proxy again.
+        proxy.consecutive_failures = self.max_failures - 1
+        _LOGGER.warning("Ejected proxy %s for %.0fs", proxy.name, duration)
+
+    def _record_failure(self, proxy: ProxyState) -> None:
+        proxy.failures += 1
+        proxy.consecutive_failures += 1
+        if proxy.consecutive_failures >= self.max_failures:
+            self._eject(proxy)
+
+    @staticmethod
+    def _record_success(proxy: ProxyState) -> None:
+        proxy.consecutive_failures = 0
+        proxy.ejections = 0
+        proxy.ejected_until = 0.0
+
+    async def handle_async_request(self, request: Request) -> Response:
+        proxy = self.select(request)
+        proxy.in_flight += 1
+        proxy.record_request(self.rate_window)
+        try:
+            response = await proxy.transport.handle_async_request(request)
+        except TransportError:
+            self._record_failure(proxy)
+            raise
+        finally:
+            proxy.in_flight -= 1
+        if response.status_code == 429:
+            proxy.throttled += 1
+        self._record_success(proxy)
+        return response
+
+    async def _check(self, proxy: ProxyState, url: str, timeout: float) -> bool:
+        request = Request("GET", url, extensions={"timeout": Timeout(timeout).as_dict()})
+        try:
+            response = await proxy.transport.handle_async_request(request)
+            await response.aclose()
+        except TransportError:
+            proxy.failures += 1
+            self._eject(proxy)
+            return False
+        self._record_success(proxy)
+        return True
+
+    async def check(self, url: str, timeout: float = 5.0) -> dict[str, bool]:
+        """Probe every proxy with a request, ejecting the ones that fail and restoring the ones that work.
+
+        Args:
+            url (str): The URL to request through each proxy.
+            timeout (float): The timeout of each probe, in seconds.
+
+        Returns:
+            dict[str, bool]: Whether each proxy works.
+        """
+        results = await asyncio.gather(*(self._check(proxy, url, timeout) for proxy in self.proxies))
+        return {proxy.name: result for proxy, result in zip(self.proxies, results)}
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(proxy.transport.aclose() for proxy in self.proxies))
@@ -0,0 +1,74 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from hypernet.errors import RegionNotSupported
+from hypernet.utils.enums import Game, Region
+from hypernet.utils.player import recognize_region
+
+__all__ = (
+    "get_request_region",
+    "request_region",
+    "resolve_region",
+)
+
+_REGION: ContextVar[Optional[Region]] = ContextVar("hypernet_request_region", default=None)
+
+
+def resolve_region(player_id: int, game: Game = Game.ENDFIELD) -> Region:
+    """Infer the region of a player ID.
+
+    Args:
+        player_id (int): The player ID.
+        game (Game): The game the player ID belongs to.
+
+    Returns:
+        Region: The region of the player ID.
+
+    Raises:
+        RegionNotSupported: If the region of the player ID cannot be recognized.
+    """
+    try:
+        region = recognize_region(player_id, game)
+    except ValueError:
+        region = None
+    if region is None:
+        raise RegionNotSupported(f"Cannot recognize the region of player id {player_id}.")
+    return region
+
+
+@contextmanager
+def request_region(
+    region: Optional[Region] = None,
+    player_id: Optional[int] = None,
+    game: Game = Game.ENDFIELD,
+) -> Iterator[None]:
+    """Override the region of the clients used inside the block.
+
+    The URLs, headers, app version and client type of every request made inside the block follow
+    the given region, so one client, with its connection pool and caches, serves both regions.
+
+    Args:
+        region (Optional[Region]): The region to use.
+        player_id (Optional[int]): A player ID to infer the region from if `region` is not given.
+        game (Game): The game the player ID belongs to.
+
+    Raises:
+        RegionNotSupported: If the region of the player ID cannot be recognized.
+    """
+    if region is None and player_id is not None:
+        region = resolve_region(player_id, game)
+    if region is None:
+        yield
+        return
+    token = _REGION.set(region)
+    try:
+        yield
+    finally:
+        _REGION.reset(token)
+
+
+def get_request_region() -> Optional[Region]:
+    """Get the region set with `request_region`, or None if it is not set."""
+    return _REGION.get()
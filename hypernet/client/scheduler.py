@@ -0,0 +1,139 @@
+import asyncio
+import enum as _enum
+from collections import OrderedDict, deque
+from collections.abc import Hashable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+__all__ = (
+    "Priority",
+    "RequestScheduler",
+    "request_priority",
+)
+
+_PRIORITY: ContextVar["Priority"] = ContextVar("hypernet_request_priority")
+_TENANT: ContextVar[Optional[Hashable]] = ContextVar("hypernet_request_tenant", default=None)
+
+
+class Priority(_enum.IntEnum):
+    """
+    Represents the priority class of a request. Lower values are served first.
+
+    Attributes:
+        INTERACTIVE (Priority): Requests made on behalf of a waiting user.
+        NORMAL (Priority): The default priority.
+        BATCH (Priority): Background jobs such as mass check-in.
+    """
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BATCH = 2
+
+
+@contextmanager
+def request_priority(priority: Priority, tenant: Optional[Hashable] = None) -> Iterator[None]:
+    """Set the priority class and tenant of the requests made inside the block.
+
+    Args:
+        priority (Priority): The priority class of the requests.
+        tenant (Optional[Hashable]): The key used for fair queuing. Defaults to the cred of each request.
+    """
+    priority_token = _PRIORITY.set(priority)
+    tenant_token = _TENANT.set(tenant)
+    try:
+        yield
+    finally:
+        _TENANT.reset(tenant_token)
+        _PRIORITY.reset(priority_token)
+
+
+class RequestScheduler:
+    """
+    A scheduler that limits concurrent requests and serves waiters by priority class.
+
+    Within a priority class, waiters are served round-robin per tenant, so a tenant
+    with thousands of queued requests cannot delay another tenant by more than one turn.
+
+    Args:
+        max_concurrency (int): The maximum number of requests in flight.
+    """
+
+    def __init__(self, max_concurrency: int = 10) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self._available = max_concurrency
+        self._waiting = 0
+        self._queues: dict[Priority, OrderedDict[Hashable, deque[asyncio.Future]]] = {
+            priority: OrderedDict() for priority in Priority
+        }
+
+    @property
+    def waiting(self) -> int:
+        """The number of requests waiting for a slot."""
+        return self._waiting
+
+    @property
+    def in_flight(self) -> int:
+        """The number of requests holding a slot."""
+        return self.max_concurrency - self._available
+
+    async def acquire(self, priority: Optional[Priority] = None, tenant: Optional[Hashable] = None) -> None:
+        """Wait for a request slot.
+
+        Args:
+            priority (Optional[Priority]): The priority class. Defaults to the one set by `request_priority`.
+            tenant (Optional[Hashable]): The key used for fair queuing when `request_priority` did not set one.
+        """
+        priority = _PRIORITY.get(Priority.NORMAL) if priority is None else priority
+        tenant = _TENANT.get() or tenant
+        if self._available > 0 and not self._waiting:
+            self._available -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].setdefault(tenant, deque()).append(future)
+        self._waiting += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                self._remove(priority, tenant, future)
+            raise
+
+    def release(self) -> None:
+        """Release a request slot, handing it to the next waiter if there is one."""
+        for queue in self._queues.values():
+            while queue:
+                tenant, waiters = next(iter(queue.items()))
+                future = waiters.popleft()
+                self._waiting -= 1
+                if waiters:
+                    queue.move_to_end(tenant)
+                else:
+                    del queue[tenant]
+                if not future.done():
+                    future.set_result(None)
+                    return
+        self._available += 1
+
+    def _remove(self, priority: Priority, tenant: Optional[Hashable], future: asyncio.Future) -> None:
+        waiters = self._queues[priority].get(tenant)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(future)
+        except ValueError:
+            return
+        self._waiting -= 1
+        if not waiters:
+            del self._queues[priority][tenant]
+
+    async def __aenter__(self) -> "RequestScheduler":  # noqa: PYI034 typing.Self needs Python 3.11
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.release()
@@ -0,0 +1,116 @@
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any, Optional
+
+from hypernet.utils.ds import SignTokenFetch, SignTokenManager
+from hypernet.utils.enums import Region
+
+__all__ = ("SignTokenRegistry",)
+
+
+class SignTokenRegistry:
+    """
+    A registry of sign tokens keyed by region, and by cred in the regions whose tokens belong to a cred.
+
+    Each token is kept by a `SignTokenManager`, which refreshes it ahead of expiry with one fetch at a time.
+    When more than `max_size` tokens are kept, the least recently used are evicted.
+
+    Args:
+        max_size (int): The maximum number of tokens kept.
+        ttl (float): The lifetime of a token, in seconds.
+        refresh_ahead (float): How long before expiry a used token is refreshed in the background, in seconds.
+        per_cred_regions (Iterable[Region]): The regions whose tokens are keyed by cred.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 5 * 60,
+        refresh_ahead: float = 60,
+        per_cred_regions: Iterable[Region] = (Region.CHINESE,),
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.per_cred_regions = frozenset(per_cred_regions)
+        self._managers: OrderedDict[tuple[str, Optional[str]], SignTokenManager] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._managers)
+
+    def get_key(self, region: Region, cred: Optional[str] = None) -> tuple[str, Optional[str]]:
+        """Get the key of the token of a region and cred."""
+        return region.value, cred if region in self.per_cred_regions else None
+
+    def get_manager(self, region: Region, cred: Optional[str] = None) -> SignTokenManager:
+        """Get the manager of the token of a region and cred, creating it if needed.
+
+        Args:
+            region (Region): The region.
+            cred (Optional[str]): The cred, ignored in regions whose tokens are not keyed by cred.
+
+        Returns:
+            SignTokenManager: The manager.
+        """
+        key = self.get_key(region, cred)
+        manager = self._managers.get(key)
+        if manager is None:
+            manager = self._managers[key] = SignTokenManager(None, self.ttl, self.refresh_ahead)
+            while len(self._managers) > self.max_size:
+                self._managers.popitem(last=False)
+        else:
+            self._managers.move_to_end(key)
+        return manager
+
+    async def get(
+        self,
+        region: Region,
+        fetch: SignTokenFetch,
+        cred: Optional[str] = None,
+        force: bool = False,
+    ) -> Optional[str]:
+        """Get the token of a region and cred.
+
+        Args:
+            region (Region): The region.
+            fetch (SignTokenFetch): The coroutine function that fetches a new token, called with `force`. It is
+                only used by this call and the refresh it starts, never kept, so the registry can be shared by
+                clients that are closed at different times.
+            cred (Optional[str]): The cred, ignored in regions whose tokens are not keyed by cred.
+            force (bool): Whether to fetch a new token even if the current one is valid.
+
+        Returns:
+            Optional[str]: The token.
+        """
+        return await self.get_manager(region, cred).get(force, fetch)
+
+    def invalidate(self, region: Optional[Region] = None, cred: Optional[str] = None) -> None:
+        """Forget tokens, for example after they were rejected.
+
+        Args:
+            region (Optional[Region]): Only forget the tokens of this region.
+            cred (Optional[str]): Only forget the tokens of this cred.
+        """
+        for key in [
+            key
+            for key in self._managers
+            if (region is None or key[0] == region.value) and (cred is None or key[1] == cred)
+        ]:
+            del self._managers[key]
+
+    def to_dict(self) -> list[dict[str, Any]]:
+        """Serialize the valid tokens with their wall-clock expiry times."""
+        return [
+            {"region": region, "cred": cred, "value": manager.token, "expires_at": manager.expires_at}
+            for (region, cred), manager in self._managers.items()
+            if manager.valid
+        ]
+
+    def load_dict(self, data: list[dict[str, Any]]) -> None:
+        """Restore tokens serialized with `to_dict`, skipping the ones that have expired since."""
+        now = time.time()
+        for item in data:
+            if item["expires_at"] > now:
+                manager = self.get_manager(Region(item["region"]), item["cred"])
+                manager.set(item["value"], item["expires_at"])
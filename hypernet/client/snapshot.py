@@ -0,0 +1,157 @@
+"""Warm-start snapshots of the state a client builds up while running."""
+
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+from hypernet.client.cookies import CookiesModel
+from hypernet.utils.device_fp import SklandDeviceFP
+from hypernet.utils.state import MemoryStateBackend
+
+if TYPE_CHECKING:
+    from hypernet.client.base import BaseClient
+
+__all__ = (
+    "SNAPSHOT_VERSION",
+    "dump_snapshot",
+    "load_snapshot",
+    "restore_snapshot",
+    "save_snapshot",
+)
+
+SNAPSHOT_VERSION = 2
+
+
+def _dump_cached(value: Optional[str], expiry: Optional[datetime]) -> Optional[dict[str, Any]]:
+    if not value or expiry is None or expiry <= datetime.now(timezone.utc):
+        return None
+    return {"value": value, "expires_at": expiry.timestamp()}
+
+
+def _load_cached(data: Optional[dict[str, Any]]) -> Optional[tuple[str, datetime]]:
+    if not data or data["expires_at"] <= time.time():
+        return None
+    return data["value"], datetime.fromtimestamp(data["expires_at"], tz=timezone.utc)
+
+
+def dump_snapshot(client: "BaseClient") -> dict[str, Any]:
+    """
+    Serialize the state of a client that is expensive to rebuild after a restart.
+
+    The snapshot holds the sign tokens and device ID with their expiry times, the cookies and
+    resolved account and role IDs of the client, the values of a `MemoryStateBackend` such as shared
+    creds and default roles, the learned latency of `AdaptiveTimeout` and the quarantined accounts
+    of `AccountHealthTracker`. All expiry times are wall-clock times.
+
+    Args:
+        client (BaseClient): The client to take the snapshot of.
+
+    Returns:
+        dict[str, Any]: The JSON-serializable snapshot.
+    """
+    device = SklandDeviceFP()
+    cookies = {key: client.cookies.get(key) for key in CookiesModel.model_fields}
+    snapshot: dict[str, Any] = {
+        "version": SNAPSHOT_VERSION,
+        "saved_at": time.time(),
+        "region": client.region.value,
+        "sign_tokens": client.sign_tokens.to_dict(),
+        "device_id": _dump_cached(device._cached_device_id, device._cache_expiry),
+        "cookies": {key: value for key, value in cookies.items() if value is not None},
+        "accounts": {
+            "hg_id": client.hg_id,
+            "account_id": client.account_id,
+            "account_show_id": client.account_show_id,
+            "player_id": client.player_id,
+        },
+    }
+    if isinstance(client.state_backend, MemoryStateBackend):
+        snapshot["state"] = client.state_backend.to_dict()
+    if client.adaptive_timeout is not None:
+        snapshot["latency"] = client.adaptive_timeout.to_dict()
+    if client.health is not None:
+        snapshot["health"] = client.health.to_dict()
+    return snapshot
+
+
+def load_snapshot(client: "BaseClient", snapshot: dict[str, Any]) -> bool:
+    """
+    Restore a snapshot taken with `dump_snapshot`, skipping the entries that have expired since.
+
+    Cookies and IDs are only restored if the client does not have them yet, and only if the snapshot
+    was taken for the same region and `hg_token`, so a snapshot never overrides the configuration.
+
+    Args:
+        client (BaseClient): The client to restore the snapshot into.
+        snapshot (dict[str, Any]): The snapshot.
+
+    Returns:
+        bool: False if the snapshot was taken by an incompatible version and nothing was restored.
+    """
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        return False
+
+    client.sign_tokens.load_dict(snapshot.get("sign_tokens", []))
+    if cached := _load_cached(snapshot.get("device_id")):
+        device = SklandDeviceFP()
+        device._cached_device_id, device._cache_expiry = cached
+
+    cookies = snapshot.get("cookies", {})
+    hg_token = client.cookies.hg_token
+    if snapshot.get("region") == client.region.value and (hg_token is None or hg_token == cookies.get("hg_token")):
+        for key, value in cookies.items():
+            if client.cookies.get(key) is None:
+                client.cookies.set(key, value)
+        for key, value in snapshot.get("accounts", {}).items():
+            if getattr(client, key) is None:
+                setattr(client, key, value)
+
+    if "state" in snapshot and isinstance(client.state_backend, MemoryStateBackend):
+        client.state_backend.load_dict(snapshot["state"])
+    if "latency" in snapshot and client.adaptive_timeout is not None:
+        client.adaptive_timeout.load_dict(snapshot["latency"])
+    if "health" in snapshot and client.health is not None:
+        client.health.load_dict(snapshot["health"])
+    return True
+
+
+def save_snapshot(client: "BaseClient", path: Union[str, os.PathLike]) -> None:
+    """
+    Save a snapshot of a client to a file.
+
+    The file is replaced atomically and is only readable by the owner, because it contains credentials.
+
+    Args:
+        client (BaseClient): The client to take the snapshot of.
+        path (Union[str, os.PathLike]): The path of the file.
+    """
+    path = Path(path)
+    temp_path = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        json.dump(dump_snapshot(client), file)
+    temp_path.replace(path)
+
+
+def restore_snapshot(client: "BaseClient", path: Union[str, os.PathLike]) -> bool:
+    """
+    Restore a snapshot of a client from a file saved with `save_snapshot`.
+
+    Args:
+        client (BaseClient): The client to restore the snapshot into.
+        path (Union[str, os.PathLike]): The path of the file.
+
+    Returns:
+        bool: False if the file does not exist, is not a valid snapshot or was saved by an incompatible version.
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            snapshot = json.load(file)
+    except (OSError, ValueError):
+        return False
+    if not isinstance(snapshot, dict):
+        return False
+    return load_snapshot(client, snapshot)
@@ -0,0 +1,147 @@
+import math
+from typing import Any, Optional
+
+from httpx import URL, Timeout
+
+__all__ = (
+    "AdaptiveTimeout",
+    "LatencyHistogram",
+)
+
+
+class LatencyHistogram:
+    """
+    A streaming latency histogram with logarithmic buckets that slowly forgets old samples.
+
+    Bucket `i` holds latencies around `min_latency * growth ** i`, so quantiles are accurate
+    to within the growth factor. Once the total weight reaches `max_weight`, all buckets are
+    halved, which keeps the quantiles following the recent latency.
+
+    Args:
+        min_latency (float): The latency of the first bucket, in seconds.
+        max_latency (float): The latency of the last bucket, in seconds.
+        growth (float): The ratio between the latencies of two adjacent buckets.
+        max_weight (float): The total weight at which all buckets are halved.
+    """
+
+    __slots__ = ("min_latency", "growth", "max_weight", "buckets", "count")
+
+    def __init__(
+        self,
+        min_latency: float = 0.001,
+        max_latency: float = 120.0,
+        growth: float = 1.1,
+        max_weight: float = 1000.0,
+    ) -> None:
+        self.min_latency = min_latency
+        self.growth = growth
+        self.max_weight = max_weight
+        self.buckets = [0.0] * (math.ceil(math.log(max_latency / min_latency, growth)) + 1)
+        self.count = 0.0
+
+    def observe(self, latency: float) -> None:
+        """Add a latency sample, in seconds."""
+        if latency <= self.min_latency:
+            index = 0
+        else:
+            index = min(int(math.log(latency / self.min_latency, self.growth)) + 1, len(self.buckets) - 1)
+        self.buckets[index] += 1
+        self.count += 1
+        if self.count >= self.max_weight:
+            self.buckets = [weight / 2 for weight in self.buckets]
+            self.count /= 2
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Get the latency below which a fraction `q` of the samples fall, or None if there are no samples."""
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0.0
+        for index, weight in enumerate(self.buckets):
+            cumulative += weight
+            if cumulative >= target:
+                return self.min_latency * self.growth**index
+        return self.min_latency * self.growth ** (len(self.buckets) - 1)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the samples of the histogram."""
+        return {"buckets": self.buckets, "count": self.count}
+
+    def load_dict(self, data: dict[str, Any]) -> None:
+        """Restore samples serialized with `to_dict`, ignoring them if the bucket layout differs."""
+        if len(data["buckets"]) == len(self.buckets):
+            self.buckets = [float(weight) for weight in data["buckets"]]
+            self.count = float(data["count"])
+
+
+class AdaptiveTimeout:
+    """
+    Per-route read timeouts learned from observed latency.
+
+    Each route, the method plus host and path of a request, keeps a `LatencyHistogram`.
+    Once a route has `min_samples` samples, its read timeout is the `quantile` latency
+    times `multiplier`, clamped to `[min_timeout, max_timeout]`. A timed out request counts
+    as a sample of its full timeout, so the timeout grows again when a route slows down.
+
+    Args:
+        quantile (float): The latency quantile that the timeout is based on.
+        multiplier (float): The factor applied to the quantile latency.
+        min_timeout (float): The lower bound of the read timeout, in seconds.
+        max_timeout (float): The upper bound of the read timeout, in seconds.
+        min_samples (int): The number of samples a route needs before its timeout is adapted.
+    """
+
+    def __init__(
+        self,
+        quantile: float = 0.99,
+        multiplier: float = 2.0,
+        min_timeout: float = 1.0,
+        max_timeout: float = 30.0,
+        min_samples: int = 20,
+    ) -> None:
+        self.quantile = quantile
+        self.multiplier = multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_samples = min_samples
+        self.routes: dict[str, LatencyHistogram] = {}
+
+    @staticmethod
+    def get_route(method: str, url: Any) -> str:
+        """Get the route of a request, ignoring its query parameters."""
+        url = URL(str(url))
+        return f"{method.upper()} {url.host}{url.path}"
+
+    def observe(self, route: str, latency: float) -> None:
+        """Add a latency sample of a route, in seconds."""
+        histogram = self.routes.get(route)
+        if histogram is None:
+            histogram = self.routes[route] = LatencyHistogram()
+        histogram.observe(latency)
+
+    def get_read_timeout(self, route: str) -> Optional[float]:
+        """Get the learned read timeout of a route, or None if it does not have enough samples yet."""
+        histogram = self.routes.get(route)
+        if histogram is None or histogram.count < self.min_samples:
+            return None
+        latency = histogram.quantile(self.quantile)
+        return min(max(latency * self.multiplier, self.min_timeout), self.max_timeout)
+
+    def get_timeout(self, route: str, timeout: Timeout) -> Timeout:
+        """Replace the read timeout of a timeout configuration with the learned one of a route."""
+        read = self.get_read_timeout(route)
+        if read is None:
+            return timeout
+        return Timeout(connect=timeout.connect, read=read, write=timeout.write, pool=timeout.pool)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the learned latency of all routes."""
+        return {route: histogram.to_dict() for route, histogram in self.routes.items()}
+
+    def load_dict(self, data: dict[str, Any]) -> None:
+        """Restore learned latency serialized with `to_dict`."""
+        for route, histogram_data in data.items():
+            histogram = self.routes.get(route)
+            if histogram is None:
+                histogram = self.routes[route] = LatencyHistogram()
+            histogram.load_dict(histogram_data)
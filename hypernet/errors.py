@@ -241,8 +241,28 @@ class InvalidDevice(BadRequest):
     message = "Device id and fp are invalid."
 
 
+class AccountQuarantined(HyperNetException):
+    """Account is quarantined after repeated failures.
+
+    Attributes:
+        until (float): The wall-clock time the quarantine ends.
+        last_error (Optional[Exception]): The failure that started the quarantine.
+    """
+
+    def __init__(
+        self,
+        message: str = "Account is quarantined after repeated failures.",
+        until: float = 0.0,
+        last_error: Optional[Exception] = None,
+    ):
+        super().__init__(message)
+        self.until = until
+        self.last_error = last_error
+
+
 _TBR = type[BadRequest]
 _errors: dict[int, Union[_TBR, str, tuple[_TBR, Optional[str]]]] = {
+    5003: InvalidDevice,
     10000: InvalidTokens,
     10002: InvalidCookies,
     10003: TimedOut,
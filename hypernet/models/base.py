@@ -1,5 +1,5 @@
 import datetime
-from typing import TYPE_CHECKING, Annotated, Any, Optional, Union
+from typing import TYPE_CHECKING, Annotated, Any, Generic, Optional, TypeVar, Union
 
 from pydantic import (
     AfterValidator,
@@ -16,6 +16,8 @@ if TYPE_CHECKING:
 
 CN_TIMEZONE = datetime.timezone(datetime.timedelta(hours=8))
 
+DataT = TypeVar("DataT")
+
 
 class APIModel(BaseModel):
     """A Pydantic BaseModel class used for modeling JSON data returned by an API."""
@@ -23,6 +25,20 @@ class APIModel(BaseModel):
     model_config = ConfigDict(coerce_numbers_to_str=True, arbitrary_types_allowed=True)
 
 
+class APIResponse(BaseModel, Generic[DataT]):
+    """
+    The envelope of an API response, used to validate the data directly from the raw response body.
+
+    Fields of the data that are not part of `DataT` are skipped by the JSON parser
+    and never built into Python objects.
+    """
+
+    code: int = 0
+    message: Optional[str] = None
+    msg: Optional[str] = None
+    data: Optional[DataT] = None
+
+
 def Field(
     default: Any = PydanticUndefined,
     alias: Optional[str] = None,
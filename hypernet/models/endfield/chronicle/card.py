@@ -1,9 +1,11 @@
-from typing import Optional
+from typing import Generic, Optional, TypeVar
 
 from hypernet.models.base import APIModel, DateTimeField
 from hypernet.models.endfield.character import EndfieldCharacter
 from hypernet.models.endfield.chronicle.notes import EndfieldNoteSkport
 
+CardT = TypeVar("CardT", bound=EndfieldNoteSkport)
+
 
 class EndfieldCardDetailBaseInfoMainMission(APIModel):
     """
@@ -219,3 +221,14 @@ class EndfieldCardDetail(EndfieldNoteSkport):
     config: EndfieldCardDetailConfig
 
     currentTs: DateTimeField
+
+
+class EndfieldCardDetailResponse(APIModel, Generic[CardT]):
+    """
+    表示卡片详情接口返回的数据。
+
+    属性:
+        detail (CardT): 卡片详情，可以是只包含部分字段的模型，未声明的字段在解析时会被跳过。
+    """
+
+    detail: CardT
@@ -48,7 +48,7 @@ class EndfieldNoteSkportDungeon(APIModel):
 class EndfieldNoteSkport(APIModel):
     """Represents a Endfield Note Skport."""
 
-    player_id: int
+    player_id: int = 0
 
     bpSystem: EndfieldNoteSkportBp
     dailyMission: EndfieldNoteSkportDailyMission
@@ -0,0 +1,32 @@
+from typing import Optional
+
+from hypernet.models.base import APIModel
+from hypernet.models.endfield.chronicle.card import EndfieldCardDetail
+from hypernet.models.endfield.chronicle.notes import EndfieldNote
+from hypernet.models.lab.daily import DailyRewardInfo
+
+
+class EndfieldOverview(APIModel):
+    """
+    表示一次性获取的玩家概览。
+
+    属性:
+        player_id (int): 玩家 ID。
+        card (Optional[EndfieldCardDetail]): 卡片详情，获取失败时为 None。
+        notes (Optional[EndfieldNote]): 实时便笺，由卡片详情得出，获取失败时为 None。
+        reward_info (Optional[DailyRewardInfo]): 签到信息，获取失败时为 None。
+        errors (dict[str, Exception]): 各部分获取失败时的异常，键为字段名。
+    """
+
+    player_id: int
+
+    card: Optional[EndfieldCardDetail] = None
+    notes: Optional[EndfieldNote] = None
+    reward_info: Optional[DailyRewardInfo] = None
+
+    errors: dict[str, Exception] = {}
+
+    @property
+    def ok(self) -> bool:
+        """Whether every part was fetched successfully."""
+        return not self.errors
@@ -0,0 +1,262 @@
+"""A content-addressed local cache for the image assets referenced by API models."""
+
+import asyncio
+import hashlib
+import mmap
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from httpx import AsyncClient, HTTPError, TimeoutException
+from pydantic import BaseModel
+
+from hypernet.errors import BadRequest, NetworkError, TimedOut
+
+__all__ = (
+    "AssetCache",
+    "collect_asset_urls",
+)
+
+
+def _walk_asset_urls(value: Any, name: str, urls: dict[str, None]) -> None:
+    if isinstance(value, BaseModel):
+        for field_name in type(value).model_fields:
+            _walk_asset_urls(getattr(value, field_name), field_name, urls)
+    elif isinstance(value, Mapping):
+        for item in value.values():
+            _walk_asset_urls(item, name, urls)
+    elif isinstance(value, (list, tuple, set)):
+        for item in value:
+            _walk_asset_urls(item, name, urls)
+    elif (
+        isinstance(value, str) and name.lower().endswith(("url", "icon")) and value.startswith(("http://", "https://"))
+    ):
+        urls[value] = None
+
+
+def collect_asset_urls(*models: Any) -> list[str]:
+    """
+    Collect the asset URLs referenced by parsed models.
+
+    Every string field whose name ends with `url` or `icon` and whose value is an HTTP URL is collected,
+    for example `avatarUrl`, `avatarSqUrl`, `illustrationUrl` and `iconUrl`.
+
+    Args:
+        *models (Any): The models, or lists and dicts of models, to collect from.
+
+    Returns:
+        list[str]: The deduplicated URLs in the order they were found.
+    """
+    urls: dict[str, None] = {}
+    for model in models:
+        _walk_asset_urls(model, "", urls)
+    return list(urls)
+
+
+class AssetCache:
+    """
+    A content-addressed, size-limited local cache for assets such as avatars and icons.
+
+    Files are stored under their SHA-256 digest, so URLs serving the same content share one file.
+    When the cache grows beyond `max_size`, the least recently used files are evicted.
+
+    Args:
+        path (Union[str, os.PathLike]): The directory of the cache.
+        max_size (int): The maximum total size of the cached files in bytes.
+        client (Optional[AsyncClient]): The HTTP client to download with, for example `BaseClient.client`
+            to share its connection pool. A new client is created if not provided.
+        max_concurrency (int): The maximum number of downloads in flight.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        max_size: int = 512 * 1024 * 1024,
+        client: Optional[AsyncClient] = None,
+        max_concurrency: int = 8,
+    ) -> None:
+        self.path = Path(path)
+        self.max_size = max_size
+        self.objects_path = self.path / "objects"
+        self.objects_path.mkdir(parents=True, exist_ok=True)
+        self._own_client = client is None
+        self.client = client or AsyncClient()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._downloads: dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path / "index.db", isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS objects (digest TEXT PRIMARY KEY, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, digest TEXT NOT NULL)")
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_path / digest[:2] / digest
+
+    def _lookup(self, url: str) -> Optional[Path]:
+        with self._lock:
+            row = self._connection.execute("SELECT digest FROM urls WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            digest = row[0]
+            path = self._object_path(digest)
+            if not path.exists():
+                self._connection.execute("DELETE FROM urls WHERE digest = ?", (digest,))
+                self._connection.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+                return None
+            self._connection.execute("UPDATE objects SET last_access = ? WHERE digest = ?", (time.time(), digest))
+        return path
+
+    def _store(self, url: str, content: bytes) -> Path:
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            # Each write has its own temporary file, so threads storing the same object do not clobber each other.
+            with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as file:
+                file.write(content)
+            try:
+                os.replace(file.name, path)
+            except OSError:
+                os.unlink(file.name)
+                raise
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO objects (digest, size, last_access) VALUES (?, ?, ?)",
+                (digest, len(content), time.time()),
+            )
+            self._connection.execute("INSERT OR REPLACE INTO urls (url, digest) VALUES (?, ?)", (url, digest))
+        self._evict(digest)
+        return path
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        with self._lock:
+            total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+            if total <= self.max_size:
+                return
+            rows = self._connection.execute("SELECT digest, size FROM objects ORDER BY last_access").fetchall()
+            for digest, size in rows:
+                if total <= self.max_size:
+                    break
+                if digest == keep:
+                    continue
+                self._object_path(digest).unlink(missing_ok=True)
+                self._connection.execute("DELETE FROM urls WHERE digest = ?", (digest,))
+                self._connection.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+                total -= size
+
+    @property
+    def size(self) -> int:
+        """The total size of the cached files in bytes."""
+        with self._lock:
+            return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+
+    def get_path(self, url: str) -> Optional[Path]:
+        """Get the local path of a cached asset without downloading it.
+
+        Args:
+            url (str): The URL of the asset.
+
+        Returns:
+            Optional[Path]: The local path, or None if the asset is not cached.
+        """
+        return self._lookup(url)
+
+    def read_mmap(self, url: str) -> Optional[mmap.mmap]:
+        """Memory-map a cached asset without downloading it.
+
+        Args:
+            url (str): The URL of the asset.
+
+        Returns:
+            Optional[mmap.mmap]: A read-only memory map of the file, or None if the asset is not cached.
+        """
+        path = self._lookup(url)
+        if path is None:
+            return None
+        with path.open("rb") as file:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    async def _download(self, url: str) -> Path:
+        loop = asyncio.get_running_loop()
+        path = await loop.run_in_executor(None, self._lookup, url)
+        if path is not None:
+            return path
+        async with self._semaphore:
+            try:
+                response = await self.client.get(url)
+            except TimeoutException as exc:
+                raise TimedOut from exc
+            except HTTPError as exc:
+                raise NetworkError from exc
+        if response.is_error:
+            raise BadRequest(status_code=response.status_code, message=f"Failed to download asset {url}")
+        return await loop.run_in_executor(None, self._store, url, response.content)
+
+    async def get(self, url: str) -> Path:
+        """Get the local path of an asset, downloading it if it is not cached.
+
+        Concurrent calls for the same URL share one download.
+
+        Args:
+            url (str): The URL of the asset.
+
+        Returns:
+            Path: The local path of the asset.
+
+        Raises:
+            NetworkError: If an HTTP error occurs while downloading the asset.
+            TimedOut: If the download times out.
+            BadRequest: If the server responds with an error status.
+        """
+        future = self._downloads.get(url)
+        if future is None:
+            future = asyncio.ensure_future(self._download(url))
+            self._downloads[url] = future
+            future.add_done_callback(lambda _: self._downloads.pop(url, None))
+        return await asyncio.shield(future)
+
+    async def get_many(self, urls: Iterable[str], return_exceptions: bool = False) -> dict[str, Any]:
+        """Get the local paths of many assets, downloading the missing ones with bounded concurrency.
+
+        Args:
+            urls (Iterable[str]): The URLs of the assets. Duplicates are downloaded once.
+            return_exceptions (bool): Whether to return the exception of a failed download instead of raising it.
+
+        Returns:
+            dict[str, Any]: The local path, or the exception if `return_exceptions` is set, of each URL.
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        results = await asyncio.gather(*(self.get(url) for url in unique_urls), return_exceptions=return_exceptions)
+        return dict(zip(unique_urls, results))
+
+    async def cache_models(self, *models: Any, return_exceptions: bool = False) -> dict[str, Any]:
+        """Download all assets referenced by parsed models.
+
+        Args:
+            *models (Any): The models to collect asset URLs from, see `collect_asset_urls`.
+            return_exceptions (bool): Whether to return the exception of a failed download instead of raising it.
+
+        Returns:
+            dict[str, Any]: The local path, or the exception if `return_exceptions` is set, of each URL.
+        """
+        return await self.get_many(collect_asset_urls(*models), return_exceptions=return_exceptions)
+
+    async def aclose(self) -> None:
+        """Close the index, and the HTTP client if it was created by the cache."""
+        if self._own_client:
+            await self.client.aclose()
+        with self._lock:
+            self._connection.close()
+
+    async def __aenter__(self) -> "AssetCache":  # noqa: PYI034 typing.Self needs Python 3.11
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
@@ -21,3 +21,36 @@ def parse_cookie(cookie: str) -> dict[str, str]:
     cookie = SimpleCookie(cookie)
 
     return {str(k): v.value for k, v in cookie.items()}
+
+
+KNOWN_COOKIE_KEYS = frozenset(("hg_token", "hg_id", "cred", "lab_user_id", "lab_show_user_id"))
+"""The cookies the clients use."""
+
+
+def parse_known_cookies(cookie: str) -> dict[str, str]:
+    """
+    Parses the known cookies of a cookie string or header into a dictionary, ignoring all others.
+
+    This is much faster than `parse_cookie` for bulk imports, because it only splits the string and
+    does not validate the other cookies or their attributes.
+
+    Args:
+        cookie (str): The cookie string or header to parse.
+
+    Returns:
+        Dict[str, str]: The values of the known cookies.
+
+    Example:
+        >>> parse_known_cookies('cred=abc; hg_id="123"; Path=/')
+        {'cred': 'abc', 'hg_id': '123'}
+    """
+    result = {}
+    for part in cookie.split(";"):
+        key, sep, value = part.partition("=")
+        key = key.strip()
+        if sep and key in KNOWN_COOKIE_KEYS:
+            value = value.strip()
+            if len(value) >= 2 and value[0] == value[-1] == '"':
+                value = value[1:-1]
+            result[key] = value
+    return result
@@ -31,6 +31,29 @@
 
 #   Contact: DLmaster_361@163.com
 
+import asyncio
+import base64
+import functools
+import gzip
+import hashlib
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Optional
+
+import httpx
+from Crypto.Cipher import AES, DES, PKCS1_v1_5
+from Crypto.PublicKey import RSA
+from Crypto.Util.Padding import pad
+
+from hypernet.client.deadline import get_remaining_time, shrink_timeout
+from hypernet.errors import TimedOut
+from hypernet.utils.executor import run_cpu_bound
+
+if TYPE_CHECKING:
+    from hypernet.utils.state import BaseStateBackend
+
 SKLAND_SM_CONFIG = {
     "organization": "UWXspnCCJN4sfYlNfqps",
     "appId": "default",
@@ -203,20 +226,10 @@ DES_RULE = {
 }
 """DES加密规则"""
 
-import time
-import json
-import uuid
-import gzip
-import httpx
-import base64
-import hashlib
-from Crypto.PublicKey import RSA
-from Crypto.Cipher import PKCS1_v1_5, AES, DES
-from Crypto.Util.Padding import pad
+DEVICE_ID_STATE_KEY = "hypernet:device_id"
 
-import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+DEVICE_ID_TIMEOUT = httpx.Timeout(30.0)
+"""请求设备ID的超时时间"""
 
 
 def md5_hash(data: str) -> str:
@@ -243,7 +256,7 @@ def get_sm_id() -> str:
     return f"{v}{smsk_web}0"
 
 
-def get_tn(obj: Dict[str, Any]) -> str:
+def get_tn(obj: dict[str, Any]) -> str:
     """计算tn值"""
     # 获取并排序对象的所有键
     sorted_keys = sorted(obj.keys())
@@ -270,17 +283,31 @@ def get_tn(obj: Dict[str, Any]) -> str:
     return "".join(result_list)
 
 
+@functools.lru_cache(maxsize=8)
+def get_rsa_cipher(public_key_str: str):
+    """导入公钥并创建 RSA 加密器，同一公钥只解析一次"""
+    # 将base64编码的公钥转换为PEM格式
+    # 添加换行符以符合PEM格式
+    formatted_key = "\n".join([public_key_str[i : i + 64] for i in range(0, len(public_key_str), 64)])
+    public_key_pem = f"-----BEGIN PUBLIC KEY-----\n{formatted_key}\n-----END PUBLIC KEY-----"
+
+    # 导入公钥
+    key = RSA.import_key(public_key_pem)
+    return PKCS1_v1_5.new(key)
+
+
+@functools.lru_cache(maxsize=64)
+def get_des_cipher(key: str):
+    """创建 DES ECB 加密器，ECB 模式无状态，同一密钥的加密器可以复用"""
+    # 确保密钥长度为8字节
+    key_bytes = key.encode()[:8].ljust(8, b"\0")
+    return DES.new(key_bytes, DES.MODE_ECB)
+
+
 def encrypt_rsa(message: str, public_key_str: str) -> str:
     """RSA加密"""
     try:
-        # 将base64编码的公钥转换为PEM格式
-        # 添加换行符以符合PEM格式
-        formatted_key = "\n".join([public_key_str[i : i + 64] for i in range(0, len(public_key_str), 64)])
-        public_key_pem = f"-----BEGIN PUBLIC KEY-----\n{formatted_key}\n-----END PUBLIC KEY-----"
-
-        # 导入公钥
-        key = RSA.import_key(public_key_pem)
-        cipher = PKCS1_v1_5.new(key)
+        cipher = get_rsa_cipher(public_key_str)
 
         # 加密
         encrypted = cipher.encrypt(message.encode())
@@ -294,24 +321,19 @@ def encrypt_rsa(message: str, public_key_str: str) -> str:
 def encrypt_des(message: str, key: str) -> str:
     """DES ECB 加密"""
 
-    # 确保密钥长度为8字节
-    key_bytes = key.encode()[:8].ljust(8, b"\0")
-
     # 确保消息长度为8的倍数（DES块大小）
     message_bytes = str(message).encode()
     # 使用null字节填充
-    while len(message_bytes) % 8 != 0:
-        message_bytes += b"\0"
+    message_bytes = message_bytes.ljust(-(-len(message_bytes) // 8) * 8, b"\0")
 
     # DES ECB 加密
-    cipher = DES.new(key_bytes, DES.MODE_ECB)
-    encrypted = cipher.encrypt(message_bytes)
+    encrypted = get_des_cipher(key).encrypt(message_bytes)
 
     # 返回base64编码的结果
     return base64.b64encode(encrypted).decode()
 
 
-def gzip_compress_object(obj: Dict[str, Any]) -> str:
+def gzip_compress_object(obj: dict[str, Any]) -> str:
     """GZIP压缩对象"""
     # 转换为JSON字符串，添加空格以匹配JavaScript的格式
     json_str = json.dumps(obj, separators=(", ", ": "))
@@ -344,7 +366,7 @@ def encrypt_aes(message: str, key: str) -> str:
     return encrypted.hex()
 
 
-def encrypt_object_by_des_rules(obj: Dict[str, Any], rules: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+def encrypt_object_by_des_rules(obj: dict[str, Any], rules: dict[str, dict[str, Any]]) -> dict[str, Any]:
     """根据DES规则加密对象"""
     result = {}
 
@@ -364,95 +386,171 @@ def encrypt_object_by_des_rules(obj: Dict[str, Any], rules: Dict[str, Dict[str,
     return result
 
 
-class SklandDeviceFP:
-    # 单例模式实现
-    _instance = None
-    _lock = asyncio.Lock()
-
-    # 缓存相关
-    _cached_device_id: Optional[str] = None
-    _cache_expiry: Optional[datetime] = None
-    _cache_lock = asyncio.Lock()
-    _cache_duration = timedelta(hours=1)
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
-
-    @staticmethod
-    async def get_device_id() -> str:
-        """获取设备ID"""
-        # 生成 UUID 并计算 priId
-        uid = str(uuid.uuid4())
-        pri_id = md5_hash(uid)[:16]
-
-        # RSA加密
-        ep = encrypt_rsa(uid, SKLAND_SM_CONFIG["publicKey"])
-
-        # 准备浏览器环境数据
-        browser = BROWSER_ENV.copy()
-        browser.update(
-            {
-                "vpw": str(uuid.uuid4()),
-                "svm": int(time.time() * 1000),
-                "trees": str(uuid.uuid4()),
-                "pmf": int(time.time() * 1000),
-            }
-        )
-
-        # 准备加密目标数据
-        des_target = {
-            **browser,
+class DeviceFPBuilder:
+    """
+    预编译的设备指纹请求体生成器。
+
+    - 公钥只导入一次，DES 加密器按规则缓存
+    - 浏览器环境和 SDK 信息等静态字段只加密一次
+    - 每个请求体只需要加密 UUID、时间戳、数美ID 和 tn 等动态字段
+
+    :param config: 数美科技配置。
+    :param browser_env: 浏览器环境模拟。
+    :param rules: DES加密规则。
+    """
+
+    DYNAMIC_FIELDS = ("vpw", "svm", "trees", "pmf", "smid", "tn")
+    """每个请求体都不同的字段"""
+
+    def __init__(
+        self,
+        config: Optional[dict[str, str]] = None,
+        browser_env: Optional[dict[str, Any]] = None,
+        rules: Optional[dict[str, dict[str, Any]]] = None,
+    ) -> None:
+        self.config = SKLAND_SM_CONFIG if config is None else config
+        self.rules = DES_RULE if rules is None else rules
+        self._rsa_cipher = get_rsa_cipher(self.config["publicKey"])
+        template = {
+            **(BROWSER_ENV if browser_env is None else browser_env),
+            **dict.fromkeys(self.DYNAMIC_FIELDS[:4]),
             "protocol": 102,
-            "organization": SKLAND_SM_CONFIG["organization"],
-            "appId": SKLAND_SM_CONFIG["appId"],
+            "organization": self.config["organization"],
+            "appId": self.config["appId"],
             "os": "web",
             "version": "3.0.0",
             "sdkver": "3.0.0",
             "box": "",  # 首次请求为空
             "rtype": "all",
-            "smid": get_sm_id(),
+            "smid": None,
             "subVersion": "1.0.0",
             "time": 0,
+            "tn": None,
         }
+        self._static = {key: value for key, value in template.items() if key not in self.DYNAMIC_FIELDS}
+        # 静态字段为 (混淆后的名称, 加密后的值)，动态字段为 (混淆后的名称, 字段名, DES 密钥)，按原始字段顺序排列
+        self._static_fields: list[tuple[str, Any]] = []
+        self._fields: list[tuple[str, ...]] = []
+        for key, value in template.items():
+            rule = self.rules.get(key)
+            name = key if rule is None else rule["obfuscated_name"]
+            des_key = rule["key"] if rule is not None and rule["is_encrypt"] == 1 else None
+            if key in self.DYNAMIC_FIELDS:
+                self._fields.append((name, key, des_key))
+            else:
+                self._fields.append((name, value if des_key is None else encrypt_des(str(value), des_key)))
 
-        # 计算并添加 tn
-        des_target["tn"] = md5_hash(get_tn(des_target))
+    def encrypt_target(self, values: dict[str, Any]) -> dict[str, Any]:
+        """
+        计算 tn 并按 DES 规则加密字段，结果与 `encrypt_object_by_des_rules` 相同。
 
-        # DES 加密（这里实际上是重命名）
-        des_result = encrypt_object_by_des_rules(des_target, DES_RULE)
+        :param values: 动态字段 vpw、svm、trees、pmf 和 smid 的值。
+        :return: 加密并重命名后的字段。
+        """
+        values = dict(values)
+        values["tn"] = md5_hash(get_tn({**self._static, **values}))
+        result = {}
+        for field in self._fields:
+            if len(field) == 2:
+                result[field[0]] = field[1]
+            else:
+                name, key, des_key = field
+                result[name] = values[key] if des_key is None else encrypt_des(str(values[key]), des_key)
+        return result
+
+    def build(self) -> dict[str, Any]:
+        """生成一个设备指纹请求体"""
+        # 生成 UUID 并计算 priId
+        uid = str(uuid.uuid4())
+        pri_id = md5_hash(uid)[:16]
 
-        # GZIP 压缩
-        gzip_result = gzip_compress_object(des_result)
+        # RSA加密
+        ep = base64.b64encode(self._rsa_cipher.encrypt(uid.encode())).decode()
 
-        # AES 加密
-        aes_result = encrypt_aes(gzip_result, pri_id)
+        now = int(time.time() * 1000)
+        des_result = self.encrypt_target(
+            {"vpw": str(uuid.uuid4()), "svm": now, "trees": str(uuid.uuid4()), "pmf": now, "smid": get_sm_id()}
+        )
 
-        # 准备请求体
-        body = {
+        # GZIP 压缩后 AES 加密
+        aes_result = encrypt_aes(gzip_compress_object(des_result), pri_id)
+
+        return {
             "appId": "default",
             "compress": 2,
             "data": aes_result,
             "encode": 5,
             "ep": ep,
-            "organization": SKLAND_SM_CONFIG["organization"],
+            "organization": self.config["organization"],
             "os": "web",
         }
 
-        # 发送请求
-        devices_info_url = (
-            f"{SKLAND_SM_CONFIG['protocol']}://{SKLAND_SM_CONFIG['apiHost']}{SKLAND_SM_CONFIG['apiPath']}"
-        )
+    def build_many(self, count: int) -> list[dict[str, Any]]:
+        """
+        批量生成设备指纹请求体。
 
-        async with httpx.AsyncClient() as client:
+        :param count: 请求体数量。
+        :return: 请求体列表。
+        """
+        return [self.build() for _ in range(count)]
+
+    @property
+    def url(self) -> str:
+        """设备指纹接口地址"""
+        return f"{self.config['protocol']}://{self.config['apiHost']}{self.config['apiPath']}"
+
+
+@functools.lru_cache(maxsize=1)
+def get_device_fp_builder() -> DeviceFPBuilder:
+    """获取默认配置的设备指纹请求体生成器，首次调用时创建"""
+    return DeviceFPBuilder()
+
+
+def build_device_fp_payloads(count: int) -> list[dict[str, Any]]:
+    """
+    使用默认配置批量生成设备指纹请求体，可以在进程池中运行。
+
+    :param count: 请求体数量。
+    :return: 请求体列表。
+    """
+    return get_device_fp_builder().build_many(count)
+
+
+class SklandDeviceFP:
+    # 单例模式实现
+    _instance = None
+    _lock = asyncio.Lock()
+
+    # 缓存相关
+    _cached_device_id: Optional[str] = None
+    _cache_expiry: Optional[datetime] = None
+    _cache_lock = asyncio.Lock()
+    _cache_duration = timedelta(hours=1)
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    @staticmethod
+    async def request_device_id(client: httpx.AsyncClient, body: dict[str, Any]) -> str:
+        """使用设备指纹请求体请求设备ID，超时时间不超过 request_deadline 的剩余时间"""
+        timeout = DEVICE_ID_TIMEOUT
+        remaining = get_remaining_time()
+        if remaining is not None:
+            if remaining <= 0:
+                raise TimedOut("Deadline exceeded before the device ID was requested.")
+            timeout = shrink_timeout(timeout, remaining)
+        try:
             response = await client.post(
-                devices_info_url,
+                get_device_fp_builder().url,
                 json=body,
                 headers={"Content-Type": "application/json"},
-                timeout=30.0,
+                timeout=timeout,
             )
-            resp = response.json()
+        except httpx.TimeoutException as exc:
+            raise TimedOut from exc
+        resp = response.json()
 
         if resp.get("code") != 1100:
             raise Exception(f"设备ID计算失败: {resp}")
@@ -460,22 +558,39 @@ class SklandDeviceFP:
         return f"B{resp['detail']['deviceId']}"
 
     @classmethod
-    async def get_cached_device_id(cls) -> str:
+    async def get_device_ids(cls, count: int, return_exceptions: bool = False, concurrency: int = 8) -> list[Any]:
         """
-        获取缓存的设备ID，支持自动重试和缓存机制
-        - 缓存有效期1小时
-        - 失败时自动重试3次
-        - 线程安全
+        批量获取设备ID，请求体在 CPU 执行器中一次性生成，请求共用一个连接池并发发送。
+
+        :param count: 设备ID数量。
+        :param return_exceptions: 是否在结果中返回失败的异常，而不是抛出第一个异常。
+        :param concurrency: 同时发送的最大请求数。
+        :return: 设备ID列表。
         """
-        # 获取单例实例
-        instance = cls()
+        bodies = await run_cpu_bound(build_device_fp_payloads, count)
+        semaphore = asyncio.Semaphore(concurrency)
 
-        # 检查缓存是否有效
-        async with instance._cache_lock:
-            if instance._cached_device_id and instance._cache_expiry and datetime.now() < instance._cache_expiry:
-                return instance._cached_device_id
+        async def request(client: httpx.AsyncClient, body: dict[str, Any]) -> str:
+            async with semaphore:
+                return await cls.request_device_id(client, body)
 
-        # 缓存失效，需要重新获取
+        async with httpx.AsyncClient() as client:
+            return await asyncio.gather(
+                *(request(client, body) for body in bodies),
+                return_exceptions=return_exceptions,
+            )
+
+    @classmethod
+    async def get_device_id(cls) -> str:
+        """获取设备ID，请求体在 CPU 执行器中生成，不阻塞事件循环"""
+        (body,) = await run_cpu_bound(build_device_fp_payloads, 1)
+        async with httpx.AsyncClient() as client:
+            return await cls.request_device_id(client, body)
+
+    @classmethod
+    async def fetch_device_id(cls) -> str:
+        """获取设备ID，失败时自动重试3次，超出 request_deadline 后不再重试并抛出 TimedOut"""
+        instance = cls()
         retry_count = 0
         max_retries = 3
         device_id = None
@@ -485,14 +600,51 @@ class SklandDeviceFP:
                 retry_count += 1
                 device_id = await instance.get_device_id()
                 break
-            except Exception:
+            except Exception as exc:
+                remaining = get_remaining_time()
+                if remaining is not None and remaining <= 0:
+                    if isinstance(exc, TimedOut):
+                        raise
+                    raise TimedOut("Deadline exceeded while retrying the device ID request.") from exc
                 if retry_count >= max_retries:
                     raise
-                await asyncio.sleep(1)
+                await asyncio.sleep(1 if remaining is None else min(1, remaining))
+        return device_id
+
+    @classmethod
+    async def get_cached_device_id(cls, backend: Optional["BaseStateBackend"] = None) -> str:
+        """
+        获取缓存的设备ID，支持自动重试和缓存机制
+        - 缓存有效期1小时
+        - 失败时自动重试3次
+        - 线程安全
+        - 提供 backend 时与其他进程共享，同一时间只有一个进程刷新
+        """
+        # 获取单例实例
+        instance = cls()
+
+        # 检查缓存是否有效
+        async with instance._cache_lock:
+            if (
+                instance._cached_device_id
+                and instance._cache_expiry
+                and datetime.now(timezone.utc) < instance._cache_expiry
+            ):
+                return instance._cached_device_id
+
+        # 缓存失效，需要重新获取
+        if backend is not None:
+            device_id = await backend.get_or_create(
+                DEVICE_ID_STATE_KEY,
+                cls.fetch_device_id,
+                ttl=instance._cache_duration.total_seconds(),
+            )
+        else:
+            device_id = await cls.fetch_device_id()
 
         # 更新缓存
         async with instance._cache_lock:
             instance._cached_device_id = device_id
-            instance._cache_expiry = datetime.now() + instance._cache_duration
+            instance._cache_expiry = datetime.now(timezone.utc) + instance._cache_duration
 
         return device_id
@@ -1,16 +1,22 @@
 import asyncio
+import functools
 import hashlib
 import hmac
 import json
+import logging
 import time
 import typing
-from datetime import datetime, timedelta
 from urllib.parse import urlparse, urlencode
 
-import httpx
-
+from hypernet.client.deadline import get_remaining_time
+from hypernet.errors import TimedOut
+from hypernet.utils.executor import create_background_task
 from hypernet.utils.types import QueryParamTypes
 
+SIGN_TOKEN_STATE_KEY = "hypernet:sign_token"  # noqa: S105 a state backend key, not a secret
+
+_LOGGER = logging.getLogger("HyperNet.SklandSign")
+
 header_for_sign = {
     "platform": "3",
     "timestamp": "",
@@ -19,27 +25,84 @@ header_for_sign = {
 }
 
 
-def generate_signature(token: str, path: str, body_or_query: str, did: str = "") -> tuple[str, dict[str, str]]:
-    t = str(int(time.time()) - 2)
-    _token = token.encode("utf-8")
-    header_ca = header_for_sign.copy()
-    header_ca["timestamp"] = t
-    header_ca["dId"] = did
-    header_ca_str = json.dumps(header_ca, separators=(",", ":"))
-    s = path + body_or_query + t + header_ca_str
-    hex_s = hmac.new(_token, s.encode("utf-8"), hashlib.sha256).hexdigest()
-    md5 = hashlib.md5(hex_s.encode("utf-8")).hexdigest()
-    return md5, header_ca
+class SigningContext:
+    """
+    预计算的签名上下文，对同一个 (token, did) 复用。
 
+    HMAC 密钥只编码和载入一次，签名头的 JSON 预先生成为模板，签名时只填入时间戳。
 
-def generate_dynamic_secret(
+    :param token: 签名密钥。
+    :param did: 设备 ID。
+    """
+
+    __slots__ = ("token", "did", "_hmac", "_header_prefix", "_header_suffix")
+
+    _TIMESTAMP_SLOT = "\x00timestamp\x00"
+
+    def __init__(self, token: str, did: str = "") -> None:
+        self.token = token
+        self.did = did
+        self._hmac = hmac.new(token.encode("utf-8"), digestmod=hashlib.sha256)
+        header = {**header_for_sign, "timestamp": self._TIMESTAMP_SLOT, "dId": did}
+        template = json.dumps(header, separators=(",", ":"))
+        self._header_prefix, self._header_suffix = template.split(json.dumps(self._TIMESTAMP_SLOT), 1)
+
+    def sign(self, path: str, body_or_query: str, timestamp: typing.Optional[str] = None) -> tuple[str, dict[str, str]]:
+        """
+        生成签名。
+
+        :param path: 请求路径。
+        :param body_or_query: GET 请求的查询字符串，或其他请求的 JSON 请求体。
+        :param timestamp: 签名时间戳，默认为当前时间。
+        :return: 签名和需要附加的请求头。
+        """
+        t = timestamp or str(int(time.time()) - 2)
+        header_ca_str = f'{self._header_prefix}"{t}"{self._header_suffix}'
+        h = self._hmac.copy()
+        h.update((path + body_or_query + t + header_ca_str).encode("utf-8"))
+        md5 = hashlib.md5(h.hexdigest().encode("utf-8")).hexdigest()
+        header_ca = {**header_for_sign, "timestamp": t, "dId": self.did}
+        return md5, header_ca
+
+    def sign_many(
+        self,
+        requests: typing.Iterable[tuple[str, str]],
+        timestamp: typing.Optional[str] = None,
+    ) -> list[tuple[str, dict[str, str]]]:
+        """
+        使用同一个时间戳批量生成签名。
+
+        :param requests: (请求路径, 查询字符串或请求体) 的列表。
+        :param timestamp: 签名时间戳，默认为当前时间。
+        :return: 每个请求的签名和需要附加的请求头。
+        """
+        t = timestamp or str(int(time.time()) - 2)
+        return [self.sign(path, body_or_query, t) for path, body_or_query in requests]
+
+
+@functools.lru_cache(maxsize=128)
+def get_signing_context(token: str, did: str = "") -> SigningContext:
+    """获取 (token, did) 对应的签名上下文，最近使用的上下文会被缓存。"""
+    return SigningContext(token, did)
+
+
+def generate_signature(
     token: str,
+    path: str,
+    body_or_query: str,
+    did: str = "",
+    timestamp: typing.Optional[str] = None,
+) -> tuple[str, dict[str, str]]:
+    return get_signing_context(token, did).sign(path, body_or_query, timestamp)
+
+
+def get_sign_payload(
     url: str,
     method: str = "get",
     data: typing.Any = None,
     params: typing.Optional[QueryParamTypes] = None,
-    did: str = "",
-):
+) -> tuple[str, str]:
+    """获取请求参与签名的路径，以及查询字符串或请求体。"""
     p = urlparse(str(url))
     if method.lower() == "get":
         if params:
@@ -52,72 +115,131 @@ def generate_dynamic_secret(
                 query_str = urlencode(params)
         else:
             query_str = ""
-        sign, header_ca = generate_signature(token, p.path, query_str, did)
-    else:
-        sign, header_ca = generate_signature(token, p.path, json.dumps(data) if data is not None else "", did)
-    return sign, header_ca
-
-
-class SklandSign:
-    # 单例模式实现
-    _instance = None
-    _lock = asyncio.Lock()
-
-    # 缓存相关
-    _cached_sign_token: typing.Optional[str] = None
-    _cache_expiry: typing.Optional[datetime] = None
-    _cache_lock = asyncio.Lock()
-    _cache_duration = timedelta(minutes=5)
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
-
-    @staticmethod
-    async def get_sign_token() -> str:
-        async with httpx.AsyncClient() as client:
-            req = await client.get("https://zonai.skport.com/api/v1/auth/refresh")
-            sign_token = req.json()["data"]["token"]
-            return sign_token
-
-    @classmethod
-    async def get_cached_sign_token(cls, force: bool) -> str:
+        return p.path, query_str
+    return p.path, json.dumps(data) if data is not None else ""
+
+
+def generate_dynamic_secret(
+    token: str,
+    url: str,
+    method: str = "get",
+    data: typing.Any = None,
+    params: typing.Optional[QueryParamTypes] = None,
+    did: str = "",
+    timestamp: typing.Optional[str] = None,
+):
+    path, body_or_query = get_sign_payload(url, method, data, params)
+    return generate_signature(token, path, body_or_query, did, timestamp)
+
+
+def generate_dynamic_secrets(
+    token: str,
+    requests: typing.Iterable[tuple[str, str, typing.Any, typing.Optional[QueryParamTypes]]],
+    did: str = "",
+    timestamp: typing.Optional[str] = None,
+) -> list[tuple[str, dict[str, str]]]:
+    """
+    批量为请求生成签名，所有请求共享同一个签名上下文和时间戳。
+
+    :param token: 签名密钥。
+    :param requests: (url, method, data, params) 的列表。
+    :param did: 设备 ID。
+    :param timestamp: 签名时间戳，默认为当前时间。
+    :return: 每个请求的签名和需要附加的请求头。
+    """
+    context = get_signing_context(token, did)
+    return context.sign_many((get_sign_payload(*request) for request in requests), timestamp)
+
+
+SignTokenFetch = typing.Callable[[bool], typing.Awaitable[typing.Optional[str]]]
+
+
+class SignTokenManager:
+    """
+    刷新前置的签名密钥管理器。
+
+    - 同一时间只有一个获取请求，所有等待者共享其结果
+    - 密钥过期前 refresh_ahead 秒内被使用时，在后台刷新，刷新期间继续返回当前密钥
+    - 只有没有可用密钥时，调用者才需要等待获取完成，等待时间受 request_deadline 限制
+
+    :param fetch: 默认的获取签名密钥的协程函数，参数 force 表示是否忽略共享的缓存。
+    :param ttl: 密钥有效期（秒）。
+    :param refresh_ahead: 提前刷新的时间（秒）。
+    """
+
+    def __init__(
+        self,
+        fetch: typing.Optional[SignTokenFetch] = None,
+        ttl: float = 5 * 60,
+        refresh_ahead: float = 60,
+    ) -> None:
+        self.fetch = fetch
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.token: typing.Optional[str] = None
+        self.expires_at = 0.0
+        self._refresh: typing.Optional[asyncio.Future] = None
+        self._refresh_awaited = False
+
+    @property
+    def valid(self) -> bool:
+        """当前密钥是否有效"""
+        return bool(self.token) and time.time() < self.expires_at
+
+    def set(self, token: str, expires_at: typing.Optional[float] = None) -> None:
+        """设置当前密钥及其过期时间（时间戳），默认为 ttl 秒后过期"""
+        self.token = token
+        self.expires_at = time.time() + self.ttl if expires_at is None else expires_at
+
+    async def _do_refresh(self, fetch: SignTokenFetch, force: bool) -> typing.Optional[str]:
+        token = await fetch(force)
+        if token:
+            self.set(token)
+        return self.token
+
+    def _log_background_error(self, future: asyncio.Future) -> None:
+        # 有调用者等待的刷新，其异常已经抛给调用者
+        if future is self._refresh and self._refresh_awaited:
+            return
+        if not future.cancelled() and future.exception() is not None:
+            _LOGGER.warning("Failed to refresh the sign token", exc_info=future.exception())
+
+    def _start_refresh(self, fetch: SignTokenFetch, force: bool, background: bool) -> asyncio.Future:
+        refresh = self._refresh
+        if refresh is None or refresh.done() or refresh.get_loop() is not asyncio.get_running_loop():
+            if background:
+                # 后台刷新不继承调用者的 request_deadline 等上下文
+                refresh = create_background_task(self._do_refresh(fetch, force))
+                refresh.add_done_callback(self._log_background_error)
+            else:
+                refresh = asyncio.ensure_future(self._do_refresh(fetch, force))
+            self._refresh = refresh
+            self._refresh_awaited = not background
+        elif not background:
+            self._refresh_awaited = True
+        return refresh
+
+    async def get(self, force: bool = False, fetch: typing.Optional[SignTokenFetch] = None) -> typing.Optional[str]:
         """
-        获取缓存的签名密钥，支持自动重试和缓存机制
-        - 缓存有效期1小时
-        - 失败时自动重试3次
-        - 线程安全
+        获取签名密钥。
+
+        :param force: 是否强制获取新的密钥。
+        :param fetch: 本次调用使用的获取函数，默认为创建时传入的 fetch。管理器不会保存它。
+        :return: 签名密钥。
+        :raise TimedOut: 等待获取时超出 request_deadline。
         """
-        # 获取单例实例
-        instance = cls()
-
-        # 检查缓存是否有效
-        if not force:
-            async with instance._cache_lock:
-                if instance._cached_sign_token and instance._cache_expiry and datetime.now() < instance._cache_expiry:
-                    return instance._cached_sign_token
-
-        # 缓存失效，需要重新获取
-        retry_count = 0
-        max_retries = 3
-        sign_token = None
-
-        while retry_count < max_retries:
-            try:
-                retry_count += 1
-                sign_token = await instance.get_sign_token()
-                break
-            except Exception:
-                if retry_count >= max_retries:
-                    raise
-                await asyncio.sleep(1)
-        if not sign_token:
-            return instance._cached_sign_token
-
-        # 更新缓存
-        async with instance._cache_lock:
-            instance._cached_sign_token = sign_token
-            instance._cache_expiry = datetime.now() + instance._cache_duration
-
-        return sign_token
+        fetch = fetch or self.fetch
+        if fetch is None:
+            raise RuntimeError("No function to fetch the sign token was given.")
+        if not force and self.valid:
+            if time.time() >= self.expires_at - self.refresh_ahead:
+                self._start_refresh(fetch, False, True)
+            return self.token
+        refresh = asyncio.shield(self._start_refresh(fetch, force, False))
+        remaining = get_remaining_time()
+        if remaining is None:
+            return await refresh
+        try:
+            return await asyncio.wait_for(refresh, remaining)
+        except asyncio.TimeoutError as exc:
+            raise TimedOut("Deadline exceeded while waiting for the sign token.") from exc
@@ -0,0 +1,69 @@
+"""Offloading of CPU-heavy work from the event loop to a thread or process pool, and of background work."""
+
+import asyncio
+import contextvars
+from collections.abc import Coroutine
+from concurrent.futures import Executor
+from typing import Any, Callable, Optional, TypeVar
+
+__all__ = (
+    "create_background_task",
+    "get_cpu_executor",
+    "run_cpu_bound",
+    "set_cpu_executor",
+)
+
+T = TypeVar("T")
+
+_cpu_executor: Optional[Executor] = None
+
+
+def set_cpu_executor(executor: Optional[Executor]) -> None:
+    """Set the executor that CPU-heavy work such as device fingerprint encryption runs in.
+
+    A `ProcessPoolExecutor` keeps the work from stalling the event loop at all, while a `ThreadPoolExecutor`
+    only interleaves it with the loop, because the work holds the GIL. The executor is not shut down when
+    it is replaced.
+
+    Args:
+        executor (Optional[Executor]): The executor. None uses the default thread pool of the event loop.
+    """
+    global _cpu_executor  # noqa: PLW0603  # skipcq: PYL-W0603
+    _cpu_executor = executor
+
+
+def get_cpu_executor() -> Optional[Executor]:
+    """Get the executor set with `set_cpu_executor`, None if the default thread pool is used."""
+    return _cpu_executor
+
+
+async def run_cpu_bound(func: Callable[..., T], *args: Any, executor: Optional[Executor] = None) -> T:
+    """Run a CPU-heavy function in an executor and wait for its result.
+
+    With a process pool, the function and its arguments must be picklable, so it should be a module-level function.
+
+    Args:
+        func (Callable[..., T]): The function.
+        *args (Any): The positional arguments of the function.
+        executor (Optional[Executor]): The executor. Defaults to the one set with `set_cpu_executor`.
+
+    Returns:
+        T: The result of the function.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor or _cpu_executor, func, *args)
+
+
+def create_background_task(coro: Coroutine[Any, Any, T]) -> "asyncio.Task[T]":
+    """Start a task that does not inherit the context variables of its caller.
+
+    A task copies the context it is created in, so a background refresh started during a request would run
+    with the deadline, priority and region of that request even after the request is gone.
+
+    Args:
+        coro (Coroutine[Any, Any, T]): The coroutine of the task.
+
+    Returns:
+        asyncio.Task[T]: The task, running in an empty context.
+    """
+    return contextvars.Context().run(asyncio.ensure_future, coro)
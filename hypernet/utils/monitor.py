@@ -0,0 +1,169 @@
+"""An event loop lag monitor that attributes stalls to the library code that caused them."""
+
+import asyncio
+import contextlib
+import logging
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, NamedTuple, Optional
+
+__all__ = (
+    "LagEvent",
+    "LoopLagMonitor",
+)
+
+_LOGGER = logging.getLogger("HyperNet.LoopLagMonitor")
+
+
+class LagEvent(NamedTuple):
+    """
+    A stall of the event loop.
+
+    Attributes:
+        lag (float): How long the event loop was blocked beyond the check interval, in seconds.
+        call (Optional[str]): The outermost library function on the stack during the stall.
+        phase (Optional[str]): The innermost library function on the stack during the stall.
+        timestamp (float): The wall-clock time the stall was detected.
+    """
+
+    lag: float
+    call: Optional[str]
+    phase: Optional[str]
+    timestamp: float
+
+
+class LoopLagMonitor:
+    """
+    A monitor that measures event loop lag and reports which library call blocked the loop.
+
+    A heartbeat task measures how late it wakes up. A watchdog thread samples the stack of the event loop
+    thread while the heartbeat is overdue, so a stall is attributed to the code that was actually running,
+    such as `encrypt_rsa` inside `get_device_id`, without instrumenting it.
+
+    Args:
+        threshold (float): The lag in seconds above which a stall is reported.
+        interval (float): How often the heartbeat checks the loop, in seconds.
+        packages (tuple[str, ...]): The module name prefixes that calls and phases are attributed to.
+        on_stall (Optional[Callable[[LagEvent], None]]): A callback invoked with each stall.
+        history (int): How many recent stalls are kept in `events`.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.1,
+        interval: float = 0.05,
+        packages: tuple[str, ...] = ("hypernet",),
+        on_stall: Optional[Callable[[LagEvent], None]] = None,
+        history: int = 100,
+    ) -> None:
+        self.threshold = threshold
+        self.interval = interval
+        self.packages = packages
+        self.on_stall = on_stall
+        self.events: deque[LagEvent] = deque(maxlen=history)
+        self.stalls = 0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self.phases: Counter[str] = Counter()
+        self._beat = 0.0
+        self._sample: Optional[tuple[Optional[str], Optional[str]]] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        """Whether the monitor is running."""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def metrics(self) -> dict:
+        """The stall count, the maximum and total lag, and the stall count per phase."""
+        return {
+            "stalls": self.stalls,
+            "max_lag": self.max_lag,
+            "total_lag": self.total_lag,
+            "phases": dict(self.phases),
+        }
+
+    async def start(self) -> None:
+        """Start the monitor on the running event loop."""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watchdog, name="hypernet-loop-lag-monitor", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """Stop the monitor."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    async def __aenter__(self) -> "LoopLagMonitor":  # noqa: PYI034 typing.Self needs Python 3.11
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            before = time.monotonic()
+            self._beat = before
+            await asyncio.sleep(self.interval)
+            lag = time.monotonic() - before - self.interval
+            if lag > self.threshold:
+                self._record(lag)
+            self._sample = None
+
+    def _watchdog(self) -> None:
+        while not self._stopped.wait(self.interval / 2):
+            if self._sample is None and time.monotonic() - self._beat > self.interval + self.threshold:
+                self._sample = self._attribute()
+
+    def _attribute(self) -> tuple[Optional[str], Optional[str]]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        names = []
+        while frame is not None:
+            module = frame.f_globals.get("__name__", "")
+            if module != __name__ and module.startswith(self.packages):
+                names.append(f"{module}.{frame.f_code.co_name}")
+            frame = frame.f_back
+        if not names:
+            return None, None
+        return names[-1], names[0]
+
+    def _record(self, lag: float) -> None:
+        call, phase = self._sample or (None, None)
+        event = LagEvent(lag=lag, call=call, phase=phase, timestamp=time.time())
+        self.events.append(event)
+        self.stalls += 1
+        self.max_lag = max(self.max_lag, lag)
+        self.total_lag += lag
+        if phase is not None:
+            self.phases[phase] += 1
+        _LOGGER.warning(
+            "Event loop blocked for %.3fs in %s (phase %s)",
+            lag,
+            call or "unknown code",
+            phase or "unknown",
+            extra={"lag": lag, "call": call, "phase": phase},
+        )
+        if self.on_stall is not None:
+            try:
+                self.on_stall(event)
+            except Exception:
+                _LOGGER.exception("The on_stall callback of the loop lag monitor failed")
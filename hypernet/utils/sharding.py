@@ -0,0 +1,216 @@
+"""Consistent-hash sharding of accounts across worker processes and nodes."""
+
+import asyncio
+import bisect
+import contextlib
+import hashlib
+import time
+import uuid
+from collections.abc import Iterable
+from typing import Optional, Union
+
+from hypernet.utils.state import BaseStateBackend
+
+__all__ = (
+    "HashRing",
+    "ShardCoordinator",
+)
+
+AccountKey = Union[int, str]
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode(), usedforsecurity=False).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    A consistent hash ring that maps keys to nodes.
+
+    Each node is placed on the ring `replicas * weight` times, and a key belongs to the first node
+    clockwise from its hash. Adding or removing a node therefore only moves the keys next to its points,
+    about `1 / len(nodes)` of all keys. The hash is stable across processes and Python versions.
+
+    Args:
+        nodes (Iterable[str]): The initial nodes.
+        replicas (int): The number of points per node and unit of weight.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 128) -> None:
+        self.replicas = replicas
+        self._weights: dict[str, int] = {}
+        self._points: list[int] = []
+        self._owners: list[str] = []
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> list[str]:
+        """The nodes on the ring, sorted by name."""
+        return sorted(self._weights)
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def __contains__(self, node: object) -> bool:
+        return node in self._weights
+
+    def _rebuild(self) -> None:
+        ring = sorted(
+            (_hash(f"{node}#{index}"), node)
+            for node, weight in self._weights.items()
+            for index in range(self.replicas * weight)
+        )
+        self._points = [point for point, _ in ring]
+        self._owners = [node for _, node in ring]
+
+    def add(self, node: str, weight: int = 1) -> None:
+        """Add a node, or change its weight.
+
+        Args:
+            node (str): The node.
+            weight (int): The relative share of keys the node receives.
+        """
+        if self._weights.get(node) == weight:
+            return
+        self._weights[node] = weight
+        self._rebuild()
+
+    def remove(self, node: str) -> None:
+        """Remove a node if it is on the ring."""
+        if self._weights.pop(node, None) is not None:
+            self._rebuild()
+
+    def get(self, key: AccountKey) -> Optional[str]:
+        """Get the node a key belongs to, or None if the ring is empty."""
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(str(key)))
+        return self._owners[index % len(self._owners)]
+
+    def assign(self, keys: Iterable[AccountKey]) -> dict[str, list[AccountKey]]:
+        """Group keys by the node they belong to.
+
+        Args:
+            keys (Iterable[AccountKey]): The keys.
+
+        Returns:
+            dict[str, list[AccountKey]]: The keys of each node, in the given order.
+        """
+        assignment: dict[str, list[AccountKey]] = {node: [] for node in self.nodes}
+        for key in keys:
+            node = self.get(key)
+            if node is not None:
+                assignment[node].append(key)
+        return assignment
+
+
+class ShardCoordinator:
+    """
+    A coordinator that assigns accounts, keyed by `hg_id` or player ID, to the live workers.
+
+    Workers register themselves in a shared state backend with a heartbeat, and every worker builds
+    the same `HashRing` from the registered workers. A worker only processes the accounts it owns,
+    so the per-account creds, caches and device bindings stay warm on one worker. Use a
+    `SQLiteStateBackend` on a shared path for local processes, or a networked backend for nodes.
+
+    Args:
+        backend (BaseStateBackend): The state backend shared by the workers.
+        worker_id (Optional[str]): The unique ID of this worker. A random ID is used if not provided.
+        weight (int): The relative share of accounts this worker receives.
+        ttl (float): How long a worker stays registered without a heartbeat, in seconds.
+        replicas (int): The number of ring points per worker and unit of weight.
+        key (str): The key of the worker registry in the backend.
+    """
+
+    def __init__(
+        self,
+        backend: BaseStateBackend,
+        worker_id: Optional[str] = None,
+        weight: int = 1,
+        ttl: float = 30.0,
+        replicas: int = 128,
+        key: str = "hypernet:shard_workers",
+    ) -> None:
+        self.backend = backend
+        self.worker_id = worker_id or uuid.uuid4().hex
+        self.weight = weight
+        self.ttl = ttl
+        self.key = key
+        self.ring = HashRing(replicas=replicas)
+        self._task: Optional[asyncio.Task] = None
+
+    async def _update(self, register: bool) -> None:
+        async with self.backend.lease(f"{self.key}:lock", ttl=10.0):
+            workers = await self.backend.get(self.key) or {}
+            now = time.time()
+            workers = {worker: item for worker, item in workers.items() if item["expires_at"] > now}
+            if register:
+                workers[self.worker_id] = {"weight": self.weight, "expires_at": now + self.ttl}
+            else:
+                workers.pop(self.worker_id, None)
+            await self.backend.set(self.key, workers)
+        self._load(workers)
+
+    def _load(self, workers: dict[str, dict]) -> None:
+        ring = HashRing(replicas=self.ring.replicas)
+        for worker, item in workers.items():
+            ring.add(worker, item["weight"])
+        self.ring = ring
+
+    async def join(self) -> None:
+        """Register this worker, or renew its registration."""
+        await self._update(True)
+
+    async def leave(self) -> None:
+        """Unregister this worker, handing its accounts over to the others."""
+        await self._update(False)
+
+    async def refresh(self) -> None:
+        """Rebuild the ring from the live workers in the backend."""
+        workers = await self.backend.get(self.key) or {}
+        now = time.time()
+        self._load({worker: item for worker, item in workers.items() if item["expires_at"] > now})
+
+    def get_worker(self, account: AccountKey) -> Optional[str]:
+        """Get the worker an account is assigned to, or None if there are no workers."""
+        return self.ring.get(account)
+
+    def owns(self, account: AccountKey) -> bool:
+        """Whether an account is assigned to this worker."""
+        return self.ring.get(account) == self.worker_id
+
+    def filter(self, accounts: Iterable[AccountKey]) -> list[AccountKey]:
+        """Get the accounts that are assigned to this worker, in the given order."""
+        return [account for account in accounts if self.owns(account)]
+
+    async def _heartbeat(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.join()
+
+    async def start(self, interval: Optional[float] = None) -> None:
+        """Register this worker and renew its registration in the background.
+
+        Args:
+            interval (Optional[float]): How often to renew the registration, in seconds. Defaults to a third of `ttl`.
+        """
+        await self.join()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._heartbeat(interval or self.ttl / 3))
+
+    async def stop(self) -> None:
+        """Stop the heartbeat and unregister this worker."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.leave()
+
+    async def __aenter__(self) -> "ShardCoordinator":  # noqa: PYI034 typing.Self needs Python 3.11
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
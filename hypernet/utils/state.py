@@ -0,0 +1,286 @@
+"""Shared state backends for caches that should be reused across worker processes."""
+
+import abc
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import AsyncIterator, Awaitable
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Optional, Union
+
+from hypernet.client.deadline import get_remaining_time
+from hypernet.errors import TimedOut
+
+__all__ = (
+    "BaseStateBackend",
+    "MemoryStateBackend",
+    "SQLiteStateBackend",
+)
+
+
+async def _wait_to_poll(key: str, poll_interval: float) -> None:
+    remaining = get_remaining_time()
+    if remaining is None:
+        await asyncio.sleep(poll_interval)
+        return
+    if remaining <= 0:
+        raise TimedOut(f"Deadline exceeded while waiting for the lease on {key}.")
+    await asyncio.sleep(min(poll_interval, remaining))
+
+
+class BaseStateBackend(abc.ABC):
+    """
+    The base class for shared state backends.
+
+    A state backend stores JSON-serializable values with an optional time to live,
+    and provides lease-based locks so that only one process refreshes a given value at a time.
+    Expiry times are wall-clock timestamps so that they are comparable across processes.
+    """
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a value, returning None if it is missing or expired."""
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Set a value with an optional time to live in seconds."""
+
+    @abc.abstractmethod
+    async def delete(self, key: str) -> None:
+        """Delete a value."""
+
+    @abc.abstractmethod
+    async def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        """Try to acquire the lease on a key.
+
+        Args:
+            key (str): The key to lock.
+            owner (str): A unique identifier for the lease holder.
+            ttl (float): How long the lease is held before it expires, in seconds.
+
+        Returns:
+            bool: True if the lease is now held by the owner.
+        """
+
+    @abc.abstractmethod
+    async def release_lease(self, key: str, owner: str) -> None:
+        """Release the lease on a key if it is held by the owner."""
+
+    @asynccontextmanager
+    async def lease(self, key: str, ttl: float = 30.0, poll_interval: float = 0.1) -> AsyncIterator[None]:
+        """Hold the lease on a key, waiting until it becomes available.
+
+        Args:
+            key (str): The key to lock.
+            ttl (float): How long the lease is held before it expires, in seconds.
+            poll_interval (float): How often to retry while another owner holds the lease.
+
+        Raises:
+            TimedOut: If the `request_deadline` is exceeded while waiting.
+        """
+        owner = uuid.uuid4().hex
+        while True:
+            if await self.acquire_lease(key, owner, ttl):
+                break
+            await _wait_to_poll(key, poll_interval)
+        try:
+            yield
+        finally:
+            await self.release_lease(key, owner)
+
+    async def get_or_create(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        lease_ttl: float = 60.0,
+        poll_interval: float = 0.1,
+    ) -> Any:
+        """Get a value, creating it with the factory if it is missing.
+
+        Only the process holding the lease on the key calls the factory,
+        the others wait for the value to appear or for the lease to expire.
+
+        Args:
+            key (str): The key of the value.
+            factory (Callable[[], Awaitable[Any]]): The coroutine function that creates the value.
+            ttl (Optional[float]): The time to live of the created value, in seconds.
+            lease_ttl (float): How long the factory may run before another process takes over, in seconds.
+            poll_interval (float): How often to check for the value while another process creates it.
+
+        Returns:
+            Any: The cached or newly created value.
+
+        Raises:
+            TimedOut: If the `request_deadline` is exceeded while waiting for another process.
+        """
+        owner = uuid.uuid4().hex
+        while True:
+            value = await self.get(key)
+            if value is not None:
+                return value
+            if await self.acquire_lease(key, owner, lease_ttl):
+                break
+            await _wait_to_poll(key, poll_interval)
+        try:
+            value = await self.get(key)
+            if value is None:
+                value = await factory()
+                if value is not None:
+                    await self.set(key, value, ttl)
+            return value
+        finally:
+            await self.release_lease(key, owner)
+
+
+class MemoryStateBackend(BaseStateBackend):
+    """A state backend that keeps values in the memory of the current process."""
+
+    def __init__(self) -> None:
+        self._values: dict[str, tuple[Any, Optional[float]]] = {}
+        self._leases: dict[str, tuple[str, float]] = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        item = self._values.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.time():
+            del self._values[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._values[key] = (value, time.time() + ttl if ttl is not None else None)
+
+    async def delete(self, key: str) -> None:
+        self._values.pop(key, None)
+
+    async def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        lease = self._leases.get(key)
+        if lease is not None and lease[0] != owner and lease[1] > now:
+            return False
+        self._leases[key] = (owner, now + ttl)
+        return True
+
+    async def release_lease(self, key: str, owner: str) -> None:
+        lease = self._leases.get(key)
+        if lease is not None and lease[0] == owner:
+            del self._leases[key]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the values that have not expired, with their wall-clock expiry times."""
+        now = time.time()
+        return {
+            key: {"value": value, "expires_at": expires_at}
+            for key, (value, expires_at) in self._values.items()
+            if expires_at is None or expires_at > now
+        }
+
+    def load_dict(self, data: dict[str, Any]) -> None:
+        """Restore values serialized with `to_dict`, skipping the ones that have expired since."""
+        now = time.time()
+        for key, item in data.items():
+            expires_at = item.get("expires_at")
+            if expires_at is None or expires_at > now:
+                self._values[key] = (item["value"], expires_at)
+
+
+class SQLiteStateBackend(BaseStateBackend):
+    """
+    A state backend that keeps values in an SQLite database file.
+
+    The file can be shared by all worker processes on a host. Blocking database calls
+    are run in the default executor so that they do not stall the event loop.
+
+    Args:
+        path (Union[str, os.PathLike]): The path of the database file.
+        timeout (float): How long to wait for the database lock, in seconds.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], timeout: float = 5.0) -> None:
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def _get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM state WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def _set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at),
+            )
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM state WHERE key = ?", (key,))
+
+    def _acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.execute(
+                    "DELETE FROM leases WHERE key = ? AND (expires_at <= ? OR owner = ?)",
+                    (key, now, owner),
+                )
+                cursor = self._connection.execute(
+                    "INSERT OR IGNORE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                    (key, owner, now + ttl),
+                )
+                acquired = cursor.rowcount == 1
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+        return acquired
+
+    def _release_lease(self, key: str, owner: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+    async def get(self, key: str) -> Optional[Any]:
+        return await self._run(self._get, key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self._run(self._set, key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._run(self._delete, key)
+
+    async def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        return await self._run(self._acquire_lease, key, owner, ttl)
+
+    async def release_lease(self, key: str, owner: str) -> None:
+        await self._run(self._release_lease, key, owner)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,219 @@
+"""Validation of API payloads, optionally offloaded to a process pool."""
+
+import asyncio
+import io
+import json
+import os
+import pickle
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Optional, Union
+
+from pydantic import BaseModel, ValidationError
+
+from hypernet.errors import raise_for_ret_code
+from hypernet.models.base import APIResponse
+from hypernet.utils.executor import run_cpu_bound
+
+__all__ = (
+    "ModelValidationPool",
+    "decode_api_content",
+)
+
+
+def decode_api_content(content: bytes, data_type: Any) -> Any:
+    """Validate the data of a successful API response directly from its raw body.
+
+    Args:
+        content (bytes): The body of the response.
+        data_type (Any): The type to validate the data as.
+
+    Returns:
+        Any: The validated data.
+
+    Raises:
+        BadRequest: If the response contains an error.
+        ValidationError: If the data does not match `data_type`.
+    """
+    try:
+        body = APIResponse[data_type].model_validate_json(content)
+    except ValidationError:
+        data = json.loads(content)
+        if data.get("code", 0) != 0:
+            raise_for_ret_code(data)
+        raise
+    if body.code != 0:
+        raise_for_ret_code(body.model_dump(exclude_none=True))
+    return body.data
+
+
+def _type_ref(tp: type) -> Any:
+    metadata = getattr(tp, "__pydantic_generic_metadata__", None)
+    if metadata and metadata["origin"] is not None:
+        return metadata["origin"], tuple(_type_ref(arg) for arg in metadata["args"])
+    return tp
+
+
+def _resolve_type(ref: Any) -> type:
+    if isinstance(ref, tuple):
+        origin, args = ref
+        args = tuple(_resolve_type(arg) for arg in args)
+        return origin[args if len(args) > 1 else args[0]]
+    return ref
+
+
+def _rebuild_model(ref: Any, state: dict[str, Any]) -> BaseModel:
+    cls = _resolve_type(ref)
+    model = cls.__new__(cls)
+    model.__setstate__(state)
+    return model
+
+
+class _Pickler(pickle.Pickler):
+    """A pickler that sends parametrized generic models, which are not importable by name, by their origin and args."""
+
+    def reducer_override(self, obj: Any) -> Any:
+        if isinstance(obj, type) and issubclass(obj, BaseModel):
+            ref = _type_ref(obj)
+            if isinstance(ref, tuple):
+                return _resolve_type, (ref,)
+        elif isinstance(obj, BaseModel):
+            ref = _type_ref(type(obj))
+            if isinstance(ref, tuple):
+                return _rebuild_model, (ref, obj.__getstate__())
+        return NotImplemented
+
+
+def _dumps(obj: Any) -> bytes:
+    buffer = io.BytesIO()
+    _Pickler(buffer, pickle.HIGHEST_PROTOCOL).dump(obj)
+    return buffer.getvalue()
+
+
+def _validate(payload: bytes) -> bytes:
+    data_type, content, compact = pickle.loads(payload)  # noqa: S301 sent by the pool  # skipcq: BAN-B301
+    try:
+        data = decode_api_content(content, data_type)
+    except Exception:  # skipcq: PYL-W0703
+        # Errors are raised again in the parent process, where they do not have to be pickled.
+        return _dumps((False, None))
+    if compact and isinstance(data, BaseModel):
+        data = data.model_dump()
+    return _dumps((True, data))
+
+
+class ModelValidationPool:
+    """
+    A pool of worker processes that validates API payloads, so that validating large models such as
+    `EndfieldCardDetail` does not block the event loop.
+
+    Raw response bodies are sent to the workers, which return the validated models, or plain dicts in
+    compact mode. At most `max_pending` payloads are in flight; further calls wait for a free slot, so
+    fetching can not run ahead of validation. Errors are raised as if the payload had been validated
+    in the calling process.
+
+    Args:
+        max_workers (Optional[int]): The number of worker processes. Defaults to the number of CPUs.
+        max_pending (Optional[int]): The maximum number of payloads in flight. Defaults to twice the number of workers.
+        executor (Optional[Executor]): An existing executor to use instead of creating a process pool.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self._own_executor = executor is None
+        self.executor = executor or ProcessPoolExecutor(max_workers)
+        self.max_pending = max_pending or 2 * (max_workers or os.cpu_count() or 1)
+        self._semaphore = asyncio.Semaphore(self.max_pending)
+
+    async def validate(self, data_type: Any, content: bytes, compact: bool = False) -> Any:
+        """Validate the data of an API response body in a worker process.
+
+        Args:
+            data_type (Any): The type to validate the data as.
+            content (bytes): The body of the response.
+            compact (bool): Whether to return models as plain dicts, which are cheaper to send back.
+
+        Returns:
+            Any: The validated data.
+
+        Raises:
+            BadRequest: If the response contains an error.
+            ValidationError: If the data does not match `data_type`.
+        """
+        payload = _dumps((data_type, content, compact))
+        async with self._semaphore:
+            result = await run_cpu_bound(_validate, payload, executor=self.executor)
+        ok, data = pickle.loads(result)  # noqa: S301 sent by a worker of the pool  # skipcq: BAN-B301
+        if not ok:
+            data = decode_api_content(content, data_type)
+            if compact and isinstance(data, BaseModel):
+                data = data.model_dump()
+        return data
+
+    async def map(
+        self,
+        data_type: Any,
+        contents: Union[Iterable[bytes], AsyncIterable[bytes]],
+        compact: bool = False,
+        return_exceptions: bool = False,
+    ) -> AsyncIterator[Any]:
+        """Validate many API response bodies, yielding the results in the order of the bodies.
+
+        Bodies are only taken from `contents` while fewer than `max_pending` results are waiting
+        to be consumed, so a slow consumer slows down the producer instead of buffering without bound.
+
+        Args:
+            data_type (Any): The type to validate the data as.
+            contents (Union[Iterable[bytes], AsyncIterable[bytes]]): The bodies of the responses.
+            compact (bool): Whether to return models as plain dicts, which are cheaper to send back.
+            return_exceptions (bool): Whether to yield the error of a body instead of raising it.
+
+        Yields:
+            Any: The validated data, or the error if `return_exceptions` is set.
+        """
+
+        async def _iterate() -> AsyncIterator[bytes]:
+            if isinstance(contents, AsyncIterable):
+                async for item in contents:
+                    yield item
+            else:
+                for item in contents:
+                    yield item
+
+        pending: deque[asyncio.Future] = deque()
+
+        async def _pop() -> Any:
+            future = pending.popleft()
+            try:
+                return await future
+            except Exception as exc:  # skipcq: PYL-W0703
+                if return_exceptions:
+                    return exc
+                raise
+
+        try:
+            async for content in _iterate():
+                pending.append(asyncio.ensure_future(self.validate(data_type, content, compact)))
+                if len(pending) >= self.max_pending:
+                    yield await _pop()
+            while pending:
+                yield await _pop()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self) -> None:
+        """Shut down the worker processes if they were created by the pool."""
+        if self._own_executor:
+            self.executor.shutdown(cancel_futures=True)
+
+    async def __aenter__(self) -> "ModelValidationPool":  # noqa: PYI034 typing.Self needs Python 3.11
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.shutdown()
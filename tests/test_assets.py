@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, MockTransport, Response
+
+from hypernet.models.endfield.character import EndfieldCharacterKV, EndfieldCharacterSkill
+from hypernet.utils.assets import AssetCache, collect_asset_urls
+
+
+def _skill(icon_url: str) -> EndfieldCharacterSkill:
+    kv = EndfieldCharacterKV(key="k", value="v")
+    return EndfieldCharacterSkill(
+        id="1", name="skill", property=kv, type=kv, iconUrl=icon_url, desc="", descLevelParams={}, descParams={}
+    )
+
+
+@pytest.mark.asyncio
+class TestAssetCache:
+    @staticmethod
+    async def test_collect_asset_urls():
+        skills = [_skill("https://example.com/a.png"), _skill("https://example.com/a.png")]
+        assert collect_asset_urls(skills, {"x": _skill("https://example.com/b.png")}) == [
+            "https://example.com/a.png",
+            "https://example.com/b.png",
+        ]
+
+    @staticmethod
+    async def test_deduplicated_download(tmp_path):
+        calls = []
+
+        async def handler(request):
+            calls.append(str(request.url))
+            await asyncio.sleep(0.01)
+            return Response(200, content=b"same image")
+
+        async with AssetCache(tmp_path, client=AsyncClient(transport=MockTransport(handler))) as cache:
+            urls = ["https://example.com/a.png", "https://example.com/b.png", "https://example.com/a.png"]
+            paths = await cache.get_many(urls)
+            assert len(calls) == 2
+            assert paths["https://example.com/a.png"] == paths["https://example.com/b.png"]
+            assert cache.size == len(b"same image")
+            await cache.get("https://example.com/a.png")
+            assert len(calls) == 2
+            assert cache.read_mmap("https://example.com/a.png")[:] == b"same image"
+
+    @staticmethod
+    async def test_lru_eviction(tmp_path):
+        transport = MockTransport(lambda request: Response(200, content=request.url.path.encode() * 50))
+        async with AssetCache(tmp_path, max_size=350, client=AsyncClient(transport=transport)) as cache:
+            for name in ("/a", "/b", "/c"):
+                await cache.get(f"https://example.com{name}")
+                await asyncio.sleep(0.01)
+            cache.get_path("https://example.com/a")
+            await cache.get("https://example.com/d")
+            assert cache.get_path("https://example.com/b") is None
+            assert cache.get_path("https://example.com/a") is not None
+            assert cache.size <= 350
+
+    @staticmethod
+    async def test_store_keeps_new_object(tmp_path):
+        transport = MockTransport(lambda request: Response(200, content=b"x" * 100))
+        async with AssetCache(tmp_path, max_size=10, client=AsyncClient(transport=transport)) as cache:
+            path = await cache.get("https://example.com/big")
+            assert path.read_bytes() == b"x" * 100
+            assert cache.get_path("https://example.com/big") == path
+            assert not list(path.parent.glob("*.tmp"))
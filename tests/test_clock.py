@@ -0,0 +1,53 @@
+import time
+from email.utils import formatdate
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import AsyncClient, MockTransport, Response
+
+from hypernet.client.base import BaseClient
+from hypernet.client.clock import ServerClock
+
+
+class TestServerClock:
+    @staticmethod
+    def test_observe():
+        clock = ServerClock(alpha=0.5)
+        now = time.time()
+        assert clock.observe(now + 10.5, now - 1, now + 1)
+        assert clock.offset == pytest.approx(11)
+        assert clock.observe(now + 20.5, now - 1, now + 1)
+        assert clock.offset == pytest.approx(16)
+        assert not clock.observe(now + 100, now - 10, now)
+        assert clock.metrics["samples"] == 2
+        assert clock.now() == pytest.approx(time.time() + 16, abs=0.1)
+
+    @staticmethod
+    def test_observe_response():
+        clock = ServerClock()
+        now = time.time()
+        assert clock.observe_response(Response(200, headers={"Date": formatdate(now + 30, usegmt=True)}), now, now)
+        assert clock.offset == pytest.approx(30, abs=1)
+        assert not clock.observe_response(Response(200, headers={"Date": "invalid"}), now, now)
+        assert not clock.observe_response(Response(200), now, now)
+
+
+@pytest.mark.asyncio
+class TestClockSigning:
+    @staticmethod
+    async def test_signature_timestamp_uses_server_time():
+        timestamps = []
+
+        def handler(request):
+            timestamps.append(int(request.headers["timestamp"]))
+            date = formatdate(time.time() + 3600, usegmt=True)
+            return Response(200, headers={"Date": date}, json={"code": 0, "message": "OK", "data": {}})
+
+        client = BaseClient(cookies={"cred": "c"}, clock=ServerClock())
+        client.client = AsyncClient(transport=MockTransport(handler))
+        client.get_sign_token = AsyncMock(return_value="token")
+        client.get_device_id = AsyncMock(return_value="did")
+        await client.request_lab("https://zonai.skport.com/api/v1/test")
+        await client.request_lab("https://zonai.skport.com/api/v1/test")
+        assert timestamps[0] == pytest.approx(time.time(), abs=5)
+        assert timestamps[1] == pytest.approx(time.time() + 3600, abs=5)
@@ -0,0 +1,54 @@
+from httpx import Cookies as HTTPXCookies
+from httpx import Request, Response
+
+from hypernet.client.cookies import Cookies
+
+COOKIE_STRING = "; ".join(
+    [f"extra_{index}=value_{index}" for index in range(40)]
+    + ["hg_token=token", "hg_id=1000", "cred=cred", "lab_user_id=2000", "lab_show_user_id=3000"]
+)
+
+
+class TestCookies:
+    @staticmethod
+    def test_properties():
+        cookies = Cookies(COOKIE_STRING)
+        assert cookies.hg_token == "token"
+        assert cookies.hg_id == 1000
+        assert cookies.cred == "cred"
+        assert cookies.lab_user_id == 2000
+        assert cookies.lab_show_user_id == 3000
+        cookies.cred = "new"
+        assert cookies.cred == "new"
+        assert Cookies(cookies).cred == "new"
+        del cookies["cred"]
+        assert cookies.cred is None
+        assert isinstance(cookies, HTTPXCookies)
+
+    @staticmethod
+    def test_get_by_domain():
+        cookies = Cookies()
+        cookies.set("cred", "a", domain="a.example.com")
+        cookies.set("other", "b", domain="b.example.com")
+        assert cookies.get("cred", domain="b.example.com") is None
+        assert cookies.get("cred", domain="a.example.com") == "a"
+        assert cookies.get("other", path="/") == "b"
+        cookies.clear(domain="a.example.com")
+        assert cookies.cred is None
+
+    @staticmethod
+    def test_index_follows_jar():
+        cookies = Cookies(COOKIE_STRING)
+        cookies.jar.clear()
+        cookies.reindex()
+        assert cookies.cred is None
+        cookies.update({"cred": "updated", "hg_id": "1"})
+        assert (cookies.cred, cookies.hg_id) == ("updated", 1)
+        assert cookies.get("extra_0") is None
+
+    @staticmethod
+    def test_extract_cookies():
+        cookies = Cookies({"cred": "old"})
+        request = Request("GET", "https://zonai.skport.com/")
+        cookies.extract_cookies(Response(200, headers={"Set-Cookie": "cred=new; Path=/"}, request=request))
+        assert cookies.cred == "new"
@@ -0,0 +1,104 @@
+import asyncio
+import csv
+import io
+
+import pytest
+
+from hypernet.client.base import BaseClient
+from hypernet.client.cookies import Credential
+from hypernet.client.credential_io import (
+    CredentialImportReport,
+    iter_credential_batches,
+    iter_credentials,
+    validate_credentials,
+    write_credentials,
+)
+from hypernet.utils.cookies import parse_known_cookies
+from hypernet.utils.enums import Region
+
+CREDENTIALS = [
+    Credential(hg_token="token", hg_id=1, cred="cred1", lab_user_id=10, region=Region.CHINESE, player_id=100),
+    Credential(cred="cred2", lab_user_id=20, lab_show_user_id=21),
+]
+
+
+class TestCredentialIO:
+    @staticmethod
+    def test_parse_known_cookies():
+        cookie = 'cred=abc; hg_id="123"; other=1; Path=/; hg_token=a=b'
+        assert parse_known_cookies(cookie) == {"cred": "abc", "hg_id": "123", "hg_token": "a=b"}
+
+    @staticmethod
+    @pytest.mark.parametrize("suffix", [".jsonl", ".csv"])
+    def test_round_trip(tmp_path, suffix):
+        path = tmp_path / f"credentials{suffix}"
+        assert write_credentials(path, CREDENTIALS) == 2
+        assert path.stat().st_mode & 0o777 == 0o600
+        assert list(iter_credentials(path)) == CREDENTIALS
+
+    @staticmethod
+    def test_malformed_lines():
+        file = io.StringIO(
+            '{"cookie": "cred=a; hg_id=1", "region": "cn"}\n'
+            "not json\n"
+            "\n"
+            '{"hg_id": 2}\n'
+            '"cred=b"\n'
+            '{"cred": "c", "region": "xx"}\n'
+            "[1]\n"
+        )
+        report = CredentialImportReport()
+        credentials = list(iter_credentials(file, "jsonl", report))
+        assert [credential.cred for credential in credentials] == ["a", "b"]
+        assert credentials[0].region is Region.CHINESE
+        assert credentials[0].hg_id == 1
+        assert report.loaded == 2
+        assert [line for line, _ in report.errors] == [2, 4, 6, 7]
+
+    @staticmethod
+    def test_undecodable_lines(tmp_path):
+        path = tmp_path / "credentials.txt"
+        path.write_bytes(b"cred=a\n\xff\xfe cred=b\ncred=c\n")
+        report = CredentialImportReport()
+        assert [credential.cred for credential in iter_credentials(path, report=report)] == ["a", "c"]
+        assert (report.loaded, report.errors[0][0]) == (2, 2)
+
+        path = tmp_path / "credentials.csv"
+        path.write_bytes(b"cred,region\na,cn\n" + b"b" * 200 + b",cn\n\xffc,cn\nd,os\n")
+        report = CredentialImportReport()
+        limit = csv.field_size_limit(100)
+        try:
+            assert [credential.cred for credential in iter_credentials(path, report=report)] == ["a", "d"]
+        finally:
+            csv.field_size_limit(limit)
+        assert [line for line, _ in report.errors] == [3, 4]
+
+    @staticmethod
+    def test_batches():
+        file = io.StringIO("".join(f"cred=cred{index}\n" for index in range(5)))
+        assert [len(batch) for batch in iter_credential_batches(file, 2, "txt")] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+class TestValidateCredentials:
+    @staticmethod
+    async def test_validate():
+        in_flight = 0
+        max_in_flight = 0
+
+        async def check(view):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            try:
+                await asyncio.sleep(0.01)
+                if view.cookies.cred == "bad":
+                    raise ValueError("bad")
+            finally:
+                in_flight -= 1
+
+        credentials = [Credential(cred=f"cred{index}") for index in range(10)] + [Credential(cred="bad")]
+        results = [result async for result in validate_credentials(BaseClient(), credentials, check, concurrency=3)]
+        assert len(results) == 11
+        assert max_in_flight == 3
+        assert {credential.cred for credential, error in results if error is not None} == {"bad"}
@@ -0,0 +1,42 @@
+import pickle
+
+from hypernet.client.base import BaseClient
+from hypernet.client.cookies import Cookies, CookiesModel, Credential
+from hypernet.utils.enums import Region
+
+COOKIES = {"hg_token": "token", "hg_id": "1000", "cred": "cred", "lab_user_id": "2000", "lab_show_user_id": "3000"}
+
+
+class TestCredential:
+    @staticmethod
+    def test_conversions():
+        credential = Credential.from_cookies(COOKIES, region=Region.CHINESE, player_id=4000)
+        assert credential.hg_id == 1000
+        assert credential.cred == "cred"
+        assert Credential.from_cookies(credential.to_cookies(), Region.CHINESE, 4000) == credential
+        assert Credential.from_cookies(credential.to_model(), Region.CHINESE, 4000) == credential
+        assert Credential.from_cookies("cred=cred; hg_id=1000").to_model() == CookiesModel(cred="cred", hg_id=1000)
+        assert credential.to_dict() == COOKIES
+        assert pickle.loads(pickle.dumps(credential)) == credential
+        assert "token" not in repr(credential)
+        assert not hasattr(credential, "__dict__")
+        assert Cookies(credential).cred == "cred"
+
+    @staticmethod
+    def test_client_accepts_credential():
+        credential = Credential.from_cookies(COOKIES, region=Region.CHINESE, player_id=4000)
+        client = BaseClient(cookies=credential)
+        assert client.cookies.cred == "cred"
+        assert client.region is Region.CHINESE
+        assert client.player_id == 4000
+        assert client.account_id == 2000
+        view = BaseClient().view(credential)
+        assert view.region is Region.CHINESE
+        assert view.player_id == 4000
+
+    @staticmethod
+    def test_explicit_region_wins():
+        credential = Credential.from_cookies(COOKIES, region=Region.CHINESE)
+        assert BaseClient(cookies=credential, region=Region.OVERSEAS).region is Region.OVERSEAS
+        assert BaseClient().view(credential, region=Region.OVERSEAS).region is Region.OVERSEAS
+        assert BaseClient(cookies=Credential.from_cookies(COOKIES)).region is Region.OVERSEAS
@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient, MockTransport, Response
+
+from hypernet.client.base import BaseClient
+from hypernet.client.deadline import get_remaining_time, request_deadline
+from hypernet.errors import TimedOut
+
+
+@pytest.mark.asyncio
+class TestDeadline:
+    @staticmethod
+    async def test_nested_deadline_only_shrinks():
+        assert get_remaining_time() is None
+        with request_deadline(1.0), request_deadline(10.0):
+            assert get_remaining_time() <= 1.0
+        assert get_remaining_time() is None
+
+    @staticmethod
+    async def test_request_aborts_when_budget_spent():
+        calls = 0
+
+        async def handler(request):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(1)
+            return Response(200, json={"code": 0, "data": {}})
+
+        async with BaseClient() as client:
+            client.client = AsyncClient(transport=MockTransport(handler))
+            start = time.monotonic()
+            with request_deadline(0.1):
+                with pytest.raises(TimedOut):
+                    await client.request("GET", "https://example.com/a")
+                with pytest.raises(TimedOut):
+                    await client.request("GET", "https://example.com/b")
+            assert time.monotonic() - start < 0.5
+            assert calls == 1
@@ -0,0 +1,41 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import AsyncClient, MockTransport, Response
+
+from hypernet.client.components.chronicle.endfield import EndfieldBattleChronicleClient
+from hypernet.errors import InvalidCookies
+
+CARD_DETAIL = {
+    "code": 0,
+    "message": "OK",
+    "data": {
+        "detail": {
+            "bpSystem": {"curLevel": 10, "maxLevel": 60},
+            "dailyMission": {"dailyActivation": 100, "maxDailyActivation": 100},
+            "dungeon": {"curStamina": 80, "maxStamina": 240, "maxTs": 1767225600},
+            "chars": [{"not": "a valid character"}],
+        }
+    },
+}
+
+
+@pytest.mark.asyncio
+class TestDecodeApiData:
+    @staticmethod
+    async def test_notes_skip_card_subtrees():
+        async with EndfieldBattleChronicleClient(player_id=1000000001, account_id=1) as client:
+            client.client = AsyncClient(transport=MockTransport(lambda request: Response(200, json=CARD_DETAIL)))
+            client.get_sign_token = AsyncMock(return_value=None)
+            notes = await client.get_endfield_notes(cred="cred")
+            assert notes.player_id == 1000000001
+            assert notes.current_stamina == 80
+
+    @staticmethod
+    async def test_error_code_raises():
+        body = {"code": 10002, "message": "cred expired", "data": {}}
+        async with EndfieldBattleChronicleClient(player_id=1000000001, account_id=1) as client:
+            client.client = AsyncClient(transport=MockTransport(lambda request: Response(200, json=body)))
+            client.get_sign_token = AsyncMock(return_value=None)
+            with pytest.raises(InvalidCookies):
+                await client.get_endfield_notes(cred="cred")
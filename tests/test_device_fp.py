@@ -0,0 +1,115 @@
+import asyncio
+import base64
+import time
+from unittest import mock
+
+import pytest
+from Crypto.Cipher import DES
+
+from hypernet.client.deadline import request_deadline
+from hypernet.errors import TimedOut
+from hypernet.utils.device_fp import (
+    BROWSER_ENV,
+    DES_RULE,
+    SKLAND_SM_CONFIG,
+    DeviceFPBuilder,
+    SklandDeviceFP,
+    encrypt_des,
+    encrypt_object_by_des_rules,
+    get_tn,
+    md5_hash,
+)
+
+
+def reference_encrypt_des(message: str, key: str) -> str:
+    message_bytes = str(message).encode()
+    while len(message_bytes) % 8 != 0:
+        message_bytes += b"\0"
+    cipher = DES.new(key.encode()[:8].ljust(8, b"\0"), DES.MODE_ECB)
+    return base64.b64encode(cipher.encrypt(message_bytes)).decode()
+
+
+class TestDeviceFPBuilder:
+    @staticmethod
+    def test_encrypt_des():
+        for message in ("", "a", "12345678", "0123456789", "设备"):
+            assert encrypt_des(message, "uy7mzc4h") == reference_encrypt_des(message, "uy7mzc4h")
+
+    @staticmethod
+    def test_encrypt_target_matches_rules():
+        values = {"vpw": "vpw", "svm": 1700000000000, "trees": "trees", "pmf": 1700000000001, "smid": "smid"}
+        target = {
+            **BROWSER_ENV,
+            "vpw": "vpw",
+            "svm": 1700000000000,
+            "trees": "trees",
+            "pmf": 1700000000001,
+            "protocol": 102,
+            "organization": SKLAND_SM_CONFIG["organization"],
+            "appId": SKLAND_SM_CONFIG["appId"],
+            "os": "web",
+            "version": "3.0.0",
+            "sdkver": "3.0.0",
+            "box": "",
+            "rtype": "all",
+            "smid": "smid",
+            "subVersion": "1.0.0",
+            "time": 0,
+        }
+        target["tn"] = md5_hash(get_tn(target))
+        expected = encrypt_object_by_des_rules(target, DES_RULE)
+        result = DeviceFPBuilder().encrypt_target(values)
+        assert result == expected
+        assert list(result) == list(expected)
+
+    @staticmethod
+    def test_build_many():
+        bodies = DeviceFPBuilder().build_many(3)
+        assert len(bodies) == 3
+        assert len({body["data"] for body in bodies}) == 3
+        assert all(body["organization"] == SKLAND_SM_CONFIG["organization"] for body in bodies)
+
+
+@pytest.mark.asyncio
+class TestSklandDeviceFP:
+    @staticmethod
+    async def test_get_device_ids_concurrency():
+        in_flight = 0
+        max_in_flight = 0
+
+        async def request_device_id(client, body):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return f"B{body['data'][:8]}"
+
+        with mock.patch.object(SklandDeviceFP, "request_device_id", request_device_id):
+            device_ids = await SklandDeviceFP.get_device_ids(6, concurrency=2)
+        assert len(device_ids) == 6
+        assert max_in_flight == 2
+
+    @staticmethod
+    async def test_fetch_device_id_stops_retrying_at_deadline():
+        calls = 0
+
+        async def get_device_id():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise ValueError("failed")
+
+        with mock.patch.object(SklandDeviceFP, "get_device_id", staticmethod(get_device_id)):
+            start = time.monotonic()
+            with request_deadline(0.1), pytest.raises(TimedOut):
+                await SklandDeviceFP.fetch_device_id()
+        assert time.monotonic() - start < 0.5
+        assert calls == 2
+
+    @staticmethod
+    async def test_request_device_id_not_sent_after_deadline():
+        client = mock.AsyncMock()
+        with request_deadline(0), pytest.raises(TimedOut):
+            await SklandDeviceFP.request_device_id(client, {})
+        client.post.assert_not_called()
@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import pytest
+from httpx import AsyncClient, MockTransport, Response
+
+from hypernet.client.base import BaseClient
+from hypernet.client.deadline import get_remaining_time, request_deadline
+from hypernet.client.device_pool import DeviceIDPool
+from hypernet.client.health import AccountHealthTracker
+from hypernet.errors import InvalidDevice, NetworkError
+
+
+class CountingGenerator:
+    def __init__(self, fail: bool = False):
+        self.generated = 0
+        self.fail = fail
+
+    async def __call__(self, count):
+        if self.fail:
+            return [RuntimeError("failed")] * count
+        start = self.generated
+        self.generated += count
+        return [f"B{index}" for index in range(start, start + count)]
+
+
+@pytest.mark.asyncio
+class TestDeviceIDPool:
+    @staticmethod
+    async def test_stable_assignment_and_rotation():
+        pool = DeviceIDPool(size=4, low_watermark=2, generate=CountingGenerator())
+        await pool.start()
+        await pool.refill()
+        first = await pool.get("a")
+        assert await pool.get("a") == first
+        assert await pool.get("b") != first
+        pool.rotate("a")
+        assert await pool.get("a") not in (first, await pool.get("b"))
+        await pool.refill()
+        assert len(pool) == 4
+
+    @staticmethod
+    async def test_persistence(tmp_path):
+        path = tmp_path / "devices.json"
+        async with DeviceIDPool(path, size=2, generate=CountingGenerator()) as pool:
+            await pool.refill()
+            device_id = await pool.get("secret-cred")
+        assert "secret-cred" not in path.read_text()
+
+        restored = DeviceIDPool(path, size=2, generate=CountingGenerator(fail=True))
+        assert restored.load()
+        assert await restored.get("secret-cred") == device_id
+        assert len(restored) == 1
+
+    @staticmethod
+    async def test_refill_ignores_request_context():
+        remaining = []
+        generate = CountingGenerator()
+
+        async def record(count):
+            remaining.append(get_remaining_time())
+            return await generate(count)
+
+        pool = DeviceIDPool(size=2, generate=record)
+        with request_deadline(5):
+            await pool.refill()
+        assert remaining == [None]
+
+    @staticmethod
+    async def test_debounced_save(tmp_path):
+        path = tmp_path / "devices.json"
+        pool = DeviceIDPool(path, size=8, low_watermark=0, generate=CountingGenerator(), save_delay=0.05)
+        writes = []
+        write = pool._write
+        pool._write = lambda *args: writes.append(write(*args))
+        await pool.refill()
+        for cred in ("a", "b", "c"):
+            await pool.get(cred)
+        assert not writes
+        await asyncio.sleep(0.1)
+        assert len(writes) == 1
+        await pool.get("d")
+        await pool.stop()
+        assert len(writes) == 2
+        assert len(json.loads(path.read_text())["assigned"]) == 4
+
+    @staticmethod
+    async def test_cold_start_failure():
+        pool = DeviceIDPool(generate=CountingGenerator(fail=True))
+        with pytest.raises(NetworkError):
+            await pool.get("a")
+
+    @staticmethod
+    async def test_client_rotates_invalid_device():
+        dids = []
+
+        def handler(request):
+            dids.append(request.headers["dId"])
+            return Response(200, json={"code": 5003, "message": "", "data": None})
+
+        pool = DeviceIDPool(size=4, generate=CountingGenerator())
+        health = AccountHealthTracker(error_types=(InvalidDevice,), threshold=1)
+        client = BaseClient(cookies={"cred": "c"}, device_pool=pool, health=health)
+        client.client = AsyncClient(transport=MockTransport(handler))
+
+        async def get_sign_token(*args, **kwargs):
+            return "token"
+
+        client.get_sign_token = get_sign_token
+        for _ in range(2):
+            with pytest.raises(InvalidDevice):
+                await client.request_lab("https://zonai.skport.com/api/v1/test")
+        assert dids[0] != dids[1]
+        assert not health.is_quarantined("c")
+        await asyncio.sleep(0)
@@ -0,0 +1,26 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from hypernet.utils.device_fp import build_device_fp_payloads
+from hypernet.utils.executor import get_cpu_executor, run_cpu_bound, set_cpu_executor
+
+
+@pytest.mark.asyncio
+class TestCPUExecutor:
+    @staticmethod
+    async def test_set_executor():
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            set_cpu_executor(executor)
+            try:
+                assert get_cpu_executor() is executor
+                assert len(await run_cpu_bound(build_device_fp_payloads, 2)) == 2
+            finally:
+                set_cpu_executor(None)
+        assert get_cpu_executor() is None
+
+    @staticmethod
+    async def test_default_executor():
+        payloads = await run_cpu_bound(build_device_fp_payloads, 3)
+        assert len(payloads) == 3
+        assert all(isinstance(payload, dict) for payload in payloads)
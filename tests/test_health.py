@@ -0,0 +1,70 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import AsyncClient, MockTransport, Response
+
+from hypernet.client.base import BaseClient
+from hypernet.client.health import AccountHealthTracker
+from hypernet.errors import AccountNotFound, AccountQuarantined, InvalidCookies, InvalidDevice, TimedOut
+
+
+@pytest.mark.asyncio
+class TestAccountHealthTracker:
+    @staticmethod
+    async def test_exponential_quarantine():
+        tracker = AccountHealthTracker(threshold=2, base_quarantine=10)
+        assert not tracker.record_failure("cred", TimedOut())
+        assert tracker.record_failure("cred", InvalidCookies())
+        assert not tracker.is_quarantined("cred")
+        tracker.record_failure("cred", InvalidCookies())
+        first = tracker.get("cred").quarantined_until
+        assert tracker.is_quarantined("cred")
+        assert not await tracker.check("cred")
+        tracker.record_failure("cred", InvalidCookies())
+        assert tracker.get("cred").quarantined_until - first > 5
+        assert tracker.get("cred").failures == {"InvalidCookies": 3}
+        tracker.record_success("cred")
+        assert await tracker.filter(["cred", "other"]) == ["cred", "other"]
+
+    @staticmethod
+    async def test_default_counts_cred_failures_only():
+        tracker = AccountHealthTracker()
+        for _ in range(5):
+            assert not tracker.record_failure("cred", AccountNotFound())
+            assert not tracker.record_failure("cred", InvalidDevice())
+        assert not tracker.is_quarantined("cred")
+        for _ in range(2):
+            tracker.record_failure("cred", InvalidCookies())
+        assert not tracker.is_quarantined("cred")
+        tracker.record_failure("cred", InvalidCookies())
+        assert tracker.is_quarantined("cred")
+
+    @staticmethod
+    async def test_revalidation():
+        revalidate = AsyncMock(side_effect=[False, True])
+        tracker = AccountHealthTracker(threshold=1, base_quarantine=0, revalidate=revalidate)
+        tracker.record_failure("cred", InvalidCookies())
+        assert not await tracker.check("cred")
+        assert tracker.get("cred").quarantines == 2
+        tracker.get("cred").quarantined_until = 0
+        assert await tracker.check("cred")
+        assert tracker.get("cred").score == 1.0
+
+    @staticmethod
+    async def test_client_skips_quarantined_cred():
+        calls = 0
+
+        def handler(request):
+            nonlocal calls
+            calls += 1
+            return Response(200, json={"code": 10002, "message": "cred expired"})
+
+        async with BaseClient(health=AccountHealthTracker()) as client:
+            client.client = AsyncClient(transport=MockTransport(handler))
+            client.get_sign_token = AsyncMock(return_value=None)
+            for _ in range(3):
+                with pytest.raises(InvalidCookies):
+                    await client.request_base_api("user/check", cred="cred")
+            with pytest.raises(AccountQuarantined):
+                await client.request_base_api("user/check", cred="cred")
+        assert calls == 3
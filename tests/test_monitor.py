@@ -0,0 +1,49 @@
+import asyncio
+import time
+from unittest import mock
+
+import pytest
+
+from hypernet.utils.monitor import LoopLagMonitor
+
+
+def blocking_phase():
+    time.sleep(0.3)
+
+
+async def blocking_call():
+    blocking_phase()
+
+
+@pytest.mark.asyncio
+class TestLoopLagMonitor:
+    @staticmethod
+    async def test_stall_is_attributed():
+        events = []
+        async with LoopLagMonitor(
+            threshold=0.1, interval=0.02, packages=(__name__,), on_stall=events.append
+        ) as monitor:
+            await asyncio.sleep(0.05)
+            await blocking_call()
+            await asyncio.sleep(0.05)
+        assert monitor.stalls == 1
+        assert events[0].lag >= 0.2
+        assert events[0].call == f"{__name__}.test_stall_is_attributed"
+        assert events[0].phase == f"{__name__}.blocking_phase"
+        assert monitor.metrics["phases"] == {f"{__name__}.blocking_phase": 1}
+
+    @staticmethod
+    async def test_failing_callback_keeps_monitor_running():
+        def on_stall(event):
+            raise ValueError("failed")
+
+        with mock.patch("hypernet.utils.monitor._LOGGER") as logger:
+            async with LoopLagMonitor(threshold=0.1, interval=0.02, packages=(__name__,), on_stall=on_stall) as monitor:
+                await asyncio.sleep(0.05)
+                await blocking_call()
+                await asyncio.sleep(0.05)
+                await blocking_call()
+                await asyncio.sleep(0.05)
+                assert monitor.running
+        assert monitor.stalls == 2
+        assert logger.exception.call_count == 2
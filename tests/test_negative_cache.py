@@ -0,0 +1,65 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import AsyncClient, MockTransport, Response
+
+from hypernet.client.endfield import EndfieldClient
+from hypernet.client.negative_cache import NegativeCache
+from hypernet.errors import AccountNotFound, LabAccountNotFound, NotSupported
+
+
+class TestNegativeCache:
+    @staticmethod
+    def test_ttl_per_error_class():
+        cache = NegativeCache(ttls={AccountNotFound: 60, LabAccountNotFound: 0}, max_size=2)
+        assert cache.record("a", "GET /x", AccountNotFound())
+        assert not cache.record("a", "GET /y", LabAccountNotFound())
+        assert not cache.record("a", "GET /z", NotSupported())
+        assert isinstance(cache.get("a", "GET /x"), AccountNotFound)
+        assert cache.get("b", "GET /x") is None
+        cache.record("b", "GET /x", AccountNotFound())
+        cache.record("c", "GET /x", AccountNotFound())
+        assert cache.get("a", "GET /x") is None
+        cache.invalidate("b")
+        assert len(cache) == 1
+
+    @staticmethod
+    def test_get_returns_copies():
+        cache = NegativeCache()
+        error = AccountNotFound({"code": 10001, "message": "no account"})
+        cache.record("a", "GET /x", error)
+        try:
+            raise cache.get("a", "GET /x")
+        except AccountNotFound as exc:
+            first = exc
+        second = cache.get("a", "GET /x")
+        assert first is not second
+        assert second.__traceback__ is None
+        assert (second.ret_code, second.original, str(second)) == (10001, "no account", str(error))
+
+
+@pytest.mark.asyncio
+class TestNegativeCacheClient:
+    @staticmethod
+    async def test_unbound_and_unsupported_cached():
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.path)
+            if request.url.path.endswith("missing"):
+                return Response(404)
+            return Response(200, json={"code": 0, "data": {"list": []}})
+
+        async with EndfieldClient(negative_cache=NegativeCache()) as client:
+            client.client = AsyncClient(transport=MockTransport(handler))
+            client.get_sign_token = AsyncMock(return_value=None)
+            for _ in range(2):
+                with pytest.raises(AccountNotFound):
+                    await client.get_default_endfield_account_id(cred="cred")
+                with pytest.raises(NotSupported):
+                    await client.request_base_api("missing", cred="cred")
+            assert len(calls) == 2
+            await client.invalidate_account("cred")
+            with pytest.raises(AccountNotFound):
+                await client.get_default_endfield_account_id(cred="cred")
+            assert len(calls) == 3
@@ -0,0 +1,43 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import AsyncClient, MockTransport, Response
+
+from hypernet.client.components.chronicle.overview import EndfieldOverviewClient
+from hypernet.errors import InvalidCookies
+
+REWARD_INFO = {
+    "code": 0,
+    "message": "OK",
+    "data": {
+        "currentTs": 1767225600,
+        "calendar": [{"awardId": "1", "available": True, "done": False}],
+        "first": [],
+        "resourceInfoMap": {"1": {"id": "1", "count": 1, "name": "item", "icon": "https://example.com/1.png"}},
+        "hasToday": False,
+    },
+}
+
+
+@pytest.mark.asyncio
+class TestEndfieldOverviewClient:
+    @staticmethod
+    async def test_partial_failure():
+        paths = []
+
+        def handler(request):
+            paths.append(request.url.path)
+            if request.url.path.endswith("attendance"):
+                return Response(200, json=REWARD_INFO)
+            return Response(200, json={"code": 10002, "message": "cred expired", "data": {}})
+
+        async with EndfieldOverviewClient(player_id=1000000001, account_id=1) as client:
+            client.client = AsyncClient(transport=MockTransport(handler))
+            client.get_sign_token = AsyncMock(return_value=None)
+            overview = await client.get_endfield_overview(cred="cred")
+        assert sorted(paths) == ["/api/v1/game/endfield/attendance", "/api/v1/game/endfield/card/detail"]
+        assert not overview.ok
+        assert overview.reward_info is not None
+        assert overview.card is None
+        assert isinstance(overview.errors["card"], InvalidCookies)
+        assert isinstance(overview.errors["notes"], InvalidCookies)
@@ -0,0 +1,53 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import AsyncClient, MockTransport, Response
+
+from hypernet.client.base import BaseClient
+from hypernet.client.region import request_region
+from hypernet.errors import RegionNotSupported
+from hypernet.utils.enums import Region
+
+
+@pytest.mark.asyncio
+class TestRequestRegion:
+    @staticmethod
+    async def test_per_call_region():
+        hosts = []
+
+        def handler(request):
+            hosts.append((request.url.host, request.headers["user-agent"]))
+            return Response(200, json={"code": 0, "data": {}})
+
+        client = BaseClient(region=Region.OVERSEAS)
+        client.client = AsyncClient(transport=MockTransport(handler))
+        client.get_sign_token = AsyncMock(return_value=None)
+        await client.request_base_api("game/player/binding", cred="c")
+        with request_region(Region.CHINESE):
+            assert client.client_type == "3"
+            await client.request_base_api("game/player/binding", cred="c")
+        with request_region(player_id=6000000000):
+            assert client.region is Region.OVERSEAS
+        assert client.region is Region.OVERSEAS
+        assert hosts[0][0] != hosts[1][0]
+        assert hosts[0][1] != hosts[1][1]
+
+    @staticmethod
+    async def test_view_shares_transport():
+        client = BaseClient(cookies={"cred": "a"}, player_id=6000000000)
+        view = client.view(cookies={"cred": "b"}, player_id=1000000000)
+        assert view.client is client.client
+        assert view.region is Region.CHINESE
+        assert view.cookies.cred == "b"
+        assert client.region is Region.OVERSEAS
+        assert client.cookies.cred == "a"
+        with pytest.raises(RegionNotSupported):
+            client.view(player_id=9000000000)
+
+    @staticmethod
+    async def test_view_copies_cookies():
+        client = BaseClient(cookies={"cred": "a"})
+        view = client.view()
+        view.cookies.cred = "b"
+        assert view.cookies.cred == "b"
+        assert client.cookies.cred == "a"
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from hypernet.client.scheduler import Priority, RequestScheduler, request_priority
+
+
+async def _run(scheduler: RequestScheduler, order: list, name: str, priority: Priority, tenant: str):
+    with request_priority(priority, tenant):
+        await scheduler.acquire()
+    order.append(name)
+    await asyncio.sleep(0)
+    scheduler.release()
+
+
+@pytest.mark.asyncio
+class TestRequestScheduler:
+    @staticmethod
+    async def test_priority_and_fairness():
+        scheduler = RequestScheduler(max_concurrency=1)
+        order = []
+        await scheduler.acquire()
+        tasks = [asyncio.create_task(_run(scheduler, order, f"a{i}", Priority.BATCH, "a")) for i in range(3)]
+        tasks += [asyncio.create_task(_run(scheduler, order, f"b{i}", Priority.BATCH, "b")) for i in range(2)]
+        tasks.append(asyncio.create_task(_run(scheduler, order, "user", Priority.INTERACTIVE, "c")))
+        await asyncio.sleep(0)
+        assert scheduler.waiting == 6
+        scheduler.release()
+        await asyncio.gather(*tasks)
+        assert order == ["user", "a0", "b0", "a1", "b1", "a2"]
+        assert scheduler.in_flight == 0
+
+    @staticmethod
+    async def test_cancelled_waiter():
+        scheduler = RequestScheduler(max_concurrency=1)
+        await scheduler.acquire()
+        task = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert scheduler.waiting == 0
+        scheduler.release()
+        assert scheduler.in_flight == 0
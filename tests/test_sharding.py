@@ -0,0 +1,63 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from hypernet.utils.sharding import HashRing, ShardCoordinator
+from hypernet.utils.state import SQLiteStateBackend
+
+
+def _owned_accounts(path: str, worker_id: str, accounts: list[int]) -> list[int]:
+    async def run() -> list[int]:
+        backend = SQLiteStateBackend(path)
+        coordinator = ShardCoordinator(backend, worker_id)
+        await coordinator.refresh()
+        backend.close()
+        return coordinator.filter(accounts)
+
+    return asyncio.run(run())
+
+
+class TestHashRing:
+    @staticmethod
+    def test_minimal_movement():
+        accounts = range(10000)
+        ring = HashRing(["a", "b", "c", "d"])
+        before = {account: ring.get(account) for account in accounts}
+        assert all(len(keys) > 1500 for keys in ring.assign(accounts).values())
+        ring.add("e")
+        moved = [account for account in accounts if ring.get(account) != before[account]]
+        assert all(ring.get(account) == "e" for account in moved)
+        assert len(moved) < 3000
+        ring.remove("e")
+        assert all(ring.get(account) == before[account] for account in accounts)
+        assert HashRing().get(1) is None
+
+
+@pytest.mark.asyncio
+class TestShardCoordinator:
+    @staticmethod
+    async def test_processes_partition_accounts(tmp_path):
+        path = str(tmp_path / "state.db")
+        backend = SQLiteStateBackend(path)
+        workers = [ShardCoordinator(backend, f"worker-{index}") for index in range(3)]
+        for worker in workers:
+            await worker.join()
+        accounts = list(range(1000000000, 1000000300))
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(3) as executor:
+            owned = await asyncio.gather(
+                *(
+                    loop.run_in_executor(executor, _owned_accounts, path, worker.worker_id, accounts)
+                    for worker in workers
+                )
+            )
+        assert sorted(sum(owned, [])) == accounts
+        await workers[0].refresh()
+        assert owned[0] == workers[0].filter(accounts)
+
+        await workers[2].leave()
+        await workers[0].refresh()
+        assert set(workers[0].ring.nodes) == {"worker-0", "worker-1"}
+        assert set(workers[0].filter(accounts)) >= set(owned[0])
+        backend.close()
@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+from unittest import mock
+
+import pytest
+from httpx import AsyncClient, ConnectError, MockTransport, Response
+
+from hypernet.client.base import BaseClient
+from hypernet.client.deadline import get_remaining_time, request_deadline
+from hypernet.client.region import request_region
+from hypernet.client.sign_tokens import SignTokenRegistry
+from hypernet.errors import TimedOut
+from hypernet.utils.ds import (
+    SignTokenManager,
+    generate_dynamic_secret,
+    generate_dynamic_secrets,
+    generate_signature,
+    get_signing_context,
+    header_for_sign,
+)
+from hypernet.utils.enums import Region
+
+
+def _reference_signature(token, path, body_or_query, did):
+    header_ca = {**header_for_sign, "timestamp": "1699999998", "dId": did}
+    s = path + body_or_query + "1699999998" + json.dumps(header_ca, separators=(",", ":"))
+    hex_s = hmac.new(token.encode(), s.encode(), hashlib.sha256).hexdigest()
+    return hashlib.md5(hex_s.encode()).hexdigest(), header_ca
+
+
+class TestSigningContext:
+    @staticmethod
+    def test_matches_reference():
+        with mock.patch("time.time", return_value=1700000000):
+            for args in (("token", "/api/v1/game/player/binding", "a=1", 'B"did'), ("", "", "", "")):
+                assert generate_signature(*args) == _reference_signature(*args)
+        assert get_signing_context("token", "did") is get_signing_context("token", "did")
+
+    @staticmethod
+    def test_batch_shares_timestamp():
+        requests = [
+            ("https://zonai.skport.com/api/v1/game/player/binding", "get", None, {"a": 1}),
+            ("https://zonai.skport.com/api/v1/game/attendance", "post", {"gameId": 3}, None),
+        ]
+        with mock.patch("time.time", return_value=1700000000):
+            signed = generate_dynamic_secrets("token", requests, "did")
+            assert signed == [generate_dynamic_secret("token", *request, did="did") for request in requests]
+        assert signed[0][1]["timestamp"] == signed[1][1]["timestamp"]
+
+
+@pytest.mark.asyncio
+class TestSignTokenManager:
+    @staticmethod
+    async def test_single_flight_and_refresh_ahead():
+        tokens = iter(("first", "second"))
+        fetched = asyncio.Event()
+
+        async def fetch(force):
+            await fetched.wait()
+            return next(tokens)
+
+        manager = SignTokenManager(fetch, ttl=100, refresh_ahead=10)
+        waiters = [asyncio.ensure_future(manager.get()) for _ in range(5)]
+        await asyncio.sleep(0)
+        fetched.set()
+        assert await asyncio.gather(*waiters) == ["first"] * 5
+
+        fetched.clear()
+        manager.expires_at = time.time() + 5
+        assert await manager.get() == "first"
+        assert await manager.get() == "first"
+        fetched.set()
+        await asyncio.sleep(0.01)
+        assert await manager.get() == "second"
+        assert manager.expires_at > time.time() + 90
+
+    @staticmethod
+    async def test_refresh_ahead_ignores_request_context():
+        remaining = []
+
+        async def fetch(force):
+            remaining.append(get_remaining_time())
+            return "token"
+
+        manager = SignTokenManager(fetch, ttl=100, refresh_ahead=10)
+        manager.set("old", time.time() + 5)
+        with request_deadline(5), request_region(Region.CHINESE):
+            assert await manager.get() == "old"
+        await asyncio.sleep(0)
+        assert remaining == [None]
+        assert manager.token == "token"
+
+    @staticmethod
+    async def test_cold_miss_limited_by_deadline():
+        async def fetch(force):
+            await asyncio.sleep(1)
+            raise ValueError("failed")
+
+        manager = SignTokenManager(fetch)
+        start = time.monotonic()
+        with mock.patch("hypernet.utils.ds._LOGGER") as logger:
+            with request_deadline(0.05), pytest.raises(TimedOut):
+                await manager.get()
+            assert time.monotonic() - start < 0.5
+            with pytest.raises(ValueError, match="failed"):
+                await manager.get()
+        logger.warning.assert_not_called()
+
+
+@pytest.mark.asyncio
+class TestSignTokenRegistry:
+    @staticmethod
+    async def test_tokens_per_region_and_cred():
+        requests = []
+
+        def handler(request):
+            requests.append((request.url.host, request.headers.get("cred")))
+            return Response(200, json={"code": 0, "data": {"token": f"{request.url.host}:{len(requests)}"}})
+
+        registry = SignTokenRegistry(max_size=2)
+        async with BaseClient(sign_tokens=registry) as client:
+            client.client = AsyncClient(transport=MockTransport(handler))
+            assert await client.get_sign_token(cred="a") == "zonai.skport.com:1"
+            assert await client.get_sign_token(cred="b") == "zonai.skport.com:1"
+            with request_region(Region.CHINESE):
+                assert await client.get_sign_token(cred="a") == "zonai.skland.com:2"
+                assert await client.get_sign_token(cred="b") == "zonai.skland.com:3"
+            assert len(registry) == 2
+            assert requests[1:] == [("zonai.skland.com", "a"), ("zonai.skland.com", "b")]
+
+    @staticmethod
+    async def test_shared_registry_outlives_clients():
+        def handler(request):
+            return Response(200, json={"code": 0, "data": {"token": "token"}})
+
+        registry = SignTokenRegistry()
+        first = BaseClient(sign_tokens=registry)
+        first.client = AsyncClient(transport=MockTransport(handler))
+        async with first:
+            assert await first.get_sign_token() == "token"
+        assert registry.get_manager(Region.OVERSEAS).fetch is None
+
+        async with BaseClient(sign_tokens=registry) as second:
+            second.client = AsyncClient(transport=MockTransport(handler))
+            assert await second.get_sign_token(force=True) == "token"
+
+    @staticmethod
+    async def test_retry_sleep_capped_by_deadline():
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise ConnectError("unreachable", request=request)
+
+        async with BaseClient() as client:
+            client.client = AsyncClient(transport=MockTransport(handler))
+            start = time.monotonic()
+            with request_deadline(0.2), pytest.raises(TimedOut):
+                await client.fetch_sign_token(client.region)
+            assert time.monotonic() - start < 0.9
+        assert len(calls) == 1
@@ -0,0 +1,86 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from hypernet.client.base import BaseClient
+from hypernet.client.health import AccountHealthTracker
+from hypernet.client.sign_tokens import SignTokenRegistry
+from hypernet.client.timeouts import AdaptiveTimeout
+from hypernet.errors import InvalidCookies
+from hypernet.utils.device_fp import SklandDeviceFP
+from hypernet.utils.enums import Region
+from hypernet.utils.state import MemoryStateBackend
+
+
+@pytest.fixture
+def reset_caches():
+    device = SklandDeviceFP()
+    saved = (device._cached_device_id, device._cache_expiry)
+    yield device
+    device._cached_device_id, device._cache_expiry = saved
+
+
+@pytest.mark.asyncio
+class TestSnapshot:
+    @staticmethod
+    async def test_round_trip(tmp_path, reset_caches):
+        device = reset_caches
+        device._cached_device_id, device._cache_expiry = "device", datetime.now(timezone.utc) - timedelta(seconds=1)
+        backend = MemoryStateBackend()
+        backend._values["cred"] = ({"cred": "c"}, time.time() + 60)
+        backend._values["expired"] = ("old", time.time() - 1)
+        adaptive_timeout = AdaptiveTimeout()
+        for _ in range(5):
+            adaptive_timeout.observe("GET host/path", 0.1)
+        health = AccountHealthTracker(threshold=1)
+        health.record_failure("bad", InvalidCookies())
+        client = BaseClient(
+            cookies={"hg_token": "hg", "cred": "c", "lab_user_id": "1"},
+            player_id=100,
+            state_backend=backend,
+            adaptive_timeout=adaptive_timeout,
+            health=health,
+            sign_tokens=SignTokenRegistry(),
+        )
+        client.sign_tokens.get_manager(Region.OVERSEAS).set("token")
+        path = tmp_path / "snapshot.json"
+        client.save_snapshot(path)
+
+        device._cached_device_id = None
+        restored = BaseClient(
+            cookies={"hg_token": "hg"},
+            state_backend=MemoryStateBackend(),
+            adaptive_timeout=AdaptiveTimeout(),
+            health=AccountHealthTracker(),
+            sign_tokens=SignTokenRegistry(),
+        )
+        assert restored.restore_snapshot(path)
+        assert await restored.get_sign_token() == "token"
+        assert device._cached_device_id is None
+        assert restored.cookies.cred == "c"
+        assert restored.account_id == 1
+        assert restored.player_id == 100
+        assert restored.state_backend._values.keys() == {"cred"}
+        assert restored.adaptive_timeout.routes["GET host/path"].count == 5
+        assert restored.health.is_quarantined("bad")
+
+    @staticmethod
+    async def test_other_account_not_restored(tmp_path, reset_caches):
+        path = tmp_path / "snapshot.json"
+        BaseClient(cookies={"hg_token": "hg", "cred": "c"}, player_id=100).save_snapshot(path)
+        client = BaseClient(cookies={"hg_token": "other"})
+        assert client.restore_snapshot(path)
+        assert client.cookies.cred is None
+        assert client.player_id is None
+        assert not client.restore_snapshot(tmp_path / "missing.json")
+
+    @staticmethod
+    async def test_device_id_restored(tmp_path, reset_caches):
+        device = reset_caches
+        device._cached_device_id, device._cache_expiry = "device", datetime.now(timezone.utc) + timedelta(minutes=5)
+        path = tmp_path / "snapshot.json"
+        BaseClient().save_snapshot(path)
+        device._cached_device_id = None
+        assert BaseClient().restore_snapshot(path)
+        assert await SklandDeviceFP.get_cached_device_id() == "device"
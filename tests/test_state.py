@@ -0,0 +1,72 @@
+import asyncio
+import time
+from unittest import mock
+
+import pytest
+
+from hypernet.client.deadline import request_deadline
+from hypernet.errors import TimedOut
+from hypernet.utils.state import MemoryStateBackend, SQLiteStateBackend
+
+
+@pytest.mark.asyncio
+class TestStateBackend:
+    @staticmethod
+    async def test_memory_ttl():
+        backend = MemoryStateBackend()
+        await backend.set("key", "value", ttl=0.05)
+        assert await backend.get("key") == "value"
+        await asyncio.sleep(0.1)
+        assert await backend.get("key") is None
+
+    @staticmethod
+    async def test_memory_lease():
+        backend = MemoryStateBackend()
+        assert await backend.acquire_lease("key", "a", 10)
+        assert not await backend.acquire_lease("key", "b", 10)
+        await backend.release_lease("key", "a")
+        assert await backend.acquire_lease("key", "b", 10)
+
+    @staticmethod
+    async def test_sqlite_shared_between_instances(tmp_path):
+        path = tmp_path / "state.db"
+        first, second = SQLiteStateBackend(path), SQLiteStateBackend(path)
+        await first.set("key", {"cred": "abc"}, ttl=60)
+        assert await second.get("key") == {"cred": "abc"}
+        assert await first.acquire_lease("key", "a", 10)
+        assert not await second.acquire_lease("key", "b", 10)
+        await first.release_lease("key", "a")
+        assert await second.acquire_lease("key", "b", 10)
+        first.close()
+        second.close()
+
+    @staticmethod
+    async def test_get_or_create_single_flight(tmp_path):
+        path = tmp_path / "state.db"
+        backends = [SQLiteStateBackend(path) for _ in range(4)]
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "token"
+
+        results = await asyncio.gather(
+            *(backend.get_or_create("key", factory, ttl=60, poll_interval=0.01) for backend in backends)
+        )
+        assert results == ["token"] * 4
+        assert calls == 1
+        for backend in backends:
+            backend.close()
+
+    @staticmethod
+    async def test_get_or_create_waits_within_deadline():
+        backend = MemoryStateBackend()
+        assert await backend.acquire_lease("key", "other", 60)
+        factory = mock.AsyncMock(return_value="token")
+        start = time.monotonic()
+        with request_deadline(0.1), pytest.raises(TimedOut):
+            await backend.get_or_create("key", factory, poll_interval=0.01)
+        assert time.monotonic() - start < 0.5
+        factory.assert_not_called()
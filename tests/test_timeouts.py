@@ -0,0 +1,39 @@
+import pytest
+from httpx import AsyncClient, MockTransport, Response
+
+from hypernet.client.base import BaseClient
+from hypernet.client.timeouts import AdaptiveTimeout, LatencyHistogram
+
+
+class TestAdaptiveTimeout:
+    @staticmethod
+    def test_histogram_quantile():
+        histogram = LatencyHistogram()
+        for i in range(1, 101):
+            histogram.observe(i / 100)
+        assert 0.45 <= histogram.quantile(0.5) <= 0.56
+        assert 0.9 <= histogram.quantile(0.99) <= 1.1
+
+    @staticmethod
+    def test_read_timeout_within_bounds():
+        adaptive = AdaptiveTimeout(min_timeout=0.5, max_timeout=10, min_samples=5)
+        route = adaptive.get_route("get", "https://example.com/api/v1/card/detail?roleId=1")
+        assert route == "GET example.com/api/v1/card/detail"
+        for _ in range(4):
+            adaptive.observe(route, 0.01)
+        assert adaptive.get_read_timeout(route) is None
+        adaptive.observe(route, 0.01)
+        assert adaptive.get_read_timeout(route) == 0.5
+        for _ in range(100):
+            adaptive.observe(route, 60)
+        assert adaptive.get_read_timeout(route) == 10
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_client_records_latency():
+        adaptive = AdaptiveTimeout()
+        async with BaseClient(adaptive_timeout=adaptive) as client:
+            client.client = AsyncClient(transport=MockTransport(lambda request: Response(200)))
+            await client.request("GET", "https://example.com/a?x=1")
+            await client.request("GET", "https://example.com/a?x=2")
+        assert adaptive.routes["GET example.com/a"].count == 2
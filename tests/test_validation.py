@@ -0,0 +1,49 @@
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import AsyncClient, MockTransport, Response
+
+from hypernet.client.components.chronicle.endfield import EndfieldBattleChronicleClient
+from hypernet.errors import InvalidCookies
+from hypernet.models.endfield.chronicle.card import EndfieldCardDetailResponse
+from hypernet.models.endfield.chronicle.notes import EndfieldNoteSkport
+from hypernet.utils.validation import ModelValidationPool
+from tests.test_decode import CARD_DETAIL
+
+NOTES_TYPE = EndfieldCardDetailResponse[EndfieldNoteSkport]
+
+
+def _payload(stamina: int) -> bytes:
+    body = json.loads(json.dumps(CARD_DETAIL))
+    body["data"]["detail"]["dungeon"]["curStamina"] = stamina
+    return json.dumps(body).encode()
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ModelValidationPool(max_workers=2, max_pending=3)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+class TestModelValidationPool:
+    @staticmethod
+    async def test_map_keeps_order(pool):
+        error = json.dumps({"code": 10002, "message": "cred expired", "data": {}}).encode()
+        payloads = [_payload(stamina) for stamina in range(10)]
+        results = [item async for item in pool.map(NOTES_TYPE, [*payloads, error], return_exceptions=True)]
+        assert [result.detail.dungeon.curStamina for result in results[:-1]] == list(range(10))
+        assert isinstance(results[0], NOTES_TYPE)
+        assert isinstance(results[-1], InvalidCookies)
+        compact = await pool.validate(NOTES_TYPE, payloads[1], compact=True)
+        assert compact["detail"]["dungeon"]["curStamina"] == 1
+
+    @staticmethod
+    async def test_client_offloads_validation(pool):
+        async with EndfieldBattleChronicleClient(player_id=1000000001, account_id=1, validation_pool=pool) as client:
+            client.client = AsyncClient(transport=MockTransport(lambda request: Response(200, content=_payload(80))))
+            client.get_sign_token = AsyncMock(return_value=None)
+            notes = await client.get_endfield_notes(cred="cred")
+            assert notes.current_stamina == 80